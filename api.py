@@ -9,7 +9,7 @@ import shutil
 import socket
 import sys
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
 from pathlib import Path
 
@@ -20,7 +20,7 @@ from fastapi import (
     HTTPException,
     UploadFile,
 )
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
 from pydantic import BaseModel, Field
 
 from src.core.history import get_history_manager
@@ -47,6 +47,7 @@ _import_log("config loaded")
 
 task_manager = get_task_manager()
 _inference_queue = None
+_preload_task = None
 _static_files_cls = None
 _exception_handlers_registered = False
 
@@ -102,11 +103,37 @@ class _LazyProcessorProxy:
         return getattr(self._load(), name)
 
 
+async def _warmup_vad() -> None:
+    """启动时预加载共享的 fsmn-vad 模型，避免首个请求承担加载开销"""
+    from src.services.asr.vad import warmup_vad_model
+
+    try:
+        load_seconds = await asyncio.to_thread(warmup_vad_model)
+        logger.info(f"VAD 模型预热完成，加载耗时 {load_seconds:.2f}s")
+    except Exception as e:
+        logger.warning(f"VAD 模型预热失败，将在首次使用时加载: {e}")
+
+
+async def _preload_asr_models() -> None:
+    """后台预加载并预热 ASR 模型（不阻塞服务启动，期间 /ready 返回 503）"""
+    from src.services.asr.warmup import preload_asr_models
+
+    await asyncio.to_thread(preload_asr_models)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期事件处理"""
     logger.info("启动 FastAPI 服务...")
     _register_exception_handlers(app)
+    global _preload_task
+    if config.asr.asr_preload:
+        from src.services.asr.warmup import mark_preload_pending
+
+        mark_preload_pending()
+        _preload_task = asyncio.create_task(_preload_asr_models())
+    elif config.asr.enable_vad:
+        await _warmup_vad()
     inference_queue = _get_inference_queue()
     await inference_queue.start()
     logger.info("推理队列已启动")
@@ -114,8 +141,21 @@ async def lifespan(app: FastAPI):
         yield
     finally:
         logger.info("关闭 FastAPI 服务...")
+        if _preload_task is not None and not _preload_task.done():
+            # 预加载线程无法中断，只取消等待它的任务，避免关闭时遗留未完成的任务
+            _preload_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await _preload_task
+        _preload_task = None
         await inference_queue.stop()
         logger.info("推理队列已停止")
+        if config.asr.parallel_workers > 1:
+            from src.services.asr.parallel import shutdown_parallel_pools
+
+            shutdown_parallel_pools()
+        from src.services.asr.factory import shutdown_asr_services
+
+        shutdown_asr_services()
 
 
 # 创建FastAPI应用
@@ -175,6 +215,8 @@ def _build_task_response(task_id: str, task_info: dict) -> "TaskResponse":
         completed_at=task_info.get("completed_at"),
         url=task_info.get("url"),
         filename=task_info.get("filename"),
+        partial_transcript=task_info.get("partial_transcript"),
+        asr_progress=task_info.get("asr_progress"),
     )
 
 
@@ -304,6 +346,12 @@ class TaskResponse(BaseModel):
     completed_at: str | None = Field(default=None, description="任务完成时间（ISO格式）")
     url: str | None = Field(default=None, description="处理的URL（如果有）")
     filename: str | None = Field(default=None, description="处理的文件名（如果有）")
+    partial_transcript: str | None = Field(
+        default=None, description="语音识别进行中已完成部分的转录文本（按时间顺序）"
+    )
+    asr_progress: dict | None = Field(
+        default=None, description="语音识别进度: completed_s, total_s, fraction"
+    )
 
 
 class TaskListResponse(BaseModel):
@@ -346,6 +394,7 @@ async def api_info():
         "endpoints": {
             "docs": "/docs",
             "health": "/health",
+            "ready": "/ready",
             "process_bilibili": "/api/v1/process/bilibili",
             "process_audio": "/api/v1/process/audio",
             "process_batch": "/api/v1/process/batch",
@@ -376,6 +425,21 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    就绪检查端点
+
+    与 /health 不同：启用 ASR_PRELOAD 时，仅在模型加载并预热完成后返回 200，
+    加载中或失败时返回 503，供负载均衡只向已预热实例转发流量。
+    """
+    from src.services.asr.warmup import get_readiness
+
+    readiness = get_readiness()
+    readiness["timestamp"] = datetime.now().isoformat()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
 @app.post("/api/v1/process/bilibili", response_model=TaskResponse)
 async def process_bilibili_video(request: BilibiliVideoRequest):
     """处理B站视频（异步队列版本）"""
@@ -980,6 +1044,44 @@ async def get_maintenance_stats():
     }
 
 
+@app.get("/api/v1/admin/asr-cache")
+async def get_asr_cache_stats():
+    """获取 ASR 转录缓存统计（条目、容量、命中/未命中次数）"""
+    from src.services.asr.cache import get_transcript_cache
+
+    return {"enabled": config.asr.transcript_cache_enabled, **get_transcript_cache().stats()}
+
+
+@app.post("/api/v1/admin/asr-cache/purge")
+async def purge_asr_cache(confirm: bool = Form(False)):
+    """清空 ASR 转录缓存"""
+    if not confirm:
+        raise HTTPException(status_code=400, detail="请传入 confirm=true 确认操作")
+    from src.services.asr.cache import get_transcript_cache
+
+    count = get_transcript_cache().purge()
+    return {"status": "ok", "cleared": count, "message": f"已清空 {count} 条转录缓存"}
+
+
+@app.get("/api/v1/admin/asr-models")
+async def get_asr_model_stats():
+    """获取 ASR 模型池统计（各模型是否常驻、常驻内存、加载耗时、最近使用时间）"""
+    from src.services.asr.model_pool import get_model_pool
+
+    return get_model_pool().stats()
+
+
+@app.post("/api/v1/admin/asr-models/evict")
+async def evict_asr_models(confirm: bool = Form(False), model_type: str | None = Form(None)):
+    """释放空闲的 ASR 模型（正在使用的模型会被跳过）"""
+    if not confirm:
+        raise HTTPException(status_code=400, detail="请传入 confirm=true 确认操作")
+    from src.services.asr.model_pool import get_model_pool
+
+    evicted = await asyncio.to_thread(get_model_pool().evict, model_type or None)
+    return {"status": "ok", "evicted": evicted, "message": f"已释放 {len(evicted)} 个 ASR 模型"}
+
+
 @app.get("/api/v1/task/{task_id}", response_model=TaskResponse)
 async def get_task_status(task_id: str):
     """查询任务状态"""
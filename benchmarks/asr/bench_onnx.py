@@ -0,0 +1,82 @@
+"""
+SenseVoice ONNX 推理基准测试
+
+对同一组 VAD 语音段，对比 torch 路径与 ONNX Runtime 路径（fp32 / int8 量化）的 RTF。
+
+用法:
+    python benchmarks/asr/bench_onnx.py --audio lecture.mp3 --threads 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.services.asr.onnx_sense_voice import SenseVoiceOnnxEngine
+from src.services.asr.preprocess import decode_audio
+from src.services.asr.sense_voice import SenseVoiceService
+from src.services.asr.vad import VADService
+from src.utils.config import get_config
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SenseVoice ONNX 推理基准测试")
+    parser.add_argument("--audio", required=True, help="测试音频文件")
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime 算子内线程数")
+    parser.add_argument("--no-int8", action="store_true", help="跳过 int8 量化模型")
+    args = parser.parse_args()
+
+    audio = decode_audio(args.audio)
+    segments = VADService().segment_audio(audio)
+    print(f"音频时长 {audio.duration_s:.1f}s，语音段 {len(segments)} 个")
+
+    service = SenseVoiceService("cpu")
+    _, load_s = _timed(service.load_model)
+    torch_text, torch_s = _timed(lambda: service.transcribe_segments(audio, segments))
+    report = {
+        "audio": args.audio,
+        "duration_s": round(audio.duration_s, 2),
+        "segments": len(segments),
+        "torch": {
+            "load_s": round(load_s, 3),
+            "wall_s": round(torch_s, 3),
+            "rtf": round(torch_s / audio.duration_s, 4),
+            "text_chars": len(torch_text),
+        },
+    }
+
+    variants = [("onnx_fp32", False)] + ([] if args.no_int8 else [("onnx_int8", True)])
+    for name, quantize in variants:
+        engine, export_s = _timed(
+            lambda quantize=quantize: SenseVoiceOnnxEngine.from_auto_model(
+                service.model,
+                model_dir=get_config().paths.model_dir,
+                quantize=quantize,
+                intra_op_threads=args.threads,
+            )
+        )
+        service._onnx_engine = engine
+        text, wall_s = _timed(lambda: service.transcribe_segments(audio, segments))
+        report[name] = {
+            "export_or_load_s": round(export_s, 3),
+            "wall_s": round(wall_s, 3),
+            "rtf": round(wall_s / audio.duration_s, 4),
+            "speedup": round(torch_s / wall_s, 2) if wall_s else None,
+            "text_chars": len(text),
+            "same_text": text == torch_text,
+        }
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
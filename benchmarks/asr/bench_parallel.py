@@ -0,0 +1,81 @@
+"""
+并行 ASR 基准测试
+
+对比单实例段级转录与多进程并行转录的墙钟耗时。
+
+用法:
+    python benchmarks/asr/bench_parallel.py --audio lecture.mp3 --model paraformer --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.services.asr.factory import get_asr_service
+from src.services.asr.parallel import ParallelASRPool
+from src.services.asr.preprocess import decode_audio
+from src.services.asr.vad import VADService
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="并行 ASR 基准测试")
+    parser.add_argument("--audio", required=True, help="测试音频文件")
+    parser.add_argument("--model", default="paraformer", choices=["paraformer", "sense_voice"])
+    parser.add_argument("--workers", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--torch-threads", type=int, default=2)
+    args = parser.parse_args()
+
+    audio = decode_audio(args.audio)
+    segments = VADService().segment_audio(audio)
+    print(f"音频时长 {audio.duration_s:.1f}s，语音段 {len(segments)} 个")
+
+    service = get_asr_service(args.model)
+    _, single_load_s = _timed(service.load_model)
+    single_text, single_s = _timed(lambda: service.transcribe_segments(audio, segments))
+
+    pool = ParallelASRPool(args.model, workers=args.workers, torch_threads=args.torch_threads)
+    try:
+        # 工作进程按需启动：计时前预热全部进程，启动与模型加载单独计时
+        ready, pool_warmup_s = _timed(pool.warmup)
+        if ready < args.workers:
+            print(f"警告: 仅 {ready}/{args.workers} 个工作进程完成预热")
+        parallel_text, parallel_s = _timed(lambda: pool.transcribe(audio, segments))
+    finally:
+        pool.shutdown()
+
+    report = {
+        "audio": args.audio,
+        "duration_s": round(audio.duration_s, 2),
+        "segments": len(segments),
+        "model": args.model,
+        "workers": args.workers,
+        "torch_threads": args.torch_threads,
+        "single": {
+            "load_s": round(single_load_s, 3),
+            "wall_s": round(single_s, 3),
+            "rtf": round(single_s / audio.duration_s, 4),
+        },
+        "parallel": {
+            "warmup_s": round(pool_warmup_s, 3),
+            "wall_s": round(parallel_s, 3),
+            "rtf": round(parallel_s / audio.duration_s, 4),
+        },
+        "speedup": round(single_s / parallel_s, 2) if parallel_s else None,
+        "text_chars": {"single": len(single_text), "parallel": len(parallel_text)},
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
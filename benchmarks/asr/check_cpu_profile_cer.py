@@ -0,0 +1,78 @@
+"""
+cpu_optimized 推理配置 CER 回归检查
+
+分别以 default（fp32 eager）与 cpu_optimized 配置转录同一音频，
+输出两者的耗时、RTF 与 CER；CER 超过阈值时以非 0 状态码退出。
+
+用法:
+    python benchmarks/asr/check_cpu_profile_cer.py --audio sample.wav --model paraformer --max-cer 0.02
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.services.asr.factory import create_asr_service
+from src.services.asr.preprocess import decode_audio
+from src.services.asr.torch_profile import character_error_rate
+from src.utils.config import get_config
+
+
+def _run(model: str, profile: str, audio) -> dict:
+    get_config().asr.asr_profile = profile
+    service = create_asr_service(model)
+    start = time.perf_counter()
+    service.load_model()
+    load_s = time.perf_counter() - start
+    # 首次推理包含 torch.compile / 内存分配开销，单独计时
+    service.transcribe_decoded(audio)
+    start = time.perf_counter()
+    text = service.transcribe_decoded(audio)
+    wall_s = time.perf_counter() - start
+    return {
+        "load_s": round(load_s, 3),
+        "wall_s": round(wall_s, 3),
+        "rtf": round(wall_s / audio.duration_s, 4),
+        "text": text,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="cpu_optimized 推理配置 CER 回归检查")
+    parser.add_argument("--audio", required=True, help="测试音频文件")
+    parser.add_argument("--model", default="paraformer", choices=["paraformer", "sense_voice"])
+    parser.add_argument("--max-cer", type=float, default=0.02, help="允许的最大 CER")
+    args = parser.parse_args()
+
+    config = get_config()
+    config.asr.device = "cpu"
+    config.asr.use_onnx = False
+    audio = decode_audio(args.audio)
+
+    baseline = _run(args.model, "default", audio)
+    optimized = _run(args.model, "cpu_optimized", audio)
+    cer = character_error_rate(baseline["text"], optimized["text"])
+
+    report = {
+        "audio": args.audio,
+        "duration_s": round(audio.duration_s, 2),
+        "model": args.model,
+        "default": baseline,
+        "cpu_optimized": optimized,
+        "speedup": round(baseline["wall_s"] / optimized["wall_s"], 2)
+        if optimized["wall_s"]
+        else None,
+        "cer": round(cer, 4),
+        "max_cer": args.max_cer,
+        "passed": cer <= args.max_cer,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
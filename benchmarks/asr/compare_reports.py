@@ -0,0 +1,107 @@
+"""
+对比两份 run_suite.py 报告
+
+按 (后端, 音频) 对齐，输出 RTF / 加载耗时 / 峰值 RSS 的变化；
+任一 RTF 恶化超过 --max-rtf-regression 时以退出码 1 结束（可用于发布前检查）。
+桩模型结果只与桩模型结果比较。
+
+用法:
+    python benchmarks/asr/compare_reports.py v1.json v2.json --max-rtf-regression 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _index(report: dict) -> dict[tuple[str, str], dict]:
+    rows = {}
+    for result in report.get("results", []):
+        if result.get("error"):
+            continue
+        for run in result.get("runs", []):
+            rows[(result["backend"], run["audio"])] = {
+                "stub": result.get("stub", False),
+                "rtf": run.get("rtf"),
+                "load_s": result.get("load_s"),
+                "peak_rss_mb": result.get("peak_rss_mb"),
+            }
+    return rows
+
+
+def _change(old, new) -> float | None:
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old
+
+
+def compare(base: dict, head: dict) -> list[dict]:
+    """返回两份报告中共同 (后端, 音频) 的指标变化"""
+    base_rows, head_rows = _index(base), _index(head)
+    rows = []
+    for key in sorted(base_rows.keys() & head_rows.keys()):
+        old, new = base_rows[key], head_rows[key]
+        if old["stub"] != new["stub"]:
+            continue
+        rows.append(
+            {
+                "backend": key[0],
+                "audio": key[1],
+                "stub": new["stub"],
+                **{
+                    f"{metric}_change": _change(old[metric], new[metric])
+                    for metric in ("rtf", "load_s", "peak_rss_mb")
+                },
+                "rtf": (old["rtf"], new["rtf"]),
+            }
+        )
+    return rows
+
+
+def _fmt(change: float | None) -> str:
+    return "n/a" if change is None else f"{change:+.1%}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对比两份 ASR 基准报告")
+    parser.add_argument("base", help="基线报告")
+    parser.add_argument("head", help="新版本报告")
+    parser.add_argument(
+        "--max-rtf-regression", type=float, default=None, help="允许的 RTF 恶化比例"
+    )
+    args = parser.parse_args()
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    head = json.loads(Path(args.head).read_text(encoding="utf-8"))
+    rows = compare(base, head)
+    if not rows:
+        print("两份报告没有可对比的 (后端, 音频) 组合")
+        return
+
+    print(f"{'backend':28} {'audio':16} {'rtf':>22} {'Δrtf':>8} {'Δload':>8} {'Δrss':>8}")
+    regressions = []
+    for row in rows:
+        old_rtf, new_rtf = row["rtf"]
+        name = row["backend"] + (" (stub)" if row["stub"] else "")
+        print(
+            f"{name:28} {row['audio']:16} {f'{old_rtf} -> {new_rtf}':>22} "
+            f"{_fmt(row['rtf_change']):>8} {_fmt(row['load_s_change']):>8} "
+            f"{_fmt(row['peak_rss_mb_change']):>8}"
+        )
+        change = row["rtf_change"]
+        threshold = args.max_rtf_regression
+        if threshold is not None and change is not None and change > threshold:
+            regressions.append(row)
+
+    if regressions:
+        print(
+            f"\n{len(regressions)} 项 RTF 恶化超过 {args.max_rtf_regression:.0%}", file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+ASR 实时率（RTF）基准套件
+
+生成可配置时长的合成音频（连续讲话 / 静音为主），逐个后端测量：
+模型加载耗时、各阶段耗时（预处理、VAD、推理、标点）、RTF 与峰值 RSS，输出 JSON 报告，
+不同版本的报告可用 compare_reports.py 对比。
+
+每个后端在独立子进程中运行，峰值 RSS 与加载耗时互不影响。全程离线：
+模型需已缓存在本地；权重不存在时自动改用桩模型（报告中 stub=true），--stub 强制使用桩模型。
+
+用法:
+    python benchmarks/asr/run_suite.py --durations 60 600 --output asr_bench.json
+    python benchmarks/asr/run_suite.py --backends paraformer sense_voice_onnx_int8 --repeat 3
+    python benchmarks/asr/run_suite.py --stub --durations 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SCHEMA_VERSION = 1
+
+# 后端名 -> (模型类型, 环境变量覆盖)
+BACKENDS: dict[str, tuple[str, dict[str, str]]] = {
+    "paraformer": ("paraformer", {}),
+    "paraformer_cpu_optimized": ("paraformer", {"ASR_PROFILE": "cpu_optimized"}),
+    "sense_voice": ("sense_voice", {}),
+    "sense_voice_cpu_optimized": ("sense_voice", {"ASR_PROFILE": "cpu_optimized"}),
+    "sense_voice_onnx": ("sense_voice", {"USE_ONNX": "true", "ONNX_QUANTIZE": "false"}),
+    "sense_voice_onnx_int8": ("sense_voice", {"USE_ONNX": "true", "ONNX_QUANTIZE": "true"}),
+    "whisper_cpp": ("whisper_cpp", {}),
+}
+
+# 所有后端共用：仅 CPU、离线、不走缓存与多进程，测到的是单实例推理本身
+_BASE_ENV = {
+    "DEVICE": "cpu",
+    "TRANSCRIPT_CACHE_ENABLED": "false",
+    "PARALLEL_WORKERS": "0",
+    "ASR_PRELOAD": "false",
+    "HF_HUB_OFFLINE": "1",
+    "TRANSFORMERS_OFFLINE": "1",
+}
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------- 子进程：单个后端
+
+
+class _PunctuationClock:
+    """包装 AutoModel.inference，把标点模型调用的耗时单独计入 punctuation 阶段"""
+
+    def __init__(self, service):
+        self.elapsed = 0.0
+        model = getattr(service, "model", None)
+        punc_model = getattr(model, "punc_model", None)
+        if punc_model is None:
+            return
+        inference = model.inference
+
+        def timed_inference(*args, **kwargs):
+            if kwargs.get("model") is not punc_model:
+                return inference(*args, **kwargs)
+            result, elapsed = _timed(inference, *args, **kwargs)
+            self.elapsed += elapsed
+            return result
+
+        model.inference = timed_inference
+
+    def take(self) -> float:
+        elapsed, self.elapsed = self.elapsed, 0.0
+        return elapsed
+
+
+def _load_backend(backend: str, force_stub: bool, allow_stub: bool):
+    """返回 (service, load_s, stub_reason)；无法加载且不允许桩模型时抛出原异常"""
+    from stub_backend import StubASRService
+
+    stub_reason = "forced" if force_stub else None
+    if not force_stub:
+        try:
+            from src.services.asr.factory import create_asr_service
+
+            service = create_asr_service(BACKENDS[backend][0])
+            _, load_s = _timed(service.ensure_model_loaded)
+            return service, load_s, None
+        except Exception as e:
+            if not allow_stub:
+                raise
+            stub_reason = f"{type(e).__name__}: {e}"
+
+    service = StubASRService()
+    _, load_s = _timed(service.ensure_model_loaded)
+    return service, load_s, stub_reason
+
+
+def _make_vad(use_stub: bool):
+    """返回 (vad_fn, vad_name)：优先 fsmn-vad，不可用时用能量阈值 VAD"""
+    from stub_backend import energy_vad
+
+    if not use_stub:
+        try:
+            from src.services.asr.vad import VADService
+
+            vad = VADService()
+            return vad.segment_audio, "fsmn-vad"
+        except Exception:
+            pass
+    return energy_vad, "energy"
+
+
+def run_worker(backend: str, audio_paths: list[str], args) -> dict:
+    os.environ.update(_BASE_ENV)
+    os.environ.update(BACKENDS[backend][1])
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    from src.services.asr.preprocess import decode_audio
+    from src.utils.helpers.memory import get_peak_rss_bytes
+
+    result: dict = {"backend": backend, "model_type": BACKENDS[backend][0]}
+    service, load_s, stub_reason = _load_backend(backend, args.stub, not args.no_stub_fallback)
+    vad_fn, vad_name = _make_vad(stub_reason is not None)
+    punctuation = _PunctuationClock(service)
+    result.update(
+        stub=stub_reason is not None,
+        stub_reason=stub_reason,
+        vad=vad_name,
+        load_s=round(load_s, 3),
+        runs=[],
+    )
+
+    for path in audio_paths:
+        best = None
+        for _ in range(args.repeat):
+            audio, preprocess_s = _timed(decode_audio, path)
+            segments, vad_s = _timed(vad_fn, audio)
+            punctuation.take()
+            text, transcribe_s = _timed(service.transcribe_segments, audio, segments)
+            punctuation_s = punctuation.take()
+            stages = {
+                "preprocess_s": preprocess_s,
+                "vad_s": vad_s,
+                "inference_s": transcribe_s - punctuation_s,
+                "punctuation_s": punctuation_s,
+            }
+            total_s = sum(stages.values())
+            if best is None or total_s < best["total_s"]:
+                best = {
+                    "audio": Path(path).stem,
+                    "duration_s": round(audio.duration_s, 3),
+                    "segments": len(segments),
+                    "speech_s": round(sum(end - start for start, end in segments) / 1000, 3),
+                    "stages": {name: round(value, 4) for name, value in stages.items()},
+                    "total_s": round(total_s, 4),
+                    "rtf": round(total_s / audio.duration_s, 5) if audio.duration_s else None,
+                    "text_chars": len(text),
+                }
+        result["runs"].append(best)
+
+    peak = get_peak_rss_bytes()
+    result["peak_rss_mb"] = round(peak / 1024 / 1024, 1) if peak else None
+    return result
+
+
+# ---------------------------------------------------------------- 主进程：生成音频并汇总
+
+
+def _prepare_audio(audio_dir: Path, kinds: list[str], durations: list[float]) -> list[dict]:
+    from synthetic_audio import generate_audio, speech_fraction, write_wav
+
+    items = []
+    for kind in kinds:
+        for duration in durations:
+            path = audio_dir / f"{kind}_{duration:g}s.wav"
+            samples = generate_audio(kind, duration, seed=int(duration))
+            if not path.exists():
+                write_wav(path, samples)
+            items.append(
+                {
+                    "name": path.stem,
+                    "kind": kind,
+                    "duration_s": duration,
+                    "speech_fraction": round(speech_fraction(samples), 3),
+                    "path": str(path),
+                }
+            )
+    return items
+
+
+def _run_backend_subprocess(backend: str, audio: list[dict], args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="asr_bench_") as tmp:
+        result_file = Path(tmp) / "result.json"
+        cmd = [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "--worker",
+            backend,
+            "--result-file",
+            str(result_file),
+            "--repeat",
+            str(args.repeat),
+            "--audio",
+            *[item["path"] for item in audio],
+        ]
+        if args.stub:
+            cmd.append("--stub")
+        if args.no_stub_fallback:
+            cmd.append("--no-stub-fallback")
+
+        print(f"[bench] {backend} ...", file=sys.stderr)
+        try:
+            proc = subprocess.run(
+                cmd, cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=args.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return {"backend": backend, "error": f"timeout after {args.timeout}s"}
+        if proc.returncode != 0 or not result_file.exists():
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-20:]
+            return {"backend": backend, "error": "\n".join(tail)}
+        return json.loads(result_file.read_text(encoding="utf-8"))
+
+
+def build_report(args) -> dict:
+    audio_dir = (
+        Path(args.audio_dir) if args.audio_dir else Path(tempfile.gettempdir()) / "asr_bench"
+    )
+    audio = _prepare_audio(audio_dir, args.kinds, args.durations)
+    results = [_run_backend_subprocess(backend, audio, args) for backend in args.backends]
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "audio": [{k: v for k, v in item.items() if k != "path"} for item in audio],
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ASR 实时率（RTF）基准套件")
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[60, 300], help="音频时长（秒）"
+    )
+    parser.add_argument(
+        "--kinds", nargs="+", default=["speech", "silence"], choices=["speech", "silence"]
+    )
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="每条音频重复次数（取总耗时最短的一次）"
+    )
+    parser.add_argument("--stub", action="store_true", help="强制使用桩模型与能量 VAD")
+    parser.add_argument(
+        "--no-stub-fallback", action="store_true", help="模型加载失败时报错而非改用桩模型"
+    )
+    parser.add_argument("--audio-dir", help="合成音频目录（默认系统临时目录下 asr_bench/）")
+    parser.add_argument("--timeout", type=float, default=3600, help="单个后端的超时（秒）")
+    parser.add_argument("--output", help="JSON 报告路径（默认输出到标准输出）")
+    # 内部参数：子进程模式
+    parser.add_argument("--worker", choices=list(BACKENDS), help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    parser.add_argument("--audio", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, args.audio, args)
+        Path(args.result_file).write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        return
+
+    report = json.dumps(build_report(args), ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+        print(f"[bench] 报告已写入 {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+基准测试用桩模型
+
+模型权重不存在（或显式 --stub）时替代真实后端，保证基准流程在离线 / 仅 CPU 环境可跑通：
+- StubASRService：常驻一块模拟权重，推理做与音频时长成正比的 STFT + 矩阵乘
+- energy_vad：30ms 帧能量阈值 VAD，替代 fsmn-vad
+
+桩模型的数字只反映流程本身（解码、切分、批处理）的开销，不能与真实模型的 RTF 比较。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.services.asr.base import BaseASRService
+from src.services.asr.preprocess import DecodedAudio
+
+_FRAME_MS = 30
+_HOP = 160
+_WIN = 400
+
+
+class StubASRService(BaseASRService):
+    """按音频时长消耗 CPU 的桩 ASR 服务（文本为各段时长）"""
+
+    def __init__(self, weights_mb: int = 32, hidden: int = 256):
+        super().__init__()
+        self.weights_mb = weights_mb
+        self.hidden = hidden
+
+    def load_model(self):
+        if self.model is not None:
+            return
+        rng = np.random.default_rng(0)
+        rows = max(1, self.weights_mb * 1024 * 1024 // (4 * self.hidden))
+        weights = rng.standard_normal((rows, self.hidden), dtype=np.float32)
+        self.model = {"weights": weights, "projection": weights[: _WIN // 2 + 1]}
+
+    def transcribe(self, audio_path: str, task_id: str | None = None) -> str:
+        from src.services.asr.preprocess import decode_audio
+
+        return self.transcribe_decoded(decode_audio(audio_path, task_id=task_id), task_id)
+
+    def transcribe_decoded(self, audio: DecodedAudio, task_id: str | None = None) -> str:
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+        samples = audio.to_float32()
+        frames = max(0, (samples.size - _WIN) // _HOP + 1)
+        if frames:
+            index = np.arange(_WIN)[None, :] + _HOP * np.arange(frames)[:, None]
+            spectrum = np.abs(np.fft.rfft(samples[index] * np.hanning(_WIN), axis=1))
+            hidden = np.tanh(spectrum.astype(np.float32) @ self.model["projection"])
+            hidden.sum()
+        return f"[{audio.duration_s:.1f}s]"
+
+
+def energy_vad(
+    audio: DecodedAudio,
+    threshold: float = 0.01,
+    min_gap_ms: int = 300,
+    max_segment_ms: int = 30000,
+) -> list[tuple[int, int]]:
+    """
+    能量阈值 VAD：帧 RMS 超过阈值视为语音，间隔短于 min_gap_ms 的语音段合并
+
+    Returns:
+        list[tuple[int, int]]: 语音段 (start_ms, end_ms)
+    """
+    frame = int(audio.sample_rate * _FRAME_MS / 1000)
+    samples = audio.to_float32()
+    count = samples.size // frame
+    if count == 0:
+        return []
+    rms = np.sqrt((samples[: count * frame].reshape(count, frame) ** 2).mean(axis=1))
+    voiced = np.flatnonzero(rms > threshold)
+    if voiced.size == 0:
+        return []
+
+    # 相邻语音帧间隔超过 min_gap_ms 处断开
+    breaks = np.flatnonzero(np.diff(voiced) * _FRAME_MS > min_gap_ms)
+    starts = np.concatenate([[voiced[0]], voiced[breaks + 1]])
+    ends = np.concatenate([voiced[breaks], [voiced[-1]]]) + 1
+
+    segments = []
+    for start, end in zip(starts * _FRAME_MS, ends * _FRAME_MS, strict=True):
+        for cursor in range(int(start), int(end), max_segment_ms):
+            segments.append((cursor, min(cursor + max_segment_ms, int(end))))
+    return segments
@@ -1,3 +1,4 @@
+import numpy as np
 import torch
 
 
@@ -8,9 +9,112 @@ def ctc_forced_align(
     target_lengths: torch.Tensor,
     blank: int = 0,
     ignore_id: int = -1,
+) -> torch.Tensor:
+    """Align a CTC label sequence to an emission (banded NumPy Viterbi).
+
+    Same contract as :func:`ctc_forced_align_reference`, but each sequence is aligned
+    independently with :func:`viterbi_align`: only the states that are reachable at frame
+    `t` *and* can still reach the final state are updated, and backpointers are stored as
+    one int8 per banded cell instead of a dense `(B, T, 2L + 3)` int64 tensor.
+    Frames beyond `input_lengths[b]` are filled with `blank`.
+    """
+    batch_size, input_time_size, _ = log_probs.size()
+    emissions = log_probs.detach().to("cpu", torch.float32).numpy()
+    targets_np = targets.detach().cpu().numpy().copy()
+    targets_np[targets_np == ignore_id] = blank
+    input_lengths_np = input_lengths.detach().cpu().numpy().reshape(-1)
+    target_lengths_np = target_lengths.detach().cpu().numpy().reshape(-1)
+
+    alignments = np.full((batch_size, input_time_size), blank, dtype=np.int64)
+    for b in range(batch_size):
+        num_frames = int(input_lengths_np[b])
+        tokens = targets_np[b, : int(target_lengths_np[b])]
+        alignments[b, :num_frames] = viterbi_align(emissions[b, :num_frames], tokens, blank)
+    return torch.from_numpy(alignments).to(log_probs.device)
+
+
+def viterbi_align(emission: np.ndarray, tokens: np.ndarray, blank: int = 0) -> np.ndarray:
+    """Viterbi CTC forced alignment of one sequence.
+
+    Args:
+        emission: log probabilities, shape `(T, C)`.
+        tokens: target token ids (no blanks), shape `(L,)`.
+        blank: blank token id.
+
+    Returns:
+        np.ndarray: per-frame label (token id or `blank`), shape `(T,)`.
+
+    Raises:
+        ValueError: the targets cannot be aligned within `T` frames.
+    """
+    num_frames = emission.shape[0]
+    num_states = 2 * len(tokens) + 1
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    labels = np.full(num_states, blank, dtype=np.int64)
+    labels[1::2] = tokens
+    # s-2 -> s transition is allowed between two different tokens only
+    can_skip = np.zeros(num_states, dtype=bool)
+    can_skip[2:] = labels[2:] != labels[:-2]
+
+    neg_inf = np.float32(-np.inf)
+    # two leading -inf cells so that s-1 / s-2 never index out of range
+    score = np.full(num_states + 2, neg_inf, dtype=np.float32)
+    score[2] = emission[0, blank]
+    if num_states > 1:
+        score[3] = emission[0, labels[1]]
+
+    lows = np.zeros(num_frames, dtype=np.int64)
+    backpointers: list[np.ndarray] = [np.zeros(0, dtype=np.int8)]
+    for t in range(1, num_frames):
+        # reachable from the start: s < 2(t+1); can still reach the end: s >= S - 2(T - t)
+        low = max(0, num_states - 2 * (num_frames - t))
+        high = min(num_states, 2 * t + 2)
+        lows[t] = low
+
+        stay = score[low + 2 : high + 2]
+        from_prev = score[low + 1 : high + 1]
+        from_skip = np.where(can_skip[low:high], score[low:high], neg_inf)
+        # ties keep the earlier candidate (stay < s-1 < s-2), like argmax in the reference
+        choice = (from_prev > stay).view(np.int8)
+        best = np.maximum(stay, from_prev)
+        skip_better = from_skip > best
+        np.maximum(best, from_skip, out=best)
+        choice = np.where(skip_better, np.int8(2), choice)
+
+        best += emission[t, labels[low:high]]
+        score[low + 2 : high + 2] = best
+        backpointers.append(choice)
+
+    final = num_states - 1
+    if num_states > 1 and score[final + 1] >= score[final + 2]:
+        final -= 1
+    if not np.isfinite(score[final + 2]):
+        raise ValueError(f"cannot align {len(tokens)} tokens within {num_frames} frames")
+
+    path = np.empty(num_frames, dtype=np.int64)
+    state = final
+    path[-1] = state
+    for t in range(num_frames - 1, 0, -1):
+        state -= int(backpointers[t][state - lows[t]])
+        path[t - 1] = state
+    return labels[path]
+
+
+def ctc_forced_align_reference(
+    log_probs: torch.Tensor,
+    targets: torch.Tensor,
+    input_lengths: torch.Tensor,
+    target_lengths: torch.Tensor,
+    blank: int = 0,
+    ignore_id: int = -1,
 ) -> torch.Tensor:
     """Align a CTC label sequence to an emission.
 
+    Dense reference implementation kept for equivalence tests and benchmarks;
+    use :func:`ctc_forced_align` instead.
+
     Args:
         log_probs (Tensor): log probability of CTC emission output.
             Tensor of shape `(B, T, C)`. where `B` is the batch size, `T` is the input length,
@@ -1,5 +1,6 @@
 import time
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 from funasr.losses.label_smoothing_loss import LabelSmoothingLoss
@@ -14,6 +15,41 @@ from torch import nn
 from src.SenseVoiceSmall.ctc_alignment import ctc_forced_align
 
 
+def ctc_greedy_tokens(best_path: np.ndarray, blank_id: int = 0) -> np.ndarray:
+    """Greedy CTC decode: collapse repeats in the frame-wise argmax and drop blanks."""
+    if best_path.size == 0:
+        return best_path
+    keep = np.empty(best_path.shape, dtype=bool)
+    keep[0] = True
+    np.not_equal(best_path[1:], best_path[:-1], out=keep[1:])
+    tokens = best_path[keep]
+    return tokens[tokens != blank_id]
+
+
+def group_alignment_timestamps(
+    alignment: np.ndarray, tokens: list[str], blank_id: int = 0
+) -> list[list]:
+    """Group a frame-level alignment into `[token, start_s, end_s]` runs.
+
+    Each (LFR) frame is 60 ms; boundaries are shifted back by 30 ms and clipped to
+    the speech frames.
+    """
+    num_frames = len(alignment)
+    if num_frames == 0:
+        return []
+    boundaries = np.flatnonzero(alignment[1:] != alignment[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [num_frames]))
+    is_token = alignment[starts] != blank_id
+
+    ts_left = np.maximum((starts[is_token] * 60 - 30) / 1000, 0)
+    ts_right = np.minimum((ends[is_token] * 60 - 30) / 1000, (num_frames * 60 - 30) / 1000)
+    return [
+        [token, left, right]
+        for token, left, right in zip(tokens, ts_left.tolist(), ts_right.tolist(), strict=False)
+    ]
+
+
 class SinusoidalPositionEncoder(torch.nn.Module):
     """ """
 
@@ -898,62 +934,59 @@ class SenseVoiceSmall(nn.Module):
             key = key[0]
         if len(key) < b:
             key = key * b
-        for i in range(b):
-            x = ctc_logits[i, : encoder_out_lens[i].item(), :]
-            yseq = x.argmax(dim=-1)
-            yseq = torch.unique_consecutive(yseq, dim=-1)
 
-            ibest_writer = None
-            if kwargs.get("output_dir") is not None:
-                if not hasattr(self, "writer"):
-                    self.writer = DatadirWriter(kwargs.get("output_dir"))
-                ibest_writer = self.writer["1best_recog"]
+        # One argmax and one host copy per batch; decoding and grouping run in numpy
+        lengths = encoder_out_lens.cpu().numpy().astype(np.int64)
+        best_paths = ctc_logits.argmax(dim=-1).cpu().numpy()
+        token_ids = [
+            ctc_greedy_tokens(best_paths[i, : lengths[i]], self.blank_id) for i in range(b)
+        ]
 
-            mask = yseq != self.blank_id
-            token_int = yseq[mask].tolist()
+        ibest_writer = None
+        if kwargs.get("output_dir") is not None:
+            if not hasattr(self, "writer"):
+                self.writer = DatadirWriter(kwargs.get("output_dir"))
+            ibest_writer = self.writer["1best_recog"]
 
+        texts = []
+        for i in range(b):
             # Change integer-ids to tokens
-            text = tokenizer.decode(token_int)
+            text = tokenizer.decode(token_ids[i].tolist())
             if ibest_writer is not None:
                 ibest_writer["text"][key[i]] = text
+            texts.append(text)
+
+        if not output_timestamp:
+            return [{"key": key[i], "text": texts[i]} for i in range(b)], meta_data
+
+        # Timestamps: one softmax per batch; the first 4 frames are the lid/emo/event/itn
+        # queries and are excluded from the alignment
+        speech_probs = self.ctc.softmax(encoder_out)[:, 4:, :]
+        pred = speech_probs.argmax(-1)
+        speech_probs[..., self.blank_id].masked_fill_(pred == self.blank_id, 0)
+
+        speech_lengths = np.maximum(lengths - 4, 0)
+        targets = [ids[4:] for ids in token_ids]
+        target_lengths = np.array([len(t) for t in targets], dtype=np.int64)
+        padded_targets = np.full((b, max(1, int(target_lengths.max()))), self.blank_id)
+        for i, t in enumerate(targets):
+            padded_targets[i, : len(t)] = t
+
+        align = ctc_forced_align(
+            speech_probs.float(),
+            torch.from_numpy(padded_targets).long().to(speech_probs.device),
+            torch.from_numpy(speech_lengths).to(speech_probs.device),
+            torch.from_numpy(target_lengths).to(speech_probs.device),
+            ignore_id=self.ignore_id,
+        )
+        align = align.cpu().numpy()
 
-            if output_timestamp:
-                from itertools import groupby
-
-                timestamp = []
-                tokens = tokenizer.text2tokens(text)[4:]
-
-                logits_speech = self.ctc.softmax(encoder_out)[i, 4 : encoder_out_lens[i].item(), :]
-
-                pred = logits_speech.argmax(-1).cpu()
-                logits_speech[pred == self.blank_id, self.blank_id] = 0
-
-                align = ctc_forced_align(
-                    logits_speech.unsqueeze(0).float(),
-                    torch.Tensor(token_int[4:]).unsqueeze(0).long().to(logits_speech.device),
-                    (encoder_out_lens - 4).long(),
-                    torch.tensor(len(token_int) - 4).unsqueeze(0).long().to(logits_speech.device),
-                    ignore_id=self.ignore_id,
-                )
-
-                pred = groupby(align[0, : encoder_out_lens[0]])
-                _start = 0
-                token_id = 0
-                ts_max = encoder_out_lens[i] - 4
-                for pred_token, pred_frame in pred:
-                    _end = _start + len(list(pred_frame))
-                    if pred_token != 0:
-                        ts_left = max((_start * 60 - 30) / 1000, 0)
-                        ts_right = min((_end * 60 - 30) / 1000, (ts_max * 60 - 30) / 1000)
-                        timestamp.append([tokens[token_id], ts_left, ts_right])
-                        token_id += 1
-                    _start = _end
-
-                result_i = {"key": key[i], "text": text, "timestamp": timestamp}
-                results.append(result_i)
-            else:
-                result_i = {"key": key[i], "text": text}
-                results.append(result_i)
+        for i in range(b):
+            tokens = tokenizer.text2tokens(texts[i])[4:]
+            timestamp = group_alignment_timestamps(
+                align[i, : speech_lengths[i]], tokens, self.blank_id
+            )
+            results.append({"key": key[i], "text": texts[i], "timestamp": timestamp})
         return results, meta_data
 
     def export(self, **kwargs):
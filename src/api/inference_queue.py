@@ -11,7 +11,7 @@ from asyncio import Queue
 from contextlib import suppress
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from src.core.exceptions import TaskCancelledException
 from src.core.history import get_history_manager
@@ -19,6 +19,10 @@ from src.utils.config import get_config
 from src.utils.helpers.task_manager import get_task_manager
 from src.utils.logging.logger import get_logger
 
+if TYPE_CHECKING:
+    from src.services.asr.base import PartialTranscript
+    from src.services.asr.compaction import SilenceCompaction
+
 logger = get_logger(__name__)
 
 
@@ -56,6 +60,10 @@ class InferenceQueue:
         self.subtitle_processor = None
         self.multipart_processor = None
         self.task_manager = get_task_manager()
+        # 正在执行的任务 -> 任务状态存储（供 ASR 增量转录回调写入）
+        self._active_stores: dict[str, dict] = {}
+        # 正在执行的任务 -> 静音压缩结果（压缩比例写入任务结果）
+        self._compactions: dict[str, SilenceCompaction] = {}
 
         logger.info("推理队列初始化完成")
 
@@ -64,6 +72,8 @@ class InferenceQueue:
             from src.core.processors.audio import AudioProcessor
 
             self.audio_processor = AudioProcessor()
+            self.audio_processor.partial_transcript_listener = self._on_partial_transcript
+            self.audio_processor.compaction_listener = self._on_compaction
         return self.audio_processor
 
     def _get_video_processor(self):
@@ -71,6 +81,10 @@ class InferenceQueue:
             from src.core.processors.video import VideoProcessor
 
             self.video_processor = VideoProcessor()
+            self.video_processor.audio_processor.partial_transcript_listener = (
+                self._on_partial_transcript
+            )
+            self.video_processor.audio_processor.compaction_listener = self._on_compaction
         return self.video_processor
 
     def _get_subtitle_processor(self):
@@ -78,6 +92,7 @@ class InferenceQueue:
             from src.core.processors.subtitle import SubtitleProcessor
 
             self.subtitle_processor = SubtitleProcessor()
+            self.subtitle_processor.compaction_listener = self._on_compaction
         return self.subtitle_processor
 
     def _get_multipart_processor(self):
@@ -163,6 +178,43 @@ class InferenceQueue:
         )
         self.task_manager.remove_task(task_id)
 
+    def _on_partial_transcript(self, task_id: str, partial: "PartialTranscript") -> None:
+        """
+        ASR 增量转录回调：把已识别文本与进度写入任务状态
+
+        在推理线程中调用；只替换字典中的值，轮询接口读到的总是某一次完整的快照。
+        """
+        tasks_store = self._active_stores.get(task_id)
+        task_info = tasks_store.get(task_id) if tasks_store is not None else None
+        if task_info is None or task_info.get("status") != "processing":
+            return
+        task_info["partial_transcript"] = partial.text
+        task_info["asr_progress"] = {
+            "completed_s": round(partial.completed_s, 2),
+            "total_s": round(partial.total_s, 2),
+            "fraction": round(partial.fraction, 4),
+        }
+        task_info["message"] = f"语音识别中 {partial.fraction:.0%}"
+
+    def _on_compaction(self, task_id: str, compaction: "SilenceCompaction") -> None:
+        """静音压缩回调：记录压缩结果，并把压缩统计写入任务状态"""
+        tasks_store = self._active_stores.get(task_id)
+        task_info = tasks_store.get(task_id) if tasks_store is not None else None
+        if task_info is None:
+            return
+        self._compactions[task_id] = compaction
+        task_info["asr_compaction"] = compaction.summary()
+
+    def _attach_compaction(self, task_id: str, tasks_store: dict) -> None:
+        """任务完成时把静音压缩统计附加到任务结果"""
+        compaction = self._compactions.get(task_id)
+        task_info = tasks_store.get(task_id, {})
+        if compaction is None or task_info.get("status") != "completed":
+            return
+        result = task_info.get("result")
+        if isinstance(result, dict):
+            result["asr_compaction"] = compaction.summary()
+
     def _extract_output_dir(self, output_data: Any) -> str:
         if isinstance(output_data, dict):
             return output_data.get("output_dir", "")
@@ -257,6 +309,7 @@ class InferenceQueue:
 
                     # 更新状态为处理中
                     tasks_store[task_id]["status"] = "processing"
+                    self._active_stores[task_id] = tasks_store
 
                     # 根据类型调用处理函数
                     if task_type == "bilibili":
@@ -277,6 +330,7 @@ class InferenceQueue:
                     if tasks_store.get(task_id, {}).get("status") == "cancelled":
                         logger.info(f"任务已取消: {task_id}")
                     else:
+                        self._attach_compaction(task_id, tasks_store)
                         logger.info(f"任务完成: {task_id}")
 
                 except TaskCancelledException as e:
@@ -294,6 +348,8 @@ class InferenceQueue:
                     )
 
                 finally:
+                    self._active_stores.pop(task_id, None)
+                    self._compactions.pop(task_id, None)
                     self.queue.task_done()
 
             except asyncio.CancelledError:
@@ -7,10 +7,11 @@
 import json
 import os
 import shutil
-from typing import Any
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
 from src.core.exceptions import TaskCancelledException
-from src.services.asr import transcribe_audio
+from src.services.asr import PartialTranscript, transcribe_audio
 from src.services.download.bilibili_downloader import BiliVideoFile, new_local_bili_file
 from src.text_arrangement.summary_by_llm import summarize_text
 from src.text_arrangement.text_exporter import text_to_img_or_pdf
@@ -21,6 +22,9 @@ from src.utils.helpers.timer import Timer
 
 from .base import BaseProcessor
 
+if TYPE_CHECKING:
+    from src.services.asr.compaction import SilenceCompaction
+
 
 class AudioProcessor(BaseProcessor):
     """音频处理器"""
@@ -28,6 +32,10 @@ class AudioProcessor(BaseProcessor):
     def __init__(self):
         super().__init__()
         self.config = get_config()
+        # 增量转录监听器 (task_id, PartialTranscript)，由推理队列注入以更新任务状态
+        self.partial_transcript_listener: Callable[[str, PartialTranscript], None] | None = None
+        # 静音压缩监听器 (task_id, SilenceCompaction)，用于在任务结果中报告压缩比例
+        self.compaction_listener: Callable[[str, SilenceCompaction], None] | None = None
 
     def _validate_inputs(
         self,
@@ -111,10 +119,18 @@ class AudioProcessor(BaseProcessor):
         timer = Timer()
         timer.start()
 
+        listener = self.partial_transcript_listener
+        compaction_listener = self.compaction_listener
         audio_text = transcribe_audio(
             audio_path=audio_file.path,
             model_type=self.config.asr.asr_model,
             task_id=task_id,
+            on_partial=(lambda partial: listener(task_id, partial)) if listener else None,
+            on_compaction=(
+                (lambda compaction: compaction_listener(task_id, compaction))
+                if compaction_listener
+                else None
+            ),
         )
 
         # 保存原始文本
@@ -5,7 +5,9 @@
 """
 
 import os
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from src.core.exceptions import TaskCancelledException
 from src.services.download.bilibili_downloader import extract_audio_from_video
@@ -18,12 +20,20 @@ from src.utils.config import get_config
 
 from .base import BaseProcessor
 
+if TYPE_CHECKING:
+    from src.services.asr.compaction import SilenceCompaction
+
 # 延迟导入配置，避免循环导入
 
 
 class SubtitleProcessor(BaseProcessor):
     """字幕处理器"""
 
+    def __init__(self):
+        super().__init__()
+        # 静音压缩监听器 (task_id, SilenceCompaction)，用于在任务结果中报告压缩比例
+        self.compaction_listener: Callable[[str, SilenceCompaction], None] | None = None
+
     def process_simple(self, video_file: str) -> tuple[str, str]:
         """
         生成视频字幕并硬编码到视频
@@ -56,7 +66,7 @@ class SubtitleProcessor(BaseProcessor):
         pause_threshold: float = 0.6,
         max_chars: int = 16,
         batch_size_s: int = 5,
-        paraformer_chunk_size_s: int = 30,
+        sensevoice_batch_slices: int = 8,
         task_id: str | None = None,
     ) -> tuple[str | None, str | None, str]:
         """
@@ -74,7 +84,7 @@ class SubtitleProcessor(BaseProcessor):
             pause_threshold: 停顿阈值（秒）
             max_chars: 每段最大字符数
             batch_size_s: SenseVoice 批处理大小（秒）
-            paraformer_chunk_size_s: Paraformer 分块大小（秒）
+            sensevoice_batch_slices: SenseVoice 每次推理合并的片段数
             task_id: 任务ID，用于终止控制
 
         Returns:
@@ -102,7 +112,7 @@ class SubtitleProcessor(BaseProcessor):
             # 提取音频（如果是视频）
             if is_video:
                 self.logger.info("检测到视频文件，正在提取音频...")
-                audio_file = extract_audio_from_video(media_file)
+                audio_file = extract_audio_from_video(media_file, task_id=task_id)
             else:
                 self.logger.info("检测到音频文件，直接使用")
                 audio_file = media_file
@@ -116,7 +126,7 @@ class SubtitleProcessor(BaseProcessor):
                 pause_threshold=pause_threshold,
                 max_chars_per_segment=max_chars,
                 batch_size_s=batch_size_s,
-                paraformer_chunk_size_s=paraformer_chunk_size_s,
+                sensevoice_batch_slices=sensevoice_batch_slices,
                 temp_dir=temp_dir,
             )
 
@@ -134,6 +144,13 @@ class SubtitleProcessor(BaseProcessor):
             self.logger.info(
                 f"生成字幕文件，格式: {file_type}, 模型: {model}, 分段策略: {segmenter_type}"
             )
+            compactions: list[SilenceCompaction] = []
+
+            def on_compaction(compaction: "SilenceCompaction") -> None:
+                compactions.append(compaction)
+                if self.compaction_listener is not None:
+                    self.compaction_listener(task_id, compaction)
+
             subtitle_path = generate_subtitle_file(
                 audio_path=audio_file,
                 file_type=file_type,
@@ -141,7 +158,7 @@ class SubtitleProcessor(BaseProcessor):
                 segmenter_type=segmenter_type,
                 config=config,
                 api_server=api_server,
-                paraformer_chunk_size_s=paraformer_chunk_size_s,
+                on_compaction=on_compaction,
             )
 
             self._check_cancellation(task_id)
@@ -158,7 +175,7 @@ class SubtitleProcessor(BaseProcessor):
                 else:
                     self.logger.info("正在硬编码字幕到视频...")
                     video_with_subtitle = encode_subtitle_to_video(
-                        video_path=media_file, srt_path=subtitle_path
+                        video_path=media_file, srt_path=subtitle_path, task_id=task_id
                     )
 
             self._check_cancellation(task_id)
@@ -170,6 +187,11 @@ class SubtitleProcessor(BaseProcessor):
                 f"   - ASR 模型: {model}",
                 f"   - 分段策略: {segmenter_type}",
             ]
+            if compactions:
+                info_lines.append(
+                    f"   - 静音压缩: {compactions[0].original_s:.1f}s -> "
+                    f"{compactions[0].compacted_s:.1f}s ({compactions[0].ratio:.1%})"
+                )
 
             if video_with_subtitle:
                 info_lines.append(f"带字幕视频已生成: {video_with_subtitle}")
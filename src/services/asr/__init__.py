@@ -4,14 +4,19 @@ ASR服务模块
 提供FunASR模型(SenseVoice, Paraformer)的封装
 """
 
-from .base import BaseASRService
+from .base import BaseASRService, PartialTranscript
+from .compaction import SilenceCompaction, TimeMap
 from .factory import get_asr_service, transcribe_audio
 
 __all__ = [
     "BaseASRService",
+    "PartialTranscript",
+    "SilenceCompaction",
+    "TimeMap",
     "SenseVoiceService",
     "ParaformerService",
     "WhisperCppService",
+    "WhisperServerService",
     "get_asr_service",
     "transcribe_audio",
 ]
@@ -30,6 +35,10 @@ def __getattr__(name):
         from .whisper_cpp import WhisperCppService
 
         return WhisperCppService
+    if name == "WhisperServerService":
+        from .whisper_server import WhisperServerService
+
+        return WhisperServerService
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
@@ -0,0 +1,252 @@
+"""
+预处理音频磁盘缓存
+
+非 16kHz / mono / PCM16 WAV 的输入每次都要经 ffmpeg 转码；重试、同一媒体再生成字幕、
+换 LLM 重新处理都会重复这一开销。本缓存按源文件指纹保存转码后的 WAV，命中时直接内存映射。
+
+- 键：源文件 路径 + 大小 + mtime（stat，默认）或文件内容 SHA-256（content）
+- 容量：超出磁盘配额时按最近使用时间（文件 mtime，命中时刷新）淘汰
+- 并发：以文件系统为唯一状态，写入先写临时文件再原子替换；同一键的转码通过
+  进程内锁 + 文件锁（POSIX flock）串行化，多个工作进程不会重复转码同一文件
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import re
+import threading
+import uuid
+import wave
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows：仅进程内互斥，跨进程最坏情况是重复转码
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# 目标格式写入键中，格式变化时旧缓存自然失效
+_FORMAT_TAG = "16000Hz/mono/s16le"
+_HASH_CHUNK = 1 << 20
+_WAV_SUFFIX = ".wav"
+_LOCK_SUFFIX = ".lock"
+# 缓存条目文件名：64 位十六进制键 + 后缀；目录中的其他文件一律不动
+_KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class PreprocessedAudioCache:
+    """转码后 WAV 的磁盘缓存（LRU + 配额，多进程安全）"""
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int, key_mode: str = "stat"):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.key_mode = key_mode
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def fingerprint(self, source: str | Path) -> str:
+        """源文件指纹（stat：绝对路径 + 大小 + mtime_ns；content：文件内容哈希）"""
+        source = Path(source)
+        digest = hashlib.sha256(f"{_FORMAT_TAG}|{self.key_mode}|".encode())
+        if self.key_mode == "content":
+            with open(source, "rb") as f:
+                while chunk := f.read(_HASH_CHUNK):
+                    digest.update(chunk)
+        else:
+            stat = source.stat()
+            digest.update(f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """同一键的互斥（进程内 + 跨进程），用于「查缓存 → 转码 → 写缓存」单飞"""
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(key, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.cache_dir / f"{key}{_LOCK_SUFFIX}", "a+b") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key: str) -> Path | None:
+        """命中时返回缓存 WAV 路径并刷新其最近使用时间"""
+        path = self._wav_path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, samples: np.ndarray, sample_rate: int = 16000) -> Path | None:
+        """写入 int16 PCM，超出配额时淘汰最久未使用的条目；失败时只记录日志"""
+        size = int(samples.nbytes) + 44
+        if size > self.max_bytes:
+            logger.debug(f"预处理音频超过缓存配额，跳过缓存: {size} bytes")
+            return None
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with wave.open(str(tmp_path), "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(sample_rate)
+                wav.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+            return self._commit(key, tmp_path)
+        except Exception as e:
+            self._unlink(tmp_path)
+            logger.warning(f"写入预处理音频缓存失败: {e}")
+            return None
+
+    def adopt(self, key: str, wav_path: Path) -> Path | None:
+        """将已转码好的 WAV 文件移入缓存（同一文件系统内为重命名），失败时返回 None"""
+        if wav_path.stat().st_size > self.max_bytes:
+            return None
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.replace(wav_path, tmp_path)
+        except OSError:
+            import shutil
+
+            try:
+                shutil.move(str(wav_path), tmp_path)
+            except Exception as e:
+                logger.warning(f"移入预处理音频缓存失败: {e}")
+                return None
+        return self._commit(key, tmp_path)
+
+    def discard(self, key: str) -> None:
+        """删除损坏或无效的条目"""
+        self._unlink(self._wav_path(key))
+
+    def _cache_files(self, suffix: str) -> Iterator[Path]:
+        """枚举本缓存写入的文件（文件名须为缓存键格式，避免误删目录中的其他文件）"""
+        for path in self.cache_dir.glob(f"*{suffix}"):
+            if _KEY_PATTERN.fullmatch(path.name[: -len(suffix)]):
+                yield path
+
+    def enforce_quota(self, keep: str | None = None) -> int:
+        """按最近使用时间淘汰，直到总大小不超过配额；返回淘汰的条目数"""
+        entries = []
+        for path in self._cache_files(_WAV_SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            # POSIX 下已被内存映射的文件删除后仍可继续读取；Windows 下删除失败则跳过
+            if self._unlink(path):
+                total -= size
+                evicted += 1
+                # 锁文件（0 字节）保留：其他进程可能正持有或等待该锁，删除后新打开的进程
+                # 会拿到另一个 inode 上的锁，破坏同一源文件只转码一次的保证
+                logger.debug(f"预处理音频缓存淘汰: {path.name}")
+        self.evictions += evicted
+        return evicted
+
+    def purge(self) -> int:
+        """清空缓存（含锁文件，应在没有进行中的转码时调用），返回清除的条目数"""
+        count = 0
+        for path in self._cache_files(_WAV_SUFFIX):
+            if self._unlink(path):
+                count += 1
+        for path in self._cache_files(_LOCK_SUFFIX):
+            self._unlink(path)
+        logger.info(f"已清空预处理音频缓存，共 {count} 条")
+        return count
+
+    def stats(self) -> dict[str, Any]:
+        sizes = []
+        for path in self._cache_files(_WAV_SUFFIX):
+            try:
+                sizes.append(path.stat().st_size)
+            except OSError:
+                # 扫描期间被其他进程淘汰
+                continue
+        lookups = self.hits + self.misses
+        return {
+            "cache_dir": str(self.cache_dir),
+            "key_mode": self.key_mode,
+            "entries": len(sizes),
+            "total_bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _commit(self, key: str, tmp_path: Path) -> Path | None:
+        path = self._wav_path(key)
+        try:
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self._unlink(tmp_path)
+            logger.warning(f"写入预处理音频缓存失败: {e}")
+            return None
+        self.enforce_quota(keep=key)
+        return path
+
+    def _wav_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{_WAV_SUFFIX}"
+
+    @staticmethod
+    def _unlink(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError:
+            logger.debug(f"Failed to remove cache file: {path}")
+            return False
+
+
+_audio_cache: PreprocessedAudioCache | None = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_preprocessed_audio_cache() -> PreprocessedAudioCache | None:
+    """获取全局预处理音频缓存（未启用时返回 None）"""
+    global _audio_cache
+    config = get_config()
+    if not config.asr.preprocess_cache_enabled:
+        return None
+    if _audio_cache is None:
+        with _audio_cache_lock:
+            if _audio_cache is None:
+                cache_dir = config.asr.preprocess_cache_dir or (
+                    (config.paths.temp_dir or Path("./temp")) / "asr_preprocess_cache"
+                )
+                _audio_cache = PreprocessedAudioCache(
+                    cache_dir=cache_dir,
+                    max_bytes=config.asr.preprocess_cache_max_mb * 1024 * 1024,
+                    key_mode=config.asr.preprocess_cache_key,
+                )
+    return _audio_cache
@@ -4,10 +4,107 @@ ASR服务基类接口
 定义ASR服务的通用接口
 """
 
+from __future__ import annotations
+
+import gc
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from src.utils.logging.logger import get_logger
 
+if TYPE_CHECKING:
+    from .preprocess import DecodedAudio
+
+
+def join_segment_texts(texts: list[str]) -> str:
+    """
+    拼接逐段识别的文本
+
+    中文直接相连；两侧均为拉丁字母/数字时补一个空格，避免英文单词粘连。
+    """
+    joined = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if (
+            joined
+            and joined[-1].isascii()
+            and joined[-1].isalnum()
+            and text[0].isascii()
+            and text[0].isalnum()
+        ):
+            joined += " "
+        joined += text
+    return joined
+
+
+@dataclass(frozen=True)
+class PartialTranscript:
+    """增量转录快照：已完成部分的有序文本与进度"""
+
+    text: str
+    completed_s: float
+    total_s: float
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.completed_s / self.total_s) if self.total_s > 0 else 1.0
+
+
+PartialTranscriptCallback = Callable[[PartialTranscript], None]
+
+
+class PartialTranscriptTracker:
+    """
+    按语音段（或分片）收集识别结果，每完成一部分就回调一次当前快照（线程安全）
+
+    批量推理按时长分桶，完成顺序与时间顺序不同；快照文本始终按时间顺序拼接已完成的部分。
+    """
+
+    def __init__(
+        self,
+        spans: Sequence[tuple[int, int]],
+        on_partial: PartialTranscriptCallback | None,
+        logger=None,
+    ):
+        self._durations_ms = [max(0, end - start) for start, end in spans]
+        self._texts: list[str | None] = [None] * len(spans)
+        self._completed_ms = 0
+        self._on_partial = on_partial
+        self._lock = threading.Lock()
+        self._logger = logger or get_logger(__name__)
+
+    @property
+    def total_s(self) -> float:
+        return sum(self._durations_ms) / 1000
+
+    def update(self, indices: Sequence[int], texts: Sequence[str]) -> None:
+        """记录一批已完成部分的文本并回调"""
+        if self._on_partial is None:
+            return
+        with self._lock:
+            for idx, text in zip(indices, texts, strict=True):
+                if self._texts[idx] is None:
+                    self._completed_ms += self._durations_ms[idx]
+                self._texts[idx] = text
+            snapshot = PartialTranscript(
+                text=join_segment_texts([t for t in self._texts if t]),
+                completed_s=self._completed_ms / 1000,
+                total_s=self.total_s,
+            )
+        try:
+            self._on_partial(snapshot)
+        except Exception as e:
+            # 进度回调失败不应中断推理
+            self._logger.warning(f"增量转录回调失败: {e}")
+
 
 class BaseASRService(ABC):
     """ASR服务基类"""
@@ -20,6 +117,14 @@ class BaseASRService(ABC):
         self.task_manager = get_task_manager()
         self.model = None
 
+        # 模型生命周期（供模型池统计与淘汰）
+        self._load_lock = threading.RLock()
+        self.last_used: float | None = None
+        self.loaded_at: float | None = None
+        self.load_seconds: float | None = None
+        self._resident_bytes: int | None = None
+        self.on_model_loaded: Callable[[BaseASRService], None] | None = None
+
     @abstractmethod
     def load_model(self):
         """
@@ -48,6 +153,125 @@ class BaseASRService(ABC):
         """
         pass
 
+    def ensure_model_loaded(self) -> bool:
+        """
+        线程安全地加载模型（single-flight：并发调用时只有一个线程真正加载）
+
+        同时记录加载耗时与加载前后的 RSS 增量，作为模型常驻内存的近似值。
+
+        Returns:
+            bool: 本次调用是否实际执行了加载
+        """
+        from src.utils.helpers.memory import get_process_rss_bytes
+
+        self.last_used = time.time()
+        if self.is_model_loaded():
+            return False
+
+        with self._load_lock:
+            if self.is_model_loaded():
+                return False
+            rss_before = get_process_rss_bytes()
+            start = time.perf_counter()
+            self.load_model()
+            self.load_seconds = time.perf_counter() - start
+            rss_after = get_process_rss_bytes()
+            self._resident_bytes = (
+                max(0, rss_after - rss_before)
+                if rss_before is not None and rss_after is not None
+                else None
+            )
+            self.loaded_at = time.time()
+
+        if self.on_model_loaded is not None:
+            self.on_model_loaded(self)
+        return True
+
+    def is_model_loaded(self) -> bool:
+        """模型是否已常驻内存"""
+        return self.model is not None
+
+    def get_resident_bytes(self) -> int | None:
+        """模型常驻内存（字节，近似值；未加载或无法测量时为 None）"""
+        return self._resident_bytes if self.is_model_loaded() else None
+
+    def unload_model(self) -> None:
+        """释放模型（下次使用时重新加载）"""
+        with self._load_lock:
+            self.model = None
+            self.loaded_at = None
+            self._resident_bytes = None
+        gc.collect()
+
+    def transcribe_decoded(self, audio: DecodedAudio, task_id: str | None = None) -> str:
+        """
+        转录已解码的内存音频
+
+        默认实现将缓冲写为临时 WAV 再调用 transcribe()，适用于只接受文件输入的后端；
+        可直接消费内存数组的子类应覆盖此方法以避免落盘。
+
+        Args:
+            audio: 解码后的 16kHz / mono PCM 音频
+            task_id: 任务ID，用于取消控制
+
+        Returns:
+            str: 转录文本
+        """
+        from src.utils.config import get_config
+
+        from .preprocess import cleanup_preprocessed_audio
+
+        config = get_config()
+        temp_dir = (config.paths.temp_dir or Path("./temp")) / "asr_preprocess"
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        stem = Path(audio.source).stem or "audio"
+        temp_path = audio.write_wav(temp_dir / f"{stem}.{uuid.uuid4().hex}.wav")
+        try:
+            return self.transcribe(str(temp_path), task_id)
+        finally:
+            if not config.debug_flag:
+                cleanup_preprocessed_audio(temp_path)
+
+    def transcribe_segments(
+        self,
+        audio: DecodedAudio,
+        segments: list[tuple[int, int]],
+        task_id: str | None = None,
+        on_partial: PartialTranscriptCallback | None = None,
+    ) -> str:
+        """
+        只对预先计算的语音段推理（VAD 结果复用，非语音部分不再参与计算）
+
+        默认实现逐段调用 transcribe_decoded() 并拼接文本；可批量推理的子类应覆盖此方法。
+
+        Args:
+            audio: 解码后的 16kHz / mono PCM 音频
+            segments: 语音段 [(start_ms, end_ms), ...]，按时间排序
+            task_id: 任务ID，用于取消控制
+            on_partial: 增量转录回调，每完成一部分语音段调用一次
+
+        Returns:
+            str: 转录文本
+        """
+        tracker = PartialTranscriptTracker(segments, on_partial, self.logger)
+        texts = []
+        for idx, (start_ms, end_ms) in enumerate(segments):
+            self.check_cancellation(task_id)
+            texts.append(self.transcribe_decoded(audio.segment(start_ms, end_ms), task_id))
+            tracker.update([idx], [texts[-1]])
+        return join_segment_texts(texts)
+
+    def get_cache_signature(self) -> dict:
+        """
+        返回影响转录结果的模型签名（模型、版本、推理参数）
+
+        用于构造转录缓存键，子类应覆盖以包含自身的模型与推理参数。
+
+        Returns:
+            dict: 可 JSON 序列化的签名字典
+        """
+        return {"service": self.__class__.__name__}
+
     def check_cancellation(self, task_id: str | None) -> None:
         """
         检查任务是否被取消
@@ -0,0 +1,273 @@
+"""
+FunASR batch_size_s 自动选择
+
+batch_size_s 决定 AutoModel.generate 每个批次送入模型的音频总时长，推理激活内存大致与其成正比。
+按 可用内存 × BATCH_MEMORY_FRACTION / 每秒激活开销 选择批次时长，并夹在
+[BATCH_SIZE_MIN_S, BATCH_SIZE_MAX_S] 与音频时长之间；每次推理后用实测峰值内存更新每秒开销，
+OOM 时减半重试并记住该上限。
+"""
+
+from __future__ import annotations
+
+import gc
+import threading
+from collections.abc import Callable
+from typing import TypeVar
+
+from src.utils.config import get_config
+from src.utils.helpers.memory import (
+    get_available_memory_bytes,
+    get_peak_rss_bytes,
+    get_process_rss_bytes,
+)
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_MB = 1024 * 1024
+
+# 每秒音频的推理激活内存内置估计（fp32 CPU 实测量级，偏保守）
+_DEFAULT_ACTIVATION_BYTES_PER_S = {
+    "paraformer": 8 * _MB,
+    "sense_voice": 12 * _MB,
+}
+_FALLBACK_ACTIVATION_BYTES_PER_S = 12 * _MB
+
+_OOM_MARKERS = ("out of memory", "can't allocate memory", "not enough memory")
+
+
+def is_out_of_memory_error(error: BaseException) -> bool:
+    """判断异常是否为内存不足（MemoryError、torch OutOfMemoryError 或分配失败的 RuntimeError）"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, MemoryError) or type(error).__name__ == "OutOfMemoryError":
+            return True
+        if any(marker in str(error).lower() for marker in _OOM_MARKERS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class BatchSizeTuner:
+    """
+    按模型记录每秒激活开销与 OOM 上限，为每次 generate 调用选择 batch_size_s（线程安全）
+    """
+
+    def __init__(
+        self,
+        memory_fraction: float = 0.5,
+        min_s: int = 30,
+        max_s: int = 900,
+        activation_bytes_per_s: float = 0,
+    ):
+        self.memory_fraction = memory_fraction
+        self.min_s = max(1, int(min_s))
+        self.max_s = max(self.min_s, int(max_s))
+        self._configured_cost = activation_bytes_per_s
+        self._measured_cost: dict[str, float] = {}
+        self._ceiling_s: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def activation_bytes_per_s(self, model_name: str) -> float:
+        """每秒激活开销：配置值 > 实测值 > 内置估计"""
+        if self._configured_cost > 0:
+            return self._configured_cost
+        with self._lock:
+            measured = self._measured_cost.get(model_name)
+        if measured:
+            return measured
+        return _DEFAULT_ACTIVATION_BYTES_PER_S.get(model_name, _FALLBACK_ACTIVATION_BYTES_PER_S)
+
+    def choose(self, model_name: str, duration_s: float, device: str = "cpu") -> int:
+        """
+        选择 batch_size_s
+
+        Args:
+            model_name: 模型类型（paraformer / sense_voice）
+            duration_s: 待转录音频时长（秒），未知时传 0
+            device: 推理设备，cuda 设备按显存计算
+
+        Returns:
+            int: 批次时长（秒）
+        """
+        available = _get_device_available_bytes(device)
+        cost = self.activation_bytes_per_s(model_name)
+        with self._lock:
+            ceiling = self._ceiling_s.get(model_name, self.max_s)
+
+        if available is None:
+            batch_s = ceiling
+            reason = "无法获取可用内存"
+        else:
+            batch_s = int(available * self.memory_fraction / cost)
+            reason = (
+                f"可用内存 {available / _MB:.0f}MB × {self.memory_fraction:g}，"
+                f"激活 {cost / _MB:.1f}MB/s"
+            )
+        batch_s = min(batch_s, ceiling)
+        if duration_s > 0:
+            # 超过音频时长的批次不会带来收益
+            batch_s = min(batch_s, int(duration_s) + 1)
+        batch_s = max(self.min_s, batch_s)
+        logger.info(
+            f"{model_name}: batch_size_s={batch_s}（{reason}，音频 {duration_s:.0f}s，"
+            f"上限 {ceiling}s）"
+        )
+        return batch_s
+
+    def run(
+        self,
+        model_name: str,
+        duration_s: float,
+        infer: Callable[[int], T],
+        device: str = "cpu",
+    ) -> T:
+        """
+        以自动选择的 batch_size_s 调用 infer，OOM 时减半重试直到 BATCH_SIZE_MIN_S
+
+        Args:
+            model_name: 模型类型
+            duration_s: 音频时长（秒）
+            infer: 以 batch_size_s 为参数的推理函数
+            device: 推理设备
+
+        Raises:
+            原始异常：非 OOM 错误，或已降到下限仍然 OOM
+        """
+        batch_s = self.choose(model_name, duration_s, device)
+        while True:
+            probe = _MemoryProbe(device)
+            try:
+                result = infer(batch_s)
+            except Exception as e:
+                if not is_out_of_memory_error(e) or batch_s <= self.min_s:
+                    raise
+                smaller = max(self.min_s, batch_s // 2)
+                logger.warning(
+                    f"{model_name}: batch_size_s={batch_s} 内存不足，减小到 {smaller}s 重试: {e}"
+                )
+                with self._lock:
+                    self._ceiling_s[model_name] = smaller
+                _release_memory(device)
+                batch_s = smaller
+                continue
+            self._record(model_name, probe.peak_increase(), min(batch_s, duration_s or batch_s))
+            return result
+
+    def _record(self, model_name: str, peak_bytes: int | None, processed_s: float) -> None:
+        """用实测峰值内存增量更新每秒激活开销（取观测最大值，偏保守）"""
+        if not peak_bytes or processed_s <= 0:
+            return
+        cost = peak_bytes / processed_s
+        with self._lock:
+            previous = self._measured_cost.get(model_name, 0.0)
+            if cost > previous:
+                self._measured_cost[model_name] = cost
+                logger.debug(f"{model_name}: 实测激活开销更新为 {cost / _MB:.1f}MB/s")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._measured_cost.clear()
+            self._ceiling_s.clear()
+
+
+class _MemoryProbe:
+    """测量一次推理的峰值内存增量：CUDA 用 torch 峰值统计，CPU 用进程峰值 RSS"""
+
+    def __init__(self, device: str):
+        self.device = device
+        self.cuda = str(device).startswith("cuda")
+        self.baseline: int | None = None
+        self.peak_before: int | None = None
+        if self.cuda:
+            try:
+                import torch
+
+                torch.cuda.reset_peak_memory_stats(device)
+                self.baseline = torch.cuda.memory_allocated(device)
+            except Exception:
+                self.baseline = None
+        else:
+            self.baseline = get_process_rss_bytes()
+            self.peak_before = get_peak_rss_bytes()
+
+    def peak_increase(self) -> int | None:
+        if self.baseline is None:
+            return None
+        if self.cuda:
+            import torch
+
+            return max(0, torch.cuda.max_memory_allocated(self.device) - self.baseline)
+        peak_after = get_peak_rss_bytes()
+        # 峰值 RSS 单调不减：未刷新历史峰值时无法得知本次峰值，不更新估计
+        if self.peak_before is None or peak_after is None or peak_after <= self.peak_before:
+            return None
+        return peak_after - self.baseline
+
+
+def _get_device_available_bytes(device: str) -> int | None:
+    if str(device).startswith("cuda"):
+        try:
+            import torch
+
+            free, _total = torch.cuda.mem_get_info(device)
+            return int(free)
+        except Exception:
+            return None
+    return get_available_memory_bytes()
+
+
+def _release_memory(device: str) -> None:
+    gc.collect()
+    if str(device).startswith("cuda"):
+        try:
+            import torch
+
+            torch.cuda.empty_cache()
+        except Exception:
+            pass
+
+
+_batch_tuner: BatchSizeTuner | None = None
+_batch_tuner_lock = threading.Lock()
+
+
+def get_batch_tuner() -> BatchSizeTuner:
+    """获取全局 batch_size_s 选择器（按 ASRConfig 构造）"""
+    global _batch_tuner
+    if _batch_tuner is None:
+        with _batch_tuner_lock:
+            if _batch_tuner is None:
+                config = get_config()
+                _batch_tuner = BatchSizeTuner(
+                    memory_fraction=config.asr.batch_memory_fraction,
+                    min_s=config.asr.batch_size_min_s,
+                    max_s=config.asr.batch_size_max_s,
+                    activation_bytes_per_s=config.asr.batch_activation_mb_per_s * _MB,
+                )
+    return _batch_tuner
+
+
+def run_with_batch_size(
+    model_name: str,
+    duration_s: float,
+    default_s: int,
+    infer: Callable[[int], T],
+    device: str = "cpu",
+) -> T:
+    """
+    以合适的 batch_size_s 调用 infer：BATCH_SIZE_AUTO 关闭时直接使用 default_s
+
+    Args:
+        model_name: 模型类型
+        duration_s: 音频时长（秒），未知时传 0
+        default_s: 关闭自动选择时使用的固定值
+        infer: 以 batch_size_s 为参数的推理函数
+        device: 推理设备
+    """
+    if not get_config().asr.batch_size_auto:
+        return infer(default_s)
+    return get_batch_tuner().run(model_name, duration_s, infer, device)
@@ -0,0 +1,149 @@
+"""
+ASR 分桶批量推理
+
+将 VAD 语音段按时长排序、分桶，每个桶作为一个 padding 后的批次送入模型，
+推理结果再按原始时间顺序回填。相近时长的语音段放在同一批次，可显著减少 padding 浪费。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import TypeVar
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SegmentBatch:
+    """一个分桶批次：segments 中的下标（按时长升序）及批内最长时长"""
+
+    indices: tuple[int, ...]
+    max_ms: int
+    total_ms: int
+
+    @property
+    def padded_ms(self) -> int:
+        """padding 到批内最长段后的总时长"""
+        return self.max_ms * len(self.indices)
+
+
+class BatchedInferenceEngine:
+    """
+    按时长分桶的批量推理引擎
+
+    分桶规则：语音段按时长升序排列后贪心装桶，满足以下任一条件即开新桶：
+    - 批内段数达到 max_batch_size
+    - padding 后总时长超过 max_batch_s
+    - 当前段时长超过桶内最短段的 max_length_ratio 倍（控制批内 padding 比例）
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 16,
+        max_batch_s: float = 120.0,
+        max_length_ratio: float = 2.0,
+    ):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_ms = max(1, int(max_batch_s * 1000))
+        self.max_length_ratio = max(1.0, float(max_length_ratio))
+
+    def plan(self, segments: Sequence[tuple[int, int]]) -> list[SegmentBatch]:
+        """
+        生成分桶批次
+
+        Args:
+            segments: 语音段 [(start_ms, end_ms), ...]
+
+        Returns:
+            list[SegmentBatch]: 批次列表（按桶内时长升序）
+        """
+        durations = [max(0, int(end) - int(start)) for start, end in segments]
+        order = sorted(range(len(segments)), key=lambda i: durations[i])
+
+        batches: list[SegmentBatch] = []
+        current: list[int] = []
+        for idx in order:
+            duration = durations[idx]
+            if current:
+                shortest = max(1, durations[current[0]])
+                # 升序排列，duration 即为加入后批内最长时长
+                if (
+                    len(current) >= self.max_batch_size
+                    or duration * (len(current) + 1) > self.max_batch_ms
+                    or duration > shortest * self.max_length_ratio
+                ):
+                    batches.append(self._make_batch(current, durations))
+                    current = []
+            current.append(idx)
+        if current:
+            batches.append(self._make_batch(current, durations))
+        return batches
+
+    def run(
+        self,
+        segments: Sequence[tuple[int, int]],
+        infer_batch: Callable[[SegmentBatch], Sequence[T]],
+        before_batch: Callable[[], None] | None = None,
+        after_batch: Callable[[tuple[int, ...], list[T]], None] | None = None,
+    ) -> list[T]:
+        """
+        分桶执行推理并按原始顺序回填结果
+
+        Args:
+            segments: 语音段 [(start_ms, end_ms), ...]，按时间排序
+            infer_batch: 批次推理函数，返回与 batch.indices 一一对应的结果
+            before_batch: 每个批次前调用（用于取消检查）
+            after_batch: 每个批次完成后以 (段索引, 结果) 调用（用于增量输出）
+
+        Returns:
+            list: 与 segments 顺序一致的推理结果
+        """
+        batches = self.plan(segments)
+        results: list[T | None] = [None] * len(segments)
+
+        total_ms = sum(batch.total_ms for batch in batches)
+        padded_ms = sum(batch.padded_ms for batch in batches)
+        if batches:
+            logger.info(
+                f"分桶批量推理: {len(segments)} 个语音段 -> {len(batches)} 个批次，"
+                f"padding 效率 {total_ms / max(1, padded_ms):.1%}"
+            )
+
+        for batch in batches:
+            if before_batch is not None:
+                before_batch()
+            outputs = list(infer_batch(batch))
+            if len(outputs) != len(batch.indices):
+                raise RuntimeError(
+                    f"批次推理结果数量不匹配: 期望 {len(batch.indices)}，实际 {len(outputs)}"
+                )
+            for idx, output in zip(batch.indices, outputs, strict=True):
+                results[idx] = output
+            if after_batch is not None:
+                after_batch(batch.indices, outputs)
+
+        return results  # type: ignore[return-value]
+
+    @staticmethod
+    def _make_batch(indices: list[int], durations: list[int]) -> SegmentBatch:
+        return SegmentBatch(
+            indices=tuple(indices),
+            max_ms=max(durations[i] for i in indices),
+            total_ms=sum(durations[i] for i in indices),
+        )
+
+
+def get_batching_engine() -> BatchedInferenceEngine:
+    """按 ASRConfig 构造分桶批量推理引擎"""
+    config = get_config()
+    return BatchedInferenceEngine(
+        max_batch_size=config.asr.segment_batch_size,
+        max_batch_s=config.asr.segment_batch_max_s,
+        max_length_ratio=config.asr.segment_batch_length_ratio,
+    )
@@ -0,0 +1,223 @@
+"""
+ASR 转录缓存
+
+以「解码后音频内容哈希 + 模型签名」为键，持久化保存转录文本。
+相同音频、相同模型与推理参数的重复提交直接命中缓存，不再重新推理。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import soundfile as sf
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+_INDEX_FILENAME = "index.json"
+_HASH_BLOCK_FRAMES = 1 << 16
+
+
+def hash_audio_file(path: str | Path) -> str:
+    """
+    计算音频解码后 PCM 数据的内容哈希
+
+    只对采样数据（及采样率/声道数）求哈希，与文件名、容器元数据无关。
+    """
+    digest = hashlib.sha256()
+    with sf.SoundFile(str(path)) as f:
+        digest.update(f"{f.samplerate}:{f.channels}:".encode())
+        for block in f.blocks(blocksize=_HASH_BLOCK_FRAMES, dtype="int16"):
+            digest.update(block.tobytes())
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    转录文本缓存（磁盘持久化 + LRU 淘汰）
+
+    目录结构：
+        cache_dir/index.json   索引（按最近访问顺序保存）
+        cache_dir/<key>.txt    转录文本
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.index_file = self.cache_dir / _INDEX_FILENAME
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def build_key(audio_digest: str, signature: dict[str, Any]) -> str:
+        """由音频内容哈希与模型签名（模型类型、版本、generate 参数）构造缓存键"""
+        payload = json.dumps(
+            {"audio": audio_digest, "signature": signature},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """读取缓存，命中时刷新 LRU 顺序"""
+        with self._lock:
+            entry = self._entries.get(key)
+            text_path = self._text_path(key)
+            if entry is None or not text_path.exists():
+                if entry is not None:
+                    self._entries.pop(key, None)
+                    self._save()
+                self.misses += 1
+                return None
+
+            try:
+                text = text_path.read_text(encoding="utf-8")
+            except Exception as e:
+                logger.warning(f"读取转录缓存失败，视为未命中: {e}")
+                self.misses += 1
+                return None
+
+            entry["hits"] = entry.get("hits", 0) + 1
+            entry["last_access"] = datetime.now().isoformat()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._save()
+            return text
+
+    def put(self, key: str, text: str, model_type: str = "") -> None:
+        """写入缓存，超出容量上限时按 LRU 淘汰"""
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            logger.debug(f"转录文本超过缓存容量上限，跳过缓存: {len(data)} bytes")
+            return
+
+        with self._lock:
+            text_path = self._text_path(key)
+            tmp_path = text_path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(text_path)
+
+            now = datetime.now().isoformat()
+            self._entries[key] = {
+                "size": len(data),
+                "model_type": model_type,
+                "created_at": now,
+                "last_access": now,
+                "hits": 0,
+            }
+            self._entries.move_to_end(key)
+            self._evict_locked()
+            self._save()
+
+    def purge(self) -> int:
+        """清空缓存，返回清除的条目数"""
+        with self._lock:
+            count = len(self._entries)
+            for key in list(self._entries):
+                self._unlink(self._text_path(key))
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self._save()
+        logger.info(f"已清空转录缓存，共 {count} 条")
+        return count
+
+    def stats(self) -> dict[str, Any]:
+        """缓存统计信息（供管理端点使用）"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_dir": str(self.cache_dir),
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "items": [{"key": key, **entry} for key, entry in reversed(self._entries.items())],
+            }
+
+    def _text_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.txt"
+
+    def _total_bytes(self) -> int:
+        return sum(int(entry.get("size", 0)) for entry in self._entries.values())
+
+    def _evict_locked(self) -> None:
+        total = self._total_bytes()
+        while total > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._unlink(self._text_path(key))
+            total -= int(entry.get("size", 0))
+            self.evictions += 1
+            logger.debug(f"转录缓存淘汰: {key}")
+
+    def _load(self) -> None:
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data.get("entries", {})
+            self._entries = OrderedDict(
+                (key, entry) for key, entry in entries.items() if self._text_path(key).exists()
+            )
+            logger.info(f"已加载转录缓存索引: {len(self._entries)} 条")
+        except Exception as e:
+            logger.warning(f"加载转录缓存索引失败，将重建: {e}")
+            self._entries = OrderedDict()
+
+    def _save(self) -> None:
+        try:
+            tmp_path = self.index_file.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": "1.0", "entries": self._entries}, f, ensure_ascii=False)
+            tmp_path.replace(self.index_file)
+        except Exception as e:
+            logger.error(f"保存转录缓存索引失败: {e}", exc_info=True)
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            if path.exists():
+                path.unlink()
+        except Exception:
+            logger.debug(f"Failed to remove cache file: {path}")
+
+
+_transcript_cache: TranscriptCache | None = None
+_transcript_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """获取全局转录缓存实例"""
+    global _transcript_cache
+    if _transcript_cache is None:
+        with _transcript_cache_lock:
+            if _transcript_cache is None:
+                config = get_config()
+                cache_dir = config.asr.transcript_cache_dir or (
+                    (config.paths.temp_dir or Path("./temp")) / "asr_cache"
+                )
+                _transcript_cache = TranscriptCache(
+                    cache_dir=cache_dir,
+                    max_bytes=config.asr.transcript_cache_max_mb * 1024 * 1024,
+                )
+    return _transcript_cache
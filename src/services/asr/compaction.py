@@ -0,0 +1,231 @@
+"""
+静音压缩
+
+讲座、直播录音中常有大段静音或音乐，ASR 在这些部分白白消耗算力。
+本模块按 VAD 语音段把音频拼接为仅含语音的缓冲，并记录压缩时间 → 原始时间的偏移映射：
+ASR 在压缩后的音频上运行，得到的时间戳再经 TimeMap 映射回原始时间轴。
+
+- 仅移除长于 SILENCE_COMPACTION_MIN_SILENCE_MS 的非语音段，短停顿原样保留（不影响按停顿分段）
+- 每个保留区间前后各多留 SILENCE_COMPACTION_PAD_MS，避免截断词首词尾
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+from .preprocess import DecodedAudio
+
+logger = get_logger(__name__)
+
+
+class TimeMap:
+    """压缩时间轴 → 原始时间轴的分段平移映射（毫秒）"""
+
+    __slots__ = ("_compact_starts", "_original_starts", "_durations", "original_ms")
+
+    def __init__(
+        self,
+        compact_starts_ms: np.ndarray,
+        original_starts_ms: np.ndarray,
+        durations_ms: np.ndarray,
+        original_ms: float,
+    ):
+        self._compact_starts = np.asarray(compact_starts_ms, dtype=np.float64)
+        self._original_starts = np.asarray(original_starts_ms, dtype=np.float64)
+        self._durations = np.asarray(durations_ms, dtype=np.float64)
+        self.original_ms = float(original_ms)
+
+    @property
+    def compacted_ms(self) -> float:
+        if self._durations.size == 0:
+            return 0.0
+        return float(self._compact_starts[-1] + self._durations[-1])
+
+    @property
+    def regions(self) -> int:
+        return int(self._durations.size)
+
+    def to_original_ms(self, t_ms, is_end: bool = False):
+        """
+        压缩时间 → 原始时间（支持标量与数组）
+
+        Args:
+            is_end: 作为区间结束时间映射：恰好落在两个保留区间拼接点上的时间
+                归入前一个区间（映射到其结束处），避免跨越被移除的静音
+        """
+        return self._map(
+            t_ms, self._compact_starts, self._original_starts, "left" if is_end else "right"
+        )
+
+    def to_compact_ms(self, t_ms, is_end: bool = False):
+        """原始时间 → 压缩时间（落在被移除静音中的时间归到相邻的保留区间边界）"""
+        return self._map(
+            t_ms, self._original_starts, self._compact_starts, "left" if is_end else "right"
+        )
+
+    def to_original_s(self, t_s, is_end: bool = False):
+        """压缩时间（秒）→ 原始时间（秒）"""
+        return self.to_original_ms(np.asarray(t_s, dtype=np.float64) * 1000, is_end) / 1000
+
+    def _map(self, t_ms, from_starts: np.ndarray, to_starts: np.ndarray, side: str):
+        t = np.asarray(t_ms, dtype=np.float64)
+        if self._durations.size == 0:
+            return t.copy() if t.ndim else float(t)
+        index = np.clip(np.searchsorted(from_starts, t, side=side) - 1, 0, from_starts.size - 1)
+        offset = np.clip(t - from_starts[index], 0, self._durations[index])
+        mapped = to_starts[index] + offset
+        return mapped if mapped.ndim else float(mapped)
+
+
+@dataclass
+class SilenceCompaction:
+    """静音压缩结果"""
+
+    audio: DecodedAudio  # 仅含语音的音频
+    segments: list[tuple[int, int]]  # 压缩时间轴上的 VAD 语音段 (start_ms, end_ms)
+    time_map: TimeMap
+
+    @property
+    def original_s(self) -> float:
+        return self.time_map.original_ms / 1000
+
+    @property
+    def compacted_s(self) -> float:
+        return self.audio.duration_s
+
+    @property
+    def ratio(self) -> float:
+        """压缩后时长 / 原始时长"""
+        return self.compacted_s / self.original_s if self.original_s else 1.0
+
+    def summary(self) -> dict[str, Any]:
+        """任务结果中报告的压缩统计"""
+        return {
+            "original_s": round(self.original_s, 2),
+            "compacted_s": round(self.compacted_s, 2),
+            "ratio": round(self.ratio, 4),
+            "regions": self.time_map.regions,
+        }
+
+
+CompactionCallback = Callable[[SilenceCompaction], None]
+
+
+def _speech_regions(
+    segments: list[tuple[int, int]], total_ms: float, min_silence_ms: int, pad_ms: int
+) -> list[tuple[float, float]]:
+    """合并间隔不足 min_silence_ms 的语音段并向两侧扩展 pad_ms"""
+    regions: list[list[float]] = []
+    for start_ms, end_ms in sorted(segments):
+        if regions and start_ms - regions[-1][1] < min_silence_ms:
+            regions[-1][1] = max(regions[-1][1], end_ms)
+        else:
+            regions.append([start_ms, end_ms])
+
+    padded: list[tuple[float, float]] = []
+    for start_ms, end_ms in regions:
+        start_ms = max(0.0, start_ms - pad_ms)
+        end_ms = min(total_ms, end_ms + pad_ms)
+        if padded and start_ms <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], max(padded[-1][1], end_ms))
+        elif end_ms > start_ms:
+            padded.append((start_ms, end_ms))
+    return padded
+
+
+def compact_silence(
+    audio: DecodedAudio,
+    segments: list[tuple[int, int]],
+    min_silence_ms: int | None = None,
+    pad_ms: int | None = None,
+) -> SilenceCompaction:
+    """
+    按 VAD 语音段构建仅含语音的音频
+
+    Args:
+        audio: 原始音频
+        segments: VAD 语音段 (start_ms, end_ms)（原始时间轴）
+        min_silence_ms: 仅移除长于该值的非语音段（默认取配置）
+        pad_ms: 每个保留区间前后保留的时长（默认取配置）
+    """
+    config = get_config()
+    if min_silence_ms is None:
+        min_silence_ms = config.asr.silence_compaction_min_silence_ms
+    if pad_ms is None:
+        pad_ms = config.asr.silence_compaction_pad_ms
+
+    sample_rate = audio.sample_rate
+    total_ms = audio.duration_s * 1000
+    bounds = [
+        (int(start_ms * sample_rate / 1000), int(end_ms * sample_rate / 1000))
+        for start_ms, end_ms in _speech_regions(segments, total_ms, min_silence_ms, pad_ms)
+    ]
+    bounds = [(start, min(end, audio.num_samples)) for start, end in bounds if end > start]
+
+    original_starts = np.array([start for start, _ in bounds], dtype=np.int64)
+    lengths = np.array([end - start for start, end in bounds], dtype=np.int64)
+    compact_starts = np.cumsum(lengths) - lengths
+    time_map = TimeMap(
+        compact_starts_ms=compact_starts * 1000 / sample_rate,
+        original_starts_ms=original_starts * 1000 / sample_rate,
+        durations_ms=lengths * 1000 / sample_rate,
+        original_ms=total_ms,
+    )
+
+    if len(bounds) == 1 and bounds[0] == (0, audio.num_samples):
+        samples = audio.samples
+    elif bounds:
+        samples = np.concatenate([audio.samples[start:end] for start, end in bounds])
+    else:
+        samples = audio.samples[:0]
+    compacted = DecodedAudio(samples=samples, sample_rate=sample_rate, source=audio.source)
+
+    compact_segments = [
+        (
+            int(round(time_map.to_compact_ms(start_ms))),
+            int(round(time_map.to_compact_ms(end_ms, True))),
+        )
+        for start_ms, end_ms in segments
+    ]
+    result = SilenceCompaction(
+        audio=compacted,
+        segments=[(start, end) for start, end in compact_segments if end > start],
+        time_map=time_map,
+    )
+    logger.info(
+        f"静音压缩: {result.original_s:.1f}s -> {result.compacted_s:.1f}s "
+        f"(比例 {result.ratio:.1%}，保留 {time_map.regions} 个区间)"
+    )
+    return result
+
+
+def detect_and_compact(audio: DecodedAudio) -> SilenceCompaction | None:
+    """VAD 检测语音段后压缩；VAD 失败或未检测到语音时返回 None（调用方使用原始音频）"""
+    from .vad import VADService
+
+    try:
+        segments = VADService().segment_audio(audio)
+    except Exception as e:
+        logger.warning(f"VAD 检测失败，跳过静音压缩: {e}")
+        return None
+    if not segments:
+        logger.info("VAD 未检测到语音，跳过静音压缩")
+        return None
+    return compact_silence(audio, segments)
+
+
+def report_compaction(callback: CompactionCallback | None, compaction: SilenceCompaction) -> None:
+    """调用压缩结果回调（回调失败不影响转录）"""
+    if callback is None:
+        return
+    try:
+        callback(compaction)
+    except Exception as e:
+        logger.warning(f"静音压缩回调失败: {e}")
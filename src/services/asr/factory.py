@@ -8,23 +8,20 @@ from src.utils.config import get_config
 from src.utils.device.device_manager import detect_device, get_onnx_providers
 from src.utils.logging.logger import get_logger
 
-from .base import BaseASRService
-from .preprocess import cleanup_preprocessed_audio, prepare_asr_audio
+from .base import BaseASRService, PartialTranscript, PartialTranscriptCallback
+from .cache import get_transcript_cache
+from .compaction import CompactionCallback, compact_silence, report_compaction
+from .preprocess import DecodedAudio, decode_audio
 
 logger = get_logger(__name__)
 
 # 获取配置
 config = get_config()
 
-# 全局单例缓存
-_sense_voice_instance: BaseASRService | None = None
-_paraformer_instance: BaseASRService | None = None
-_whisper_cpp_instance: BaseASRService | None = None
-
 
 def get_asr_service(model_type: str = "paraformer") -> BaseASRService:
     """
-    获取ASR服务实例（单例模式）
+    获取ASR服务实例（由模型池持有，每种模型类型一个实例）
 
     Args:
         model_type: 模型类型 ('sense_voice' 或 'paraformer')
@@ -35,17 +32,31 @@ def get_asr_service(model_type: str = "paraformer") -> BaseASRService:
     Raises:
         ValueError: 不支持的模型类型
     """
-    global _sense_voice_instance, _paraformer_instance, _whisper_cpp_instance
+    from .model_pool import get_model_pool
+
+    return get_model_pool().get(_normalize_model_type(model_type))
 
-    model_type = (model_type or "paraformer").lower().strip()
+
+def create_asr_service(model_type: str = "paraformer") -> BaseASRService:
+    """
+    创建新的ASR服务实例（模型延迟加载；一般应通过 get_asr_service 获取）
+
+    Raises:
+        ValueError: 不支持的模型类型
+    """
+    model_type = _normalize_model_type(model_type)
 
     if model_type == "whisper_cpp":
-        if _whisper_cpp_instance is None:
-            from .whisper_cpp import WhisperCppService
+        if config.asr.whisper_cpp_backend == "server":
+            from .whisper_server import WhisperServerService
+
+            logger.info("Creating whisper.cpp service instance (backend: whisper-server)")
+            return WhisperServerService()
+
+        from .whisper_cpp import WhisperCppService
 
-            logger.info("Creating whisper.cpp service instance")
-            _whisper_cpp_instance = WhisperCppService()
-        return _whisper_cpp_instance
+        logger.info("Creating whisper.cpp service instance")
+        return WhisperCppService()
 
     # 检测设备（仅用于 FunASR）
     device = detect_device(config.asr.device)
@@ -56,28 +67,39 @@ def get_asr_service(model_type: str = "paraformer") -> BaseASRService:
         onnx_providers = get_onnx_providers(device, custom_providers)
 
     if model_type == "sense_voice":
-        if _sense_voice_instance is None:
-            from .sense_voice import SenseVoiceService
+        from .sense_voice import SenseVoiceService
 
-            logger.info(f"Creating SenseVoice service instance (device: {device})")
-            _sense_voice_instance = SenseVoiceService(device, onnx_providers)
-        return _sense_voice_instance
+        logger.info(f"Creating SenseVoice service instance (device: {device})")
+        return SenseVoiceService(device, onnx_providers)
 
     if model_type == "paraformer":
-        if _paraformer_instance is None:
-            from .paraformer import ParaformerService
+        from .paraformer import ParaformerService
 
-            logger.info(f"Creating Paraformer service instance (device: {device})")
-            _paraformer_instance = ParaformerService(device, onnx_providers)
-        return _paraformer_instance
+        logger.info(f"Creating Paraformer service instance (device: {device})")
+        return ParaformerService(device, onnx_providers)
 
     raise ValueError(
         f"Unsupported model type: {model_type}. Supported types: 'sense_voice', 'paraformer', 'whisper_cpp'"
     )
 
 
+def _normalize_model_type(model_type: str | None) -> str:
+    return (model_type or "paraformer").lower().strip()
+
+
+def shutdown_asr_services() -> None:
+    """释放 ASR 服务持有的外部资源（如常驻 whisper-server 进程）"""
+    from .model_pool import get_model_pool
+
+    get_model_pool().shutdown()
+
+
 def transcribe_audio(
-    audio_path: str, model_type: str = "paraformer", task_id: str | None = None
+    audio_path: str,
+    model_type: str = "paraformer",
+    task_id: str | None = None,
+    on_partial: PartialTranscriptCallback | None = None,
+    on_compaction: CompactionCallback | None = None,
 ) -> str:
     """
     转录音频文件（便捷函数）
@@ -86,6 +108,8 @@ def transcribe_audio(
         audio_path: 音频文件路径
         model_type: 模型类型 ('sense_voice' 或 'paraformer')
         task_id: 任务ID
+        on_partial: 增量转录回调（每完成一批语音段/分片调用一次，结束时再以完整文本调用一次）
+        on_compaction: 静音压缩回调（启用 SILENCE_COMPACTION_ENABLED 且完成压缩时调用一次）
 
     Returns:
         str: 转录文本
@@ -95,27 +119,127 @@ def transcribe_audio(
         RuntimeError: 转录失败
         TaskCancelledException: 任务被取消
     """
-    service = get_asr_service(model_type)
-    processed_path = None
-    is_temp = False
+    from .model_pool import get_model_pool
+
+    model_type = _normalize_model_type(model_type)
+    # 只解码一次：VAD、缓存键与 ASR 推理共享同一份 PCM 缓冲（内存映射）
+    audio = decode_audio(audio_path, task_id=task_id)
+
+    # 租用期间模型不会被模型池淘汰
+    with get_model_pool().lease(model_type) as service:
+        cache_key = _lookup_cache_key(audio, model_type, service)
+        if cache_key is not None:
+            cached_text = get_transcript_cache().get(cache_key)
+            if cached_text is not None:
+                logger.info(f"命中转录缓存，跳过 ASR 推理: {audio_path}")
+                _report_final(on_partial, cached_text, audio)
+                return cached_text
+
+        text = _transcribe_with_vad(service, audio, task_id, model_type, on_partial, on_compaction)
+        _report_final(on_partial, text, audio)
+
+    if cache_key is not None:
+        try:
+            get_transcript_cache().put(cache_key, text, model_type=model_type)
+        except Exception as e:
+            logger.warning(f"写入转录缓存失败: {e}")
+    return text
+
+
+def _lookup_cache_key(audio: DecodedAudio, model_type: str, service: BaseASRService) -> str | None:
+    """计算转录缓存键；缓存未启用或计算失败时返回 None"""
+    if not config.asr.transcript_cache_enabled:
+        return None
     try:
-        processed_path, is_temp = prepare_asr_audio(audio_path, task_id=task_id)
-
-        # VAD 预处理：如果启用且检测不到语音，跳过转录
-        if config.asr.enable_vad:
-            from src.services.asr.vad import VADService
-
-            try:
-                vad = VADService()
-                segments = vad.segment_audio(str(processed_path))
-                if not segments:
-                    logger.info("VAD 未检测到语音，返回空文本")
-                    return ""
-                logger.info(f"VAD 检测到 {len(segments)} 个语音段")
-            except Exception as e:
-                logger.warning(f"VAD 预处理失败，回退到完整转录: {e}")
-
-        return service.transcribe(str(processed_path), task_id)
-    finally:
-        if is_temp and processed_path is not None and not config.debug_flag:
-            cleanup_preprocessed_audio(processed_path)
+        signature = {
+            "model_type": model_type,
+            "enable_vad": config.asr.enable_vad,
+            "pipeline": "vad_segments" if _use_vad() else "full",
+            "parallel": _use_parallel(model_type, audio) and _use_vad(),
+            **service.get_cache_signature(),
+        }
+        if config.asr.silence_compaction_enabled:
+            signature["silence_compaction"] = [
+                config.asr.silence_compaction_min_silence_ms,
+                config.asr.silence_compaction_pad_ms,
+            ]
+        return get_transcript_cache().build_key(audio.digest(), signature)
+    except Exception as e:
+        logger.warning(f"计算转录缓存键失败，跳过缓存: {e}")
+        return None
+
+
+def _transcribe_with_vad(
+    service: BaseASRService,
+    audio: DecodedAudio,
+    task_id: str | None,
+    model_type: str = "paraformer",
+    on_partial: PartialTranscriptCallback | None = None,
+    on_compaction: CompactionCallback | None = None,
+) -> str:
+    if not _use_vad():
+        return service.transcribe_decoded(audio, task_id)
+
+    # VAD 只做一次：检测不到语音直接返回空文本，否则仅对语音段推理
+    from src.services.asr.vad import VADService
+
+    try:
+        vad = VADService()
+        segments = vad.segment_audio(audio)
+    except Exception as e:
+        logger.warning(f"VAD 预处理失败，回退到完整转录: {e}")
+        return service.transcribe_decoded(audio, task_id)
+
+    if not segments:
+        logger.info("VAD 未检测到语音，返回空文本")
+        return ""
+
+    speech_ms = sum(end_ms - start_ms for start_ms, end_ms in segments)
+    logger.info(
+        f"VAD 检测到 {len(segments)} 个语音段，语音时长 {speech_ms / 1000:.1f}s / "
+        f"总时长 {audio.duration_s:.1f}s"
+    )
+    if config.asr.silence_compaction_enabled:
+        # 转录文本不含时间戳，压缩后直接在仅含语音的音频上推理
+        compaction = compact_silence(audio, segments)
+        report_compaction(on_compaction, compaction)
+        audio, segments = compaction.audio, compaction.segments
+    if _use_parallel(model_type, audio):
+        from concurrent.futures.process import BrokenProcessPool
+
+        from .parallel import get_parallel_pool
+
+        try:
+            return get_parallel_pool(model_type).transcribe(audio, segments, task_id, on_partial)
+        except BrokenProcessPool as e:
+            # 进程池已关闭，下次调用时重建；本次回退到单实例转录
+            logger.warning(f"并行 ASR 进程池失效，回退到单实例转录: {e}")
+    return service.transcribe_segments(audio, segments, task_id, on_partial=on_partial)
+
+
+def _report_final(
+    on_partial: PartialTranscriptCallback | None, text: str, audio: DecodedAudio
+) -> None:
+    """转录结束时以完整文本回调一次（覆盖无法分段增量输出的路径）"""
+    if on_partial is None:
+        return
+    try:
+        on_partial(
+            PartialTranscript(text=text, completed_s=audio.duration_s, total_s=audio.duration_s)
+        )
+    except Exception as e:
+        logger.warning(f"增量转录回调失败: {e}")
+
+
+def _use_vad() -> bool:
+    """静音压缩依赖 VAD 语音段，启用时即使未开启 ENABLE_VAD 也执行 VAD"""
+    return config.asr.enable_vad or config.asr.silence_compaction_enabled
+
+
+def _use_parallel(model_type: str, audio: DecodedAudio) -> bool:
+    """是否对该音频使用多进程并行 ASR（whisper.cpp 自带多线程，不参与）"""
+    return (
+        config.asr.parallel_workers > 1
+        and model_type in ("sense_voice", "paraformer")
+        and audio.duration_s >= config.asr.parallel_min_duration_s
+    )
@@ -0,0 +1,260 @@
+"""
+ASR 模型池
+
+统一持有各类 ASR 服务实例，并管理模型的常驻内存：
+- 内存预算：新模型加载后，若常驻总量超出预算，按 LRU 释放其它空闲模型
+- 空闲淘汰：超过空闲时长未使用的模型由后台线程释放
+- single-flight 加载：同一模型并发首次使用时只加载一次（见 BaseASRService.ensure_model_loaded）
+
+被淘汰的只是模型权重，服务实例保留，下次使用时按需重新加载。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+from .base import BaseASRService
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _PoolEntry:
+    service: BaseASRService
+    leases: int = 0
+
+
+class ModelPool:
+    """ASR 模型池（线程安全）"""
+
+    def __init__(
+        self,
+        builder: Callable[[str], BaseASRService],
+        budget_bytes: int = 0,
+        idle_timeout_s: float = 0,
+    ):
+        """
+        Args:
+            builder: 按模型类型创建服务实例的函数
+            budget_bytes: 模型常驻内存预算（字节），0 表示不限制
+            idle_timeout_s: 空闲淘汰时长（秒），0 表示不淘汰
+        """
+        self._builder = builder
+        self.budget_bytes = int(budget_bytes)
+        self.idle_timeout_s = float(idle_timeout_s)
+        self._entries: dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._sweeper: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def get(self, model_type: str) -> BaseASRService:
+        """获取服务实例（不存在则创建；模型按需延迟加载）"""
+        with self._lock:
+            entry = self._entries.get(model_type)
+            if entry is None:
+                service = self._builder(model_type)
+                service.on_model_loaded = self._on_model_loaded
+                entry = _PoolEntry(service=service)
+                self._entries[model_type] = entry
+                self._start_sweeper_locked()
+        entry.service.last_used = time.time()
+        return entry.service
+
+    @contextmanager
+    def lease(self, model_type: str) -> Iterator[BaseASRService]:
+        """租用服务实例：租用期间模型不会被淘汰"""
+        service = self.get(model_type)
+        with self._lock:
+            self._entries[model_type].leases += 1
+        try:
+            yield service
+        finally:
+            with self._lock:
+                self._entries[model_type].leases -= 1
+            service.last_used = time.time()
+
+    def evict(self, model_type: str | None = None) -> list[str]:
+        """
+        手动释放模型（跳过正在使用的模型）
+
+        Args:
+            model_type: 指定模型类型；None 表示释放全部空闲模型
+
+        Returns:
+            list[str]: 实际被释放的模型类型
+        """
+        with self._lock:
+            candidates = [
+                name
+                for name, entry in self._entries.items()
+                if (model_type is None or name == model_type) and self._is_evictable(entry)
+            ]
+        return [name for name in candidates if self._unload(name, reason="手动释放")]
+
+    def evict_idle(self, now: float | None = None) -> list[str]:
+        """释放空闲超过 idle_timeout_s 的模型"""
+        if self.idle_timeout_s <= 0:
+            return []
+        now = time.time() if now is None else now
+        with self._lock:
+            candidates = [
+                name
+                for name, entry in self._entries.items()
+                if self._is_evictable(entry)
+                and now - (entry.service.last_used or 0) >= self.idle_timeout_s
+            ]
+        return [name for name in candidates if self._unload(name, reason="空闲超时")]
+
+    def enforce_budget(self, keep: str | None = None) -> list[str]:
+        """常驻总量超出预算时，按最近最少使用顺序释放其它空闲模型"""
+        if self.budget_bytes <= 0:
+            return []
+        evicted = []
+        while self.resident_bytes() > self.budget_bytes:
+            with self._lock:
+                candidates = sorted(
+                    (
+                        (entry.service.last_used or 0, name)
+                        for name, entry in self._entries.items()
+                        if name != keep and self._is_evictable(entry)
+                    ),
+                )
+            if not candidates:
+                logger.warning(
+                    f"模型常驻内存 {self.resident_bytes() / 1024**2:.0f}MB 超出预算 "
+                    f"{self.budget_bytes / 1024**2:.0f}MB，但没有可释放的空闲模型"
+                )
+                break
+            name = candidates[0][1]
+            if self._unload(name, reason="超出内存预算"):
+                evicted.append(name)
+        return evicted
+
+    def resident_bytes(self) -> int:
+        """已加载模型的常驻内存总量（字节，近似值）"""
+        with self._lock:
+            services = [entry.service for entry in self._entries.values()]
+        return sum(service.get_resident_bytes() or 0 for service in services)
+
+    def stats(self) -> dict[str, Any]:
+        """模型池统计信息（供管理端点使用）"""
+        with self._lock:
+            entries = list(self._entries.items())
+        models = []
+        for name, entry in entries:
+            service = entry.service
+            resident = service.get_resident_bytes()
+            models.append(
+                {
+                    "model_type": name,
+                    "service": service.__class__.__name__,
+                    "loaded": service.is_model_loaded(),
+                    "resident_mb": round(resident / 1024**2, 1) if resident is not None else None,
+                    "load_s": round(service.load_seconds, 3) if service.load_seconds else None,
+                    "loaded_at": _iso(service.loaded_at),
+                    "last_used": _iso(service.last_used),
+                    "idle_s": round(time.time() - service.last_used, 1)
+                    if service.last_used
+                    else None,
+                    "in_use": entry.leases,
+                }
+            )
+        return {
+            "budget_mb": round(self.budget_bytes / 1024**2, 1) if self.budget_bytes else None,
+            "idle_timeout_s": self.idle_timeout_s or None,
+            "resident_mb": round(self.resident_bytes() / 1024**2, 1),
+            "evictions": self._evictions,
+            "models": models,
+        }
+
+    def shutdown(self) -> None:
+        """停止后台线程并释放外部资源（如常驻 whisper-server 进程）"""
+        self._stop_event.set()
+        with self._lock:
+            services = [entry.service for entry in self._entries.values()]
+        for service in services:
+            shutdown = getattr(service, "shutdown", None)
+            if callable(shutdown):
+                try:
+                    shutdown()
+                except Exception as e:
+                    logger.warning(f"关闭 ASR 服务失败: {e}")
+
+    def _on_model_loaded(self, service: BaseASRService) -> None:
+        name = next(
+            (n for n, entry in list(self._entries.items()) if entry.service is service), None
+        )
+        resident = service.get_resident_bytes()
+        logger.info(
+            f"ASR 模型已加载: {name}，耗时 {service.load_seconds or 0:.2f}s"
+            + (f"，常驻约 {resident / 1024**2:.0f}MB" if resident is not None else "")
+        )
+        self.enforce_budget(keep=name)
+
+    def _is_evictable(self, entry: _PoolEntry) -> bool:
+        return entry.leases == 0 and entry.service.is_model_loaded()
+
+    def _unload(self, name: str, reason: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or not self._is_evictable(entry):
+                return False
+            service = entry.service
+        try:
+            service.unload_model()
+        except Exception as e:
+            logger.warning(f"释放 ASR 模型失败: {name}: {e}")
+            return False
+        self._evictions += 1
+        logger.info(f"已释放 ASR 模型: {name}（{reason}）")
+        return True
+
+    def _start_sweeper_locked(self) -> None:
+        if self.idle_timeout_s <= 0 or self._sweeper is not None:
+            return
+        interval = max(1.0, min(60.0, self.idle_timeout_s / 2))
+
+        def _sweep() -> None:
+            while not self._stop_event.wait(interval):
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    logger.warning(f"空闲模型清理失败: {e}")
+
+        self._sweeper = threading.Thread(target=_sweep, name="asr-model-pool-sweeper", daemon=True)
+        self._sweeper.start()
+
+
+def _iso(timestamp: float | None) -> str | None:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+_model_pool: ModelPool | None = None
+_model_pool_lock = threading.Lock()
+
+
+def get_model_pool() -> ModelPool:
+    """获取全局 ASR 模型池"""
+    global _model_pool
+    if _model_pool is None:
+        with _model_pool_lock:
+            if _model_pool is None:
+                from .factory import create_asr_service
+
+                config = get_config()
+                _model_pool = ModelPool(
+                    builder=create_asr_service,
+                    budget_bytes=config.asr.model_pool_budget_mb * 1024 * 1024,
+                    idle_timeout_s=config.asr.model_idle_timeout_s,
+                )
+    return _model_pool
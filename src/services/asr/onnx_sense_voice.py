@@ -0,0 +1,223 @@
+"""
+SenseVoiceSmall ONNX Runtime 推理引擎
+
+首次使用时通过 src/SenseVoiceSmall/export_meta.py 将已加载的 torch 模型导出为 ONNX
+（可选 int8 动态量化），缓存在模型目录旁；之后推理走 fbank → ONNX 编码器 → CTC 贪心解码，
+不再经过 torch 编码器。
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ONNX_DIR_NAME = "onnx"
+_FP32_NAME = "model.onnx"
+_INT8_NAME = "model_quant.onnx"
+_OPSET_VERSION = 14
+
+# 与 SenseVoiceSmall.lid_dict / textnorm_dict 保持一致
+_LANGUAGE_IDS = {"auto": 0, "zh": 3, "en": 4, "yue": 7, "ja": 11, "ko": 12, "nospeech": 13}
+_TEXTNORM_IDS = {"withitn": 14, "woitn": 15}
+
+_export_lock = threading.Lock()
+
+
+def ctc_greedy_decode(
+    logits: np.ndarray, lengths: np.ndarray, blank_id: int = 0
+) -> list[list[int]]:
+    """
+    CTC 贪心解码：逐帧 argmax，合并连续重复并去掉 blank
+
+    Args:
+        logits: [batch, frames, vocab]
+        lengths: 每条样本的有效帧数 [batch]
+        blank_id: blank 的 token id
+
+    Returns:
+        list[list[int]]: 每条样本的 token id 序列
+    """
+    best = logits.argmax(axis=-1)
+    results = []
+    for i, length in enumerate(np.asarray(lengths).reshape(-1)):
+        path = best[i, : int(length)]
+        if path.size == 0:
+            results.append([])
+            continue
+        keep = np.empty(path.shape, dtype=bool)
+        keep[0] = True
+        np.not_equal(path[1:], path[:-1], out=keep[1:])
+        tokens = path[keep]
+        results.append(tokens[tokens != blank_id].tolist())
+    return results
+
+
+def resolve_onnx_dir(auto_model: Any, model_dir: Path | None) -> Path:
+    """ONNX 缓存目录：配置了 MODEL_DIR 时放在其下，否则放在下载的模型目录中"""
+    if model_dir is not None:
+        return Path(model_dir) / _ONNX_DIR_NAME / "SenseVoiceSmall"
+    model_path = getattr(auto_model, "kwargs", {}).get("model_path")
+    if model_path and Path(model_path).is_dir():
+        return Path(model_path) / _ONNX_DIR_NAME
+    return Path("./models") / _ONNX_DIR_NAME / "SenseVoiceSmall"
+
+
+def export_sense_voice_onnx(auto_model: Any, onnx_dir: Path, quantize: bool = False) -> Path:
+    """
+    导出 SenseVoiceSmall 为 ONNX（已存在则直接复用）
+
+    Args:
+        auto_model: 已加载的 funasr AutoModel
+        onnx_dir: 输出目录
+        quantize: 是否额外生成 int8 动态量化模型并返回其路径
+
+    Returns:
+        Path: 可供 onnxruntime 加载的模型路径
+    """
+    fp32_path = onnx_dir / _FP32_NAME
+    int8_path = onnx_dir / _INT8_NAME
+    target = int8_path if quantize else fp32_path
+
+    with _export_lock:
+        if target.exists():
+            return target
+
+        onnx_dir.mkdir(parents=True, exist_ok=True)
+        if not fp32_path.exists():
+            _export_fp32(auto_model, fp32_path)
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"正在生成 int8 动态量化模型: {int8_path}")
+            tmp_path = int8_path.with_suffix(".tmp.onnx")
+            quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+            tmp_path.replace(int8_path)
+
+    return target
+
+
+def _export_fp32(auto_model: Any, fp32_path: Path) -> None:
+    import torch
+
+    from src.SenseVoiceSmall.export_meta import export_rebuild_model
+
+    logger.info(f"正在导出 SenseVoiceSmall ONNX 模型: {fp32_path}")
+    # export_rebuild_model 会替换 forward，必须作用在副本上，不影响 torch 推理路径
+    model = copy.deepcopy(auto_model.model).to("cpu").eval()
+    model = export_rebuild_model(model, device="cpu", max_seq_len=512)
+
+    tmp_path = fp32_path.with_suffix(".tmp.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            model.export_dummy_inputs(),
+            str(tmp_path),
+            input_names=model.export_input_names(),
+            output_names=model.export_output_names(),
+            dynamic_axes=model.export_dynamic_axes(),
+            opset_version=_OPSET_VERSION,
+        )
+    tmp_path.replace(fp32_path)
+
+
+class SenseVoiceOnnxEngine:
+    """SenseVoiceSmall ONNX 推理（批量 fbank → ONNX → CTC 贪心解码）"""
+
+    def __init__(
+        self,
+        onnx_path: Path,
+        frontend: Any,
+        tokenizer: Any,
+        providers: list[str] | None = None,
+        intra_op_threads: int = 0,
+    ):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.onnx_path = Path(onnx_path)
+        self.session = ort.InferenceSession(
+            str(onnx_path),
+            sess_options=options,
+            providers=providers or ["CPUExecutionProvider"],
+        )
+        self.frontend = frontend
+        self.tokenizer = tokenizer
+        self.blank_id = 0
+
+    @classmethod
+    def from_auto_model(
+        cls,
+        auto_model: Any,
+        model_dir: Path | None = None,
+        quantize: bool = False,
+        providers: list[str] | None = None,
+        intra_op_threads: int = 0,
+    ) -> SenseVoiceOnnxEngine:
+        """从已加载的 AutoModel 构建引擎（复用其 frontend 与 tokenizer）"""
+        onnx_path = export_sense_voice_onnx(
+            auto_model, resolve_onnx_dir(auto_model, model_dir), quantize=quantize
+        )
+        logger.info(f"SenseVoice ONNX 推理已启用: {onnx_path}")
+        return cls(
+            onnx_path,
+            frontend=auto_model.kwargs["frontend"],
+            tokenizer=auto_model.kwargs["tokenizer"],
+            providers=providers,
+            intra_op_threads=intra_op_threads,
+        )
+
+    def extract_features(
+        self, inputs: list[np.ndarray], sample_rate: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """批量提取 fbank（LFR + CMVN），返回 (speech[B, T, 560], speech_lengths[B])"""
+        from funasr.utils.load_utils import extract_fbank, load_audio_text_image_video
+
+        samples = load_audio_text_image_video(
+            inputs, fs=self.frontend.fs, audio_fs=sample_rate, data_type="sound"
+        )
+        speech, speech_lengths = extract_fbank(samples, data_type="sound", frontend=self.frontend)
+        return (
+            speech.numpy().astype(np.float32, copy=False),
+            speech_lengths.numpy().astype(np.int32, copy=False).reshape(-1),
+        )
+
+    def transcribe_batch(
+        self,
+        inputs: list[np.ndarray],
+        sample_rate: int = 16000,
+        language: str = "auto",
+        use_itn: bool = True,
+    ) -> list[str]:
+        """
+        批量转录
+
+        Returns:
+            list[str]: 与输入一一对应的原始文本（含语言/情感标签，需 clean_asr_text 清洗）
+        """
+        if not inputs:
+            return []
+        speech, speech_lengths = self.extract_features(inputs, sample_rate)
+        batch = speech.shape[0]
+        feeds = {
+            "speech": speech,
+            "speech_lengths": speech_lengths,
+            "language": np.full(batch, _LANGUAGE_IDS.get(language, 0), dtype=np.int32),
+            "textnorm": np.full(
+                batch, _TEXTNORM_IDS["withitn" if use_itn else "woitn"], dtype=np.int32
+            ),
+        }
+        ctc_logits, encoder_out_lens = self.session.run(None, feeds)
+        token_ids = ctc_greedy_decode(ctc_logits, encoder_out_lens, blank_id=self.blank_id)
+        return [self.tokenizer.decode(ids) for ids in token_ids]
@@ -4,16 +4,36 @@ Paraformer ASR服务
 封装Paraformer模型的ASR功能
 """
 
+import numpy as np
 from funasr import AutoModel
 
+from src.core.exceptions import TaskCancelledException
 from src.utils.config import get_config
 
-from .base import BaseASRService
+from .base import (
+    BaseASRService,
+    PartialTranscriptCallback,
+    PartialTranscriptTracker,
+    join_segment_texts,
+)
+from .batch_tuner import run_with_batch_size
+from .batching import get_batching_engine
+from .torch_profile import inference_context, optimize_auto_model, profile_signature
 
 
 class ParaformerService(BaseASRService):
     """Paraformer ASR服务"""
 
+    _MODEL_SPEC = {
+        "model": "paraformer-zh",
+        "model_revision": "v2.0.4",
+        "vad_model": "fsmn-vad",
+        "vad_model_revision": "v2.0.4",
+        "punc_model": "ct-punc-c",
+        "punc_model_revision": "v2.0.4",
+    }
+    _GENERATE_KWARGS = {"batch_size_s": 600}
+
     def __init__(self, device: str, onnx_providers: list | None = None):
         """
         初始化Paraformer服务
@@ -37,12 +57,7 @@ class ParaformerService(BaseASRService):
             self.logger.info("Loading Paraformer model...")
 
             model_kwargs = {
-                "model": "paraformer-zh",
-                "model_revision": "v2.0.4",
-                "vad_model": "fsmn-vad",
-                "vad_model_revision": "v2.0.4",
-                "punc_model": "ct-punc-c",
-                "punc_model_revision": "v2.0.4",
+                **self._MODEL_SPEC,
                 "device": self.device,
                 "disable_update": True,
                 "model_hub": "huggingface",
@@ -58,6 +73,7 @@ class ParaformerService(BaseASRService):
                     self.logger.warning(f"ONNX 参数设置失败，使用默认模式: {e}")
 
             self.model = AutoModel(**model_kwargs)
+            optimize_auto_model(self.model, self.device, "Paraformer")
             self.logger.info("Paraformer model loaded successfully.")
 
         except Exception as e:
@@ -66,19 +82,107 @@ class ParaformerService(BaseASRService):
     def transcribe(self, audio_path: str, task_id: str | None = None) -> str:
         """..."""
         self.check_cancellation(task_id)
-        self.load_model()
+        self.ensure_model_loaded()
         self.check_cancellation(task_id)
 
         try:
             self.logger.info(f"Transcribing audio with Paraformer: {audio_path}")
-            res = self.model.generate(
-                input=audio_path,
-                batch_size_s=600,
+            res = self._generate(0, input=audio_path)
+            return res[0]["text"]
+        except Exception as e:
+            raise RuntimeError(f"Failed to transcribe audio with Paraformer: {e}") from e
+
+    def transcribe_decoded(self, audio, task_id: str | None = None) -> str:
+        """直接以内存中的 float32 数组作为输入，避免写临时 WAV"""
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+        self.check_cancellation(task_id)
+
+        try:
+            self.logger.info(
+                f"Transcribing decoded audio with Paraformer: {audio.source} ({audio.duration_s:.1f}s)"
             )
+            res = self._generate(audio.duration_s, input=audio.to_float32(), fs=audio.sample_rate)
             return res[0]["text"]
         except Exception as e:
             raise RuntimeError(f"Failed to transcribe audio with Paraformer: {e}") from e
 
-    def generate_with_timestamps(self, audio_path: str, batch_size_s: int = 600) -> list:
-        self.load_model()
-        return self.model.generate(input=audio_path, batch_size_s=batch_size_s)
+    def transcribe_segments(
+        self,
+        audio,
+        segments,
+        task_id: str | None = None,
+        on_partial: PartialTranscriptCallback | None = None,
+    ) -> str:
+        """
+        仅对给定语音段推理
+
+        按时长分桶批量调用 AutoModel.inference（绕过内置 fsmn-vad），拼接后再统一做一次标点恢复。
+        """
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+
+        try:
+            self.logger.info(f"Transcribing {len(segments)} VAD segments with Paraformer")
+
+            def infer_batch(batch):
+                inputs = [audio.slice_float32_ms(*segments[i]) for i in batch.indices]
+                with inference_context():
+                    res = self.model.inference(inputs, fs=audio.sample_rate, batch_size=len(inputs))
+                return [item["text"] for item in res]
+
+            tracker = PartialTranscriptTracker(segments, on_partial, self.logger)
+            texts = get_batching_engine().run(
+                segments,
+                infer_batch,
+                before_batch=lambda: self.check_cancellation(task_id),
+                after_batch=tracker.update,
+            )
+
+            text = join_segment_texts(texts)
+            if text and self.model.punc_model is not None:
+                self.check_cancellation(task_id)
+                with inference_context():
+                    punc_res = self.model.inference(
+                        text, model=self.model.punc_model, kwargs=self.model.punc_kwargs
+                    )
+                text = punc_res[0]["text"]
+            return text
+        except TaskCancelledException:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to transcribe audio with Paraformer: {e}") from e
+
+    def get_cache_signature(self) -> dict:
+        return {**self._MODEL_SPEC, "generate": self._GENERATE_KWARGS, **profile_signature()}
+
+    def generate_with_timestamps(
+        self, audio: str | np.ndarray, batch_size_s: int | None = None, fs: int = 16000
+    ) -> list:
+        """
+        audio 为文件路径或内存中的 float32 数组（采样率 fs）；
+        batch_size_s 为空时按可用内存自动选择
+        """
+        self.ensure_model_loaded()
+        if batch_size_s:
+            with inference_context():
+                return self.model.generate(input=audio, fs=fs, batch_size_s=batch_size_s)
+        duration_s = 0 if isinstance(audio, str) else len(audio) / fs
+        return self._generate(duration_s, input=audio, fs=fs)
+
+    def _generate(self, duration_s: float, **inputs) -> list:
+        """调用 AutoModel.generate，batch_size_s 按可用内存自动选择（OOM 时减半重试）"""
+
+        def infer(batch_size_s: int) -> list:
+            with inference_context():
+                return self.model.generate(
+                    **inputs, **{**self._GENERATE_KWARGS, "batch_size_s": batch_size_s}
+                )
+
+        return run_with_batch_size(
+            "paraformer",
+            duration_s,
+            self._GENERATE_KWARGS["batch_size_s"],
+            infer,
+            device=self.device,
+        )
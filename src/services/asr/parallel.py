@@ -0,0 +1,282 @@
+"""
+多进程并行 ASR
+
+在 VAD 边界将长音频切为若干分片，分发给 N 个各自持有模型副本的工作进程，
+再按时间顺序拼接文本。适用于纯 CPU 服务器：单个模型实例无法吃满全部核心。
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.core.exceptions import TaskCancelledException
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+from .base import PartialTranscriptCallback, PartialTranscriptTracker, join_segment_texts
+from .preprocess import DecodedAudio
+
+logger = get_logger(__name__)
+
+# 工作进程内的 ASR 服务（每个进程一个模型副本）
+_worker_service = None
+
+
+@dataclass(frozen=True)
+class AudioShard:
+    """一个并行分片：在原音频中的采样区间，以及分片内的相对语音段"""
+
+    start_ms: int
+    end_ms: int
+    segments: tuple[tuple[int, int], ...]
+
+
+def split_into_shards(segments: list[tuple[int, int]], num_shards: int) -> list[AudioShard]:
+    """
+    在 VAD 边界将语音段切分为时间上连续的分片，使各分片语音时长尽量均衡
+
+    Args:
+        segments: 语音段 [(start_ms, end_ms), ...]，按时间排序
+        num_shards: 期望分片数
+
+    Returns:
+        list[AudioShard]: 分片列表（按时间顺序）
+    """
+    if not segments:
+        return []
+    num_shards = max(1, min(num_shards, len(segments)))
+    total_ms = sum(end - start for start, end in segments)
+    target_ms = total_ms / num_shards
+
+    groups: list[list[tuple[int, int]]] = [[]]
+    acc_ms = 0
+    for i, (start, end) in enumerate(segments):
+        remaining_segments = len(segments) - i
+        remaining_shards = num_shards - len(groups)
+        # 剩余段数只够每个分片一段时，强制切分
+        must_split = remaining_segments <= remaining_shards
+        if (
+            groups[-1]
+            and len(groups) < num_shards
+            # 当前段的中点越过本分片的目标边界时切分
+            and (acc_ms + (end - start) / 2 >= target_ms * len(groups) or must_split)
+        ):
+            groups.append([])
+        groups[-1].append((start, end))
+        acc_ms += end - start
+
+    shards = []
+    for group in groups:
+        shard_start = group[0][0]
+        shard_end = group[-1][1]
+        shards.append(
+            AudioShard(
+                start_ms=shard_start,
+                end_ms=shard_end,
+                segments=tuple((s - shard_start, e - shard_start) for s, e in group),
+            )
+        )
+    return shards
+
+
+def _init_worker(model_type: str, torch_threads: int) -> None:
+    """工作进程初始化：限制线程数并加载模型副本"""
+    global _worker_service
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(torch_threads)
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except Exception:
+        pass
+
+    # 工作进程的线程数由并行配置决定，覆盖 TORCH_*_THREADS
+    config = get_config()
+    config.asr.torch_intra_op_threads = torch_threads
+    config.asr.torch_inter_op_threads = 1
+    # 工作进程在整个生命周期内持有模型副本，不能被模型池的空闲淘汰释放
+    config.asr.model_idle_timeout_s = 0
+
+    from .factory import get_asr_service
+
+    _worker_service = get_asr_service(model_type)
+    _worker_service.ensure_model_loaded()
+
+
+def _transcribe_shard(
+    samples: np.ndarray, sample_rate: int, segments: tuple[tuple[int, int], ...]
+) -> str:
+    """工作进程任务：转录一个分片"""
+    audio = DecodedAudio(samples=samples, sample_rate=sample_rate, source="shard")
+    return _worker_service.transcribe_segments(audio, list(segments))
+
+
+def _worker_pid(delay_s: float) -> int:
+    """预热任务：返回工作进程 PID（能执行任务即说明 initializer 已完成模型加载）"""
+    time.sleep(delay_s)
+    return os.getpid()
+
+
+class ParallelASRPool:
+    """
+    ASR 模型副本进程池
+
+    每个工作进程在启动时加载一份模型（spawn 方式，避免 fork 后的 torch 线程状态问题）。
+    工作进程异常退出（初始化失败、被 OOM 终止）或任务取消时进程池被关闭（closed），
+    get_parallel_pool 会在下次调用时重建。
+    """
+
+    def __init__(self, model_type: str, workers: int, torch_threads: int):
+        self.model_type = model_type
+        self.workers = max(1, int(workers))
+        self.torch_threads = max(1, int(torch_threads))
+        self.closed = False
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_type, self.torch_threads),
+        )
+        logger.info(
+            f"并行 ASR 进程池已创建: model={model_type}, workers={self.workers}, "
+            f"torch_threads={self.torch_threads}"
+        )
+
+    def transcribe(
+        self,
+        audio: DecodedAudio,
+        segments: list[tuple[int, int]],
+        task_id: str | None = None,
+        on_partial: PartialTranscriptCallback | None = None,
+    ) -> str:
+        """
+        并行转录：按 VAD 边界分片，结果按时间顺序拼接（每完成一个分片回调一次 on_partial）
+
+        Raises:
+            TaskCancelledException: 任务被取消（未开始的分片被撤销，正在执行的分片所在的
+                工作进程被终止）
+            BrokenProcessPool: 工作进程异常退出（进程池已关闭，调用方可回退到单实例转录）
+        """
+        from src.utils.helpers.task_manager import get_task_manager
+
+        cancel_signal = get_task_manager().get_cancel_signal(task_id) if task_id else None
+        shards = split_into_shards(segments, self.workers)
+        logger.info(f"并行 ASR: {len(segments)} 个语音段 -> {len(shards)} 个分片")
+        tracker = PartialTranscriptTracker(
+            [(shard.start_ms, shard.end_ms) for shard in shards], on_partial, logger
+        )
+
+        # 取消信号触发时完成该 future，立即唤醒下面的 wait
+        cancelled: Future = Future()
+
+        def on_cancel() -> None:
+            if not cancelled.done():
+                cancelled.set_result(None)
+
+        unsubscribe = cancel_signal.subscribe(on_cancel) if cancel_signal is not None else None
+        futures: dict[Future, int] = {}
+        texts: list[str] = [""] * len(shards)
+        try:
+            for idx, shard in enumerate(shards):
+                samples = np.ascontiguousarray(audio.slice_ms(shard.start_ms, shard.end_ms))
+                future = self._executor.submit(
+                    _transcribe_shard, samples, audio.sample_rate, shard.segments
+                )
+                futures[future] = idx
+
+            pending = set(futures)
+            while pending:
+                if cancelled.done():
+                    raise TaskCancelledException(task_id)
+                done, pending = wait(pending | {cancelled}, return_when=FIRST_COMPLETED)
+                pending.discard(cancelled)
+                for future in done - {cancelled}:
+                    idx = futures[future]
+                    texts[idx] = future.result()
+                    tracker.update([idx], [texts[idx]])
+        except TaskCancelledException:
+            if any(future.running() for future in futures):
+                # 进行中的分片无法撤销，终止工作进程；进程池下次使用时重建
+                logger.info(f"任务取消，终止并行 ASR 工作进程: {task_id}")
+                self.terminate()
+            else:
+                for future in futures:
+                    future.cancel()
+            raise
+        except BrokenProcessPool:
+            logger.error("并行 ASR 工作进程异常退出，进程池已失效")
+            self.terminate()
+            raise
+        finally:
+            if unsubscribe is not None:
+                unsubscribe()
+
+        return join_segment_texts(texts)
+
+    def warmup(self, timeout_s: float = 600.0) -> int:
+        """
+        启动全部工作进程并等待其完成模型加载
+
+        ProcessPoolExecutor 按需启动工作进程，单个预热任务只会启动一个进程。
+        这里每轮提交 workers 个短任务，直到每个工作进程都至少执行过一个任务。
+
+        Returns:
+            已就绪的工作进程数
+        """
+        ready: set[int] = set()
+        deadline = time.monotonic() + timeout_s
+        while len(ready) < self.workers and time.monotonic() < deadline:
+            futures = [self._executor.submit(_worker_pid, 0.05) for _ in range(self.workers)]
+            ready.update(future.result() for future in futures)
+        logger.info(f"并行 ASR 进程池预热完成: {len(ready)}/{self.workers} 个工作进程就绪")
+        return len(ready)
+
+    def terminate(self) -> None:
+        """终止全部工作进程（包括正在执行的分片）并关闭进程池"""
+        processes = list((getattr(self._executor, "_processes", None) or {}).values())
+        self.shutdown()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self) -> None:
+        self.closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pools: dict[str, ParallelASRPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_parallel_pool(model_type: str) -> ParallelASRPool:
+    """获取（或创建）指定模型类型的并行进程池"""
+    with _pools_lock:
+        pool = _pools.get(model_type)
+        if pool is None or pool.closed:
+            config = get_config()
+            pool = ParallelASRPool(
+                model_type,
+                workers=config.asr.parallel_workers,
+                torch_threads=config.asr.parallel_torch_threads,
+            )
+            _pools[model_type] = pool
+        return pool
+
+
+def shutdown_parallel_pools() -> None:
+    """关闭所有并行进程池"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
@@ -2,20 +2,24 @@
 ASR 音频预处理
 
 将输入音频统一转换为 16kHz / mono / PCM WAV (16-bit)。
+也可一次性解码为内存映射的 PCM 缓冲（DecodedAudio），供 VAD、ASR 与字幕处理共享。
 """
 
 from __future__ import annotations
 
-import subprocess
-import time
+import hashlib
+import struct
 import uuid
+import weakref
+from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import soundfile as sf
 
-from src.core.exceptions import ASRInferenceError, AudioFormatError, TaskCancelledException
+from src.core.exceptions import ASRInferenceError, AudioFormatError
 from src.utils.config import get_config
-from src.utils.helpers.task_manager import get_task_manager
+from src.utils.helpers.process_supervisor import get_process_supervisor
 from src.utils.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -25,6 +29,72 @@ _TARGET_CHANNELS = 1
 _TARGET_SUBTYPE = "PCM_16"
 
 
+@dataclass
+class DecodedAudio:
+    """
+    解码后的 16kHz / mono / int16 PCM 音频
+
+    samples 通常为对 16kHz WAV 的内存映射（只读），也可以是内存缓冲；
+    slice_* 方法返回零拷贝视图，浮点转换只针对所取区间且不缓存（按段转换，
+    不会为整段音频常驻一份 float32 副本）。
+    """
+
+    samples: np.ndarray
+    sample_rate: int = _TARGET_SAMPLE_RATE
+    source: str = ""
+
+    @property
+    def num_samples(self) -> int:
+        return int(self.samples.shape[0])
+
+    @property
+    def duration_s(self) -> float:
+        return self.num_samples / float(self.sample_rate)
+
+    def _ms_to_index(self, ms: float) -> int:
+        return min(max(0, int(ms * self.sample_rate / 1000)), self.num_samples)
+
+    def slice_ms(self, start_ms: float, end_ms: float) -> np.ndarray:
+        """按毫秒区间返回 int16 视图（不复制）"""
+        return self.samples[self._ms_to_index(start_ms) : self._ms_to_index(end_ms)]
+
+    def segment(self, start_ms: float, end_ms: float) -> DecodedAudio:
+        """按毫秒区间返回共享同一缓冲的子音频"""
+        return DecodedAudio(
+            samples=self.slice_ms(start_ms, end_ms),
+            sample_rate=self.sample_rate,
+            source=self.source,
+        )
+
+    def slice_float32_ms(self, start_ms: float, end_ms: float) -> np.ndarray:
+        """按毫秒区间返回归一化到 [-1, 1) 的 float32 数组"""
+        return self.slice_float32(self._ms_to_index(start_ms), self._ms_to_index(end_ms))
+
+    def slice_float32(self, start: int, end: int) -> np.ndarray:
+        """按采样点区间返回归一化到 [-1, 1) 的 float32 数组（仅转换该区间）"""
+        return _pcm16_to_float32(self.samples[start:end])
+
+    def to_float32(self) -> np.ndarray:
+        """返回整段 float32 音频（每次调用重新转换，由调用方持有；长音频应按段使用 slice_float32）"""
+        return _pcm16_to_float32(self.samples)
+
+    def digest(self) -> str:
+        """PCM 内容哈希（与 cache.hash_audio_file 对同一 PCM 数据的结果一致）"""
+        h = hashlib.sha256()
+        h.update(f"{self.sample_rate}:1:".encode())
+        h.update(memoryview(np.ascontiguousarray(self.samples)).cast("B"))
+        return h.hexdigest()
+
+    def write_wav(self, path: Path) -> Path:
+        """将缓冲写为 16kHz / mono / PCM_16 WAV（供只接受文件输入的后端使用）"""
+        sf.write(str(path), self.samples, samplerate=self.sample_rate, subtype=_TARGET_SUBTYPE)
+        return path
+
+
+def _pcm16_to_float32(samples: np.ndarray) -> np.ndarray:
+    return samples.astype(np.float32) / 32768.0
+
+
 def _is_target_wav(path: Path) -> bool:
     try:
         info = sf.info(str(path))
@@ -37,13 +107,6 @@ def _is_target_wav(path: Path) -> bool:
     )
 
 
-def _read_text_safely(path: Path) -> str:
-    try:
-        return path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        return path.read_text(encoding="utf-8", errors="replace")
-
-
 def _safe_unlink(path: Path) -> None:
     try:
         if path.exists():
@@ -52,32 +115,19 @@ def _safe_unlink(path: Path) -> None:
         pass
 
 
-def prepare_asr_audio(audio_path: str, task_id: str | None = None) -> tuple[Path, bool]:
-    """
-    将输入音频转换为 16kHz / mono / PCM_16 WAV。
-    Returns:
-        (输出音频路径, 是否发生转换)
-    """
-    source = Path(audio_path)
-    if not source.exists():
-        raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
-    if source.suffix.lower() == ".wav" and _is_target_wav(source):
-        return source, False
-
+def _transcode_to_wav(source: Path, task_id: str | None = None) -> Path:
+    """ffmpeg 转码为临时目录下的目标格式 WAV"""
     config = get_config()
     temp_dir = (config.paths.temp_dir or Path("./temp")) / "asr_preprocess"
     temp_dir.mkdir(parents=True, exist_ok=True)
 
-    run_id = uuid.uuid4().hex
-    output_wav = temp_dir / f"{source.stem}.{run_id}.wav"
-    stdout_path = temp_dir / f"{source.stem}.{run_id}.ffmpeg.stdout.txt"
-    stderr_path = temp_dir / f"{source.stem}.{run_id}.ffmpeg.stderr.txt"
+    output_wav = temp_dir / f"{source.stem}.{uuid.uuid4().hex}.wav"
     cmd = [
         "ffmpeg",
         "-y",
         "-i",
         str(source),
+        "-vn",
         "-ar",
         str(_TARGET_SAMPLE_RATE),
         "-ac",
@@ -87,56 +137,9 @@ def prepare_asr_audio(audio_path: str, task_id: str | None = None) -> tuple[Path
         str(output_wav),
     ]
 
-    task_manager = get_task_manager() if task_id else None
     try:
-        if task_id:
-            task_manager.check_cancellation(task_id)
-
-        with (
-            open(stdout_path, "wb") as stdout_f,
-            open(stderr_path, "wb") as stderr_f,
-        ):
-            proc = subprocess.Popen(
-                cmd,
-                stdout=stdout_f,
-                stderr=stderr_f,
-            )
-
-            try:
-                start_time = time.time()
-                timeout_seconds = 600
-                while True:
-                    if task_id:
-                        task_manager.check_cancellation(task_id)
-                    ret = proc.poll()
-                    if ret is not None:
-                        break
-                    if time.time() - start_time > timeout_seconds:
-                        proc.kill()
-                        raise RuntimeError("ffmpeg audio preprocessing timed out after 600s")
-                    time.sleep(0.2)
-            except TaskCancelledException:
-                proc.terminate()
-                try:
-                    proc.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    proc.kill()
-                    proc.wait(timeout=2)
-                _safe_unlink(output_wav)
-                _safe_unlink(stdout_path)
-                _safe_unlink(stderr_path)
-                raise
-
-            if ret != 0:
-                _safe_unlink(output_wav)
-                stderr_tail = _read_text_safely(stderr_path)
-                raise ASRInferenceError(
-                    message=f"ffmpeg 转码失败: {stderr_tail}",
-                    model="preprocess",
-                    audio_file=str(source),
-                )
+        result = get_process_supervisor().run(cmd, name="ffmpeg 转码", task_id=task_id)
     except FileNotFoundError as e:
-        _safe_unlink(output_wav)
         raise AudioFormatError(
             message=(
                 "未找到 ffmpeg。ASR 预处理需要 ffmpeg 将音频转换为 16kHz 单声道 PCM WAV (16-bit)。"
@@ -144,10 +147,17 @@ def prepare_asr_audio(audio_path: str, task_id: str | None = None) -> tuple[Path
             audio_file=str(source),
             format=source.suffix,
         ) from e
-    finally:
-        if not config.debug_flag:
-            _safe_unlink(stdout_path)
-            _safe_unlink(stderr_path)
+    except BaseException:
+        _safe_unlink(output_wav)
+        raise
+
+    if result.returncode != 0:
+        _safe_unlink(output_wav)
+        raise ASRInferenceError(
+            message=f"ffmpeg 转码失败: {result.stderr}",
+            model="preprocess",
+            audio_file=str(source),
+        )
 
     if not output_wav.exists():
         raise ASRInferenceError(
@@ -157,7 +167,100 @@ def prepare_asr_audio(audio_path: str, task_id: str | None = None) -> tuple[Path
         )
 
     logger.info(f"ASR 预处理: {source} -> {output_wav}")
-    return output_wav, True
+    return output_wav
+
+
+def _wav_data_chunk(path: Path) -> tuple[int, int]:
+    """解析 RIFF/WAVE 头，返回 (data 块偏移, data 块字节数)"""
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"WAV data chunk not found: {path}")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"data":
+                return f.tell(), chunk_size
+            f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def _memmap_target_wav(path: Path) -> np.ndarray:
+    offset, size = _wav_data_chunk(path)
+    # 部分写入器会把 data 块大小写成 0 或占位值，按文件实际长度截断
+    size = min(size, path.stat().st_size - offset)
+    num_samples = size // 2
+    if num_samples == 0:
+        return np.zeros(0, dtype=np.int16)
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(num_samples,))
+
+
+def decode_audio(audio_path: str, task_id: str | None = None) -> DecodedAudio:
+    """
+    将输入音频解码为 16kHz / mono / int16 PCM 缓冲（内存映射，不整段读入内存）
+
+    - 已符合格式的 WAV：直接内存映射 data 块（零拷贝）
+    - 其它格式：ffmpeg 流式转码为临时 WAV 后内存映射（临时文件随即删除）；
+      启用预处理音频缓存时，命中则内存映射缓存的 WAV，未命中则转码结果移入缓存
+
+    Raises:
+        FileNotFoundError: 输入文件不存在
+        AudioFormatError: 未找到 ffmpeg
+        ASRInferenceError: ffmpeg 解码失败
+        TaskCancelledException: 任务被取消
+    """
+    from .audio_cache import get_preprocessed_audio_cache
+
+    source = Path(audio_path)
+    if not source.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    if source.suffix.lower() == ".wav" and _is_target_wav(source):
+        try:
+            return DecodedAudio(samples=_memmap_target_wav(source), source=str(source))
+        except Exception as e:
+            logger.debug(f"WAV 内存映射失败，改用 ffmpeg 解码: {e}")
+
+    cache = get_preprocessed_audio_cache()
+    if cache is None:
+        samples = _memmap_temp_wav(_transcode_to_wav(source, task_id))
+        return DecodedAudio(samples=samples, source=str(source))
+
+    key = cache.fingerprint(source)
+    # 同一源文件的并发请求只转码一次
+    with cache.lock(key):
+        cached = cache.get(key)
+        if cached is not None:
+            try:
+                samples = _memmap_target_wav(cached)
+                logger.info(f"命中预处理音频缓存，跳过 ffmpeg 解码: {source}")
+                return DecodedAudio(samples=samples, source=str(source))
+            except Exception as e:
+                logger.warning(f"预处理音频缓存条目无效，重新解码: {e}")
+                cache.discard(key)
+        output_wav = _transcode_to_wav(source, task_id)
+        cached = cache.adopt(key, output_wav)
+        samples = _memmap_target_wav(cached) if cached is not None else None
+    if samples is None:
+        # 超出缓存配额或移入失败：按未启用缓存处理
+        samples = _memmap_temp_wav(output_wav)
+    return DecodedAudio(samples=samples, source=str(source))
+
+
+def _memmap_temp_wav(path: Path) -> np.ndarray:
+    """内存映射临时 WAV 后删除文件（POSIX 下映射在删除后仍然有效）"""
+    try:
+        samples = _memmap_target_wav(path)
+    except BaseException:
+        _safe_unlink(path)
+        raise
+    try:
+        path.unlink()
+    except OSError:
+        # Windows 下映射期间无法删除，等映射释放后再删除
+        weakref.finalize(samples, _safe_unlink, path)
+    return samples
 
 
 def cleanup_preprocessed_audio(path: Path) -> None:
@@ -6,15 +6,41 @@ SenseVoice ASR服务
 
 from funasr import AutoModel
 
+from src.core.exceptions import TaskCancelledException
 from src.text_arrangement.split_text import clean_asr_text
 from src.utils.config import get_config
 
-from .base import BaseASRService
+from .base import (
+    BaseASRService,
+    PartialTranscriptCallback,
+    PartialTranscriptTracker,
+    join_segment_texts,
+)
+from .batch_tuner import run_with_batch_size
+from .batching import get_batching_engine
+from .torch_profile import inference_context, optimize_auto_model, profile_signature
 
 
 class SenseVoiceService(BaseASRService):
     """SenseVoice ASR服务"""
 
+    _MODEL_SPEC = {
+        "model": "iic/SenseVoiceSmall",
+        "vad_model": "fsmn-vad",
+        "vad_kwargs": {"max_single_segment_time": 30000},
+    }
+    _GENERATE_KWARGS = {
+        "language": "auto",  # "zh", "en", "yue", "ja", "ko", "nospeech"
+        "use_itn": True,
+        "batch_size_s": 60,
+        "merge_vad": True,
+        "merge_length_s": 15,
+    }
+    # 段级推理（已由外部 VAD 切分）时使用的参数
+    _SEGMENT_KWARGS = {"language": "auto", "use_itn": True}
+    # ONNX 路径下 VAD 不可用时的固定切分窗口（与内置 VAD 的 max_single_segment_time 一致）
+    _ONNX_WINDOW_MS = 30000
+
     def __init__(self, device: str, onnx_providers: list | None = None):
         """
         初始化SenseVoice服务
@@ -27,6 +53,7 @@ class SenseVoiceService(BaseASRService):
         config = get_config()
         self.device = device
         self.onnx_providers = onnx_providers if config.asr.use_onnx else None
+        self._onnx_engine = None
 
     def load_model(self):
         """加载SenseVoiceSmall模型"""
@@ -38,31 +65,48 @@ class SenseVoiceService(BaseASRService):
             self.logger.info("Loading SenseVoiceSmall model...")
 
             model_kwargs = {
-                "model": "iic/SenseVoiceSmall",
+                **self._MODEL_SPEC,
                 "trust_remote_code": True,
                 "remote_code": "./src/SenseVoiceSmall/model.py",
-                "vad_model": "fsmn-vad",
-                "vad_kwargs": {"max_single_segment_time": 30000},
                 "device": self.device,
                 "disable_update": True,
                 "model_hub": "huggingface",
                 "cache_dir": str(config.paths.model_dir) if config.paths.model_dir else None,
             }
 
-            # 如果启用ONNX且有可用提供者
-            if self.onnx_providers:
-                try:
-                    model_kwargs["onnx_providers"] = self.onnx_providers
-                    self.logger.info("尝试使用 ONNX 推理模式")
-                except Exception as e:
-                    self.logger.warning(f"ONNX 参数设置失败，使用默认模式: {e}")
-
             self.model = AutoModel(**model_kwargs)
             self.logger.info("SenseVoiceSmall model loaded successfully.")
 
         except Exception as e:
             raise RuntimeError(f"Failed to load SenseVoiceSmall model: {e}") from e
 
+        # 如果启用ONNX且有可用提供者：导出（或复用缓存的）ONNX 模型，编码器推理改走 onnxruntime
+        if self.onnx_providers:
+            self._load_onnx_engine()
+        # ONNX 引擎已接管编码器时，不再量化 torch 编码器
+        if self._onnx_engine is None:
+            optimize_auto_model(self.model, self.device, "SenseVoiceSmall")
+
+    def _load_onnx_engine(self):
+        from .onnx_sense_voice import SenseVoiceOnnxEngine
+
+        config = get_config()
+        try:
+            self._onnx_engine = SenseVoiceOnnxEngine.from_auto_model(
+                self.model,
+                model_dir=config.paths.model_dir,
+                quantize=config.asr.onnx_quantize,
+                providers=self.onnx_providers,
+                intra_op_threads=config.asr.onnx_intra_op_threads,
+            )
+        except Exception as e:
+            self._onnx_engine = None
+            self.logger.warning(f"SenseVoice ONNX 引擎初始化失败，使用 torch 推理: {e}")
+
+    def unload_model(self) -> None:
+        self._onnx_engine = None
+        super().unload_model()
+
     def transcribe(self, audio_path: str, task_id: str | None = None) -> str:
         """
         使用SenseVoice转录音频
@@ -78,24 +122,130 @@ class SenseVoiceService(BaseASRService):
         self.check_cancellation(task_id)
 
         # 加载模型
-        self.load_model()
+        self.ensure_model_loaded()
 
         # 再次检查任务是否被取消（模型加载后、推理前）
         self.check_cancellation(task_id)
 
+        if self._onnx_engine is not None:
+            from .preprocess import decode_audio
+
+            return self.transcribe_decoded(decode_audio(audio_path, task_id=task_id), task_id)
+
         try:
             self.logger.info(f"Transcribing audio with SenseVoice: {audio_path}")
-            res = self.model.generate(
-                input=audio_path,
-                cache={},
-                language="auto",  # "zh", "en", "yue", "ja", "ko", "nospeech"
-                use_itn=True,
-                batch_size_s=60,
-                merge_vad=True,
-                merge_length_s=15,
-            )
+            res = self._generate(0, input=audio_path)
 
             return clean_asr_text(res[0]["text"])
 
         except Exception as e:
             raise RuntimeError(f"Failed to transcribe audio with SenseVoice: {e}") from e
+
+    def transcribe_decoded(self, audio, task_id: str | None = None) -> str:
+        """直接以内存中的 float32 数组作为输入，避免写临时 WAV"""
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+        self.check_cancellation(task_id)
+
+        if self._onnx_engine is not None:
+            return self._transcribe_decoded_onnx(audio, task_id)
+
+        try:
+            self.logger.info(
+                f"Transcribing decoded audio with SenseVoice: {audio.source} ({audio.duration_s:.1f}s)"
+            )
+            res = self._generate(audio.duration_s, input=audio.to_float32(), fs=audio.sample_rate)
+            return clean_asr_text(res[0]["text"])
+        except Exception as e:
+            raise RuntimeError(f"Failed to transcribe audio with SenseVoice: {e}") from e
+
+    def _generate(self, duration_s: float, **inputs) -> list:
+        """调用 AutoModel.generate，batch_size_s 按可用内存自动选择（OOM 时减半重试）"""
+
+        def infer(batch_size_s: int) -> list:
+            with inference_context():
+                return self.model.generate(
+                    **inputs,
+                    cache={},
+                    **{**self._GENERATE_KWARGS, "batch_size_s": batch_size_s},
+                )
+
+        return run_with_batch_size(
+            "sense_voice",
+            duration_s,
+            self._GENERATE_KWARGS["batch_size_s"],
+            infer,
+            device=self.device,
+        )
+
+    def transcribe_segments(
+        self,
+        audio,
+        segments,
+        task_id: str | None = None,
+        on_partial: PartialTranscriptCallback | None = None,
+    ) -> str:
+        """
+        仅对给定语音段推理
+
+        按时长分桶批量调用 AutoModel.inference（绕过内置 fsmn-vad），避免对同一音频重复做 VAD。
+        """
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+
+        try:
+            self.logger.info(f"Transcribing {len(segments)} VAD segments with SenseVoice")
+
+            def infer_batch(batch):
+                inputs = [audio.slice_float32_ms(*segments[i]) for i in batch.indices]
+                if self._onnx_engine is not None:
+                    texts = self._onnx_engine.transcribe_batch(
+                        inputs, sample_rate=audio.sample_rate, **self._SEGMENT_KWARGS
+                    )
+                    return [clean_asr_text(text) for text in texts]
+                with inference_context():
+                    res = self.model.inference(
+                        inputs,
+                        fs=audio.sample_rate,
+                        batch_size=len(inputs),
+                        **self._SEGMENT_KWARGS,
+                    )
+                return [clean_asr_text(item["text"]) for item in res]
+
+            tracker = PartialTranscriptTracker(segments, on_partial, self.logger)
+            texts = get_batching_engine().run(
+                segments,
+                infer_batch,
+                before_batch=lambda: self.check_cancellation(task_id),
+                after_batch=tracker.update,
+            )
+            return join_segment_texts(texts)
+        except TaskCancelledException:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to transcribe audio with SenseVoice: {e}") from e
+
+    def _transcribe_decoded_onnx(self, audio, task_id: str | None = None) -> str:
+        """ONNX 编码器不含 VAD：先用 fsmn-vad 切分语音段（失败时按固定窗口切分）再批量推理"""
+        from .vad import VADService
+
+        try:
+            segments = VADService().segment_audio(audio)
+        except Exception as e:
+            self.logger.warning(f"VAD 切分失败，按 {self._ONNX_WINDOW_MS // 1000}s 窗口切分: {e}")
+            total_ms = int(audio.duration_s * 1000)
+            segments = [
+                (start, min(start + self._ONNX_WINDOW_MS, total_ms))
+                for start in range(0, total_ms, self._ONNX_WINDOW_MS)
+            ]
+        if not segments:
+            return ""
+        return self.transcribe_segments(audio, segments, task_id)
+
+    def get_cache_signature(self) -> dict:
+        signature = {**self._MODEL_SPEC, "generate": self._GENERATE_KWARGS}
+        if self.onnx_providers:
+            signature["backend"] = "onnx-int8" if get_config().asr.onnx_quantize else "onnx"
+        else:
+            signature.update(profile_signature())
+        return signature
@@ -0,0 +1,127 @@
+"""
+FunASR 模型的 PyTorch 推理配置（ASR_PROFILE）
+
+- default：原样使用 FunASR 的 eager 推理
+- cpu_optimized：torch.inference_mode + 编码器 Linear 层 int8 动态量化
+  + 可选 torch.compile + 显式的算子内/算子间线程数
+
+量化与编译只作用于声学模型的编码器；VAD、标点模型保持原样。
+"""
+
+from __future__ import annotations
+
+import contextlib
+from typing import Any
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_DEFAULT = "default"
+PROFILE_CPU_OPTIMIZED = "cpu_optimized"
+
+_threads_applied = False
+
+
+def is_cpu_optimized() -> bool:
+    return get_config().asr.asr_profile == PROFILE_CPU_OPTIMIZED
+
+
+def apply_thread_settings() -> None:
+    """按配置设置 torch 算子内/算子间线程数（0 表示保持默认）"""
+    global _threads_applied
+    import torch
+
+    config = get_config()
+    intra = config.asr.torch_intra_op_threads
+    inter = config.asr.torch_inter_op_threads
+    if intra > 0:
+        torch.set_num_threads(intra)
+    # 算子间线程数只能在首次并行计算前设置一次
+    if inter > 0 and not _threads_applied:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as e:
+            logger.warning(f"设置 torch 算子间线程数失败（已有并行任务运行）: {e}")
+    _threads_applied = True
+
+
+def optimize_auto_model(auto_model: Any, device: str, model_name: str) -> None:
+    """
+    按 ASR_PROFILE 优化已加载的 FunASR AutoModel（原地修改）
+
+    Args:
+        auto_model: funasr AutoModel
+        device: 推理设备
+        model_name: 模型名称（仅用于日志）
+    """
+    apply_thread_settings()
+    if not is_cpu_optimized():
+        return
+
+    import torch
+
+    config = get_config()
+    model = auto_model.model
+    model.eval()
+
+    if not str(device).startswith("cpu"):
+        logger.warning(f"{model_name}: int8 动态量化仅支持 CPU，当前设备 {device}，跳过量化")
+    else:
+        model.encoder = torch.ao.quantization.quantize_dynamic(
+            model.encoder, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info(f"{model_name}: 编码器 Linear 层已量化为 int8")
+
+    if config.asr.torch_compile:
+        try:
+            model.encoder = torch.compile(model.encoder, dynamic=True)
+            logger.info(f"{model_name}: 编码器已启用 torch.compile")
+        except Exception as e:
+            logger.warning(f"{model_name}: torch.compile 不可用，使用 eager 模式: {e}")
+
+
+def inference_context() -> contextlib.AbstractContextManager:
+    """推理上下文：cpu_optimized 下使用 torch.inference_mode，否则为空上下文"""
+    if not is_cpu_optimized():
+        return contextlib.nullcontext()
+    import torch
+
+    return torch.inference_mode()
+
+
+def profile_signature() -> dict:
+    """影响转录结果的推理配置（用于转录缓存键）"""
+    if not is_cpu_optimized():
+        return {}
+    return {"profile": PROFILE_CPU_OPTIMIZED}
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    字错误率 CER（忽略空白与标点），用于校验量化配置与 fp32 转录结果的一致性
+
+    Returns:
+        float: 编辑距离 / 参考文本字数；参考文本为空时，假设也为空返回 0，否则返回 1
+    """
+    ref = _normalize_for_cer(reference)
+    hyp = _normalize_for_cer(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_char in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_char in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_char != hyp_char),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _normalize_for_cer(text: str) -> str:
+    return "".join(ch for ch in text.lower() if ch.isalnum())
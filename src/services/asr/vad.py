@@ -7,13 +7,50 @@ VAD 服务
 
 from __future__ import annotations
 
-from typing import Any
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 
 from src.utils.config import get_config
 from src.utils.logging.logger import get_logger
 
+if TYPE_CHECKING:
+    from .preprocess import DecodedAudio
+
 logger = get_logger(__name__)
 
+# 进程级共享的 fsmn-vad 模型（延迟加载）
+_vad_model = None
+_vad_model_lock = threading.Lock()
+# AutoModel.generate 会改写自身的运行时配置，并发调用需串行化
+_vad_inference_lock = threading.Lock()
+
+
+def get_vad_model():
+    """获取共享的 fsmn-vad 模型实例（线程安全，首次调用时加载）"""
+    global _vad_model
+    if _vad_model is None:
+        with _vad_model_lock:
+            if _vad_model is None:
+                start = time.perf_counter()
+                _vad_model = VADService._load_model()
+                logger.info(f"fsmn-vad 模型加载完成，耗时 {time.perf_counter() - start:.2f}s")
+    return _vad_model
+
+
+def warmup_vad_model() -> float:
+    """
+    预热 VAD 模型（供服务启动时调用）
+
+    Returns:
+        float: 本次加载耗时（秒），已加载时为 0
+    """
+    if _vad_model is not None:
+        return 0.0
+    start = time.perf_counter()
+    get_vad_model()
+    return time.perf_counter() - start
+
 
 class VADService:
     def __init__(
@@ -23,7 +60,7 @@ class VADService:
     ) -> None:
         self._min_segment_ms = int(min_segment_ms)
         self._max_segment_ms = int(max_segment_ms)
-        self._model = self._load_model()
+        self._model = get_vad_model()
 
     @staticmethod
     def _load_model():
@@ -117,9 +154,23 @@ class VADService:
 
         return normalized
 
-    def segment_audio(self, audio_path: str) -> list[tuple[int, int]]:
+    def segment_audio(self, audio: str | DecodedAudio) -> list[tuple[int, int]]:
+        """
+        检测语音段
+
+        Args:
+            audio: 音频文件路径，或已解码的内存音频（直接以 float32 数组送入模型）
+
+        Returns:
+            list[tuple[int, int]]: 语音段 (start_ms, end_ms)
+        """
+        if isinstance(audio, str):
+            generate_kwargs = {"input": audio}
+        else:
+            generate_kwargs = {"input": audio.to_float32(), "fs": audio.sample_rate}
         try:
-            out = self._model.generate(input=audio_path)
+            with _vad_inference_lock:
+                out = self._model.generate(**generate_kwargs)
         except Exception as exc:
             raise RuntimeError(f"VAD 推理失败: {exc}") from exc
         segments = self._extract_segments(out)
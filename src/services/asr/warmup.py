@@ -0,0 +1,146 @@
+"""
+ASR 模型预加载与预热
+
+服务启动时加载配置的 ASR 模型（及 VAD），并用一段合成音频做一次预热推理，
+记录加载与预热耗时，供 /ready 就绪探针使用。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+from .factory import _normalize_model_type, get_asr_service
+from .preprocess import DecodedAudio
+
+logger = get_logger(__name__)
+
+_WARMUP_SECONDS = 1.0
+
+# 就绪状态：disabled（未启用预加载）/ pending / loading / ready / failed
+_state: dict[str, Any] = {
+    "state": "disabled",
+    "models": {},
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+_state_lock = threading.Lock()
+
+
+def _synthetic_audio(sample_rate: int = 16000) -> DecodedAudio:
+    """生成一段低幅度噪声叠加正弦的合成音频，只用于触发一次完整推理"""
+    t = np.arange(int(_WARMUP_SECONDS * sample_rate)) / sample_rate
+    rng = np.random.default_rng(0)
+    wave = 0.1 * np.sin(2 * np.pi * 220 * t) + 0.01 * rng.standard_normal(t.shape[0])
+    return DecodedAudio(
+        samples=(wave * 32767).astype(np.int16), sample_rate=sample_rate, source="warmup"
+    )
+
+
+def mark_preload_pending() -> None:
+    """标记预加载即将开始（服务已启动、模型尚未就绪）"""
+    with _state_lock:
+        _state["state"] = "pending"
+
+
+def preload_asr_models() -> dict[str, Any]:
+    """
+    预加载并预热配置的 ASR 模型
+
+    Returns:
+        dict: 就绪状态快照
+    """
+    config = get_config()
+    model_type = _normalize_model_type(config.asr.asr_model)
+
+    with _state_lock:
+        _state.update(state="loading", models={}, started_at=datetime.now().isoformat(), error=None)
+
+    try:
+        if config.asr.enable_vad:
+            from .vad import warmup_vad_model
+
+            load_s = warmup_vad_model()
+            _record_model("fsmn-vad", load_s=load_s)
+
+        service = get_asr_service(model_type)
+        start = time.perf_counter()
+        service.ensure_model_loaded()
+        load_s = time.perf_counter() - start
+
+        warmup_s = None
+        if _supports_warmup(model_type):
+            start = time.perf_counter()
+            service.transcribe_decoded(_synthetic_audio())
+            warmup_s = time.perf_counter() - start
+        _record_model(model_type, load_s=load_s, warmup_s=warmup_s)
+
+        with _state_lock:
+            _state.update(state="ready", finished_at=datetime.now().isoformat())
+        logger.info(
+            f"ASR 模型预加载完成: {model_type}，加载 {load_s:.2f}s"
+            + (f"，预热 {warmup_s:.2f}s" if warmup_s is not None else "")
+        )
+    except Exception as e:
+        logger.error(f"ASR 模型预加载失败: {e}", exc_info=True)
+        with _state_lock:
+            _state.update(state="failed", finished_at=datetime.now().isoformat(), error=str(e))
+
+    return get_readiness()
+
+
+def get_readiness() -> dict[str, Any]:
+    """
+    就绪状态快照
+
+    未启用预加载时视为就绪（模型按需加载）；启用时仅在预加载完成后就绪。
+    预加载的模型之后可能被模型池淘汰（空闲超时 / 超出预算，下次使用时重新加载），
+    resident 字段以模型池的当前状态为准。
+    """
+    with _state_lock:
+        snapshot = {
+            **_state,
+            "models": {name: dict(info) for name, info in _state["models"].items()},
+        }
+    if snapshot["models"]:
+        _refresh_residency(snapshot["models"])
+    snapshot["ready"] = snapshot["state"] in ("disabled", "ready")
+    return snapshot
+
+
+def _supports_warmup(model_type: str) -> bool:
+    # whisper-cli 每次调用都重新加载模型，预热推理没有意义
+    config = get_config()
+    return model_type != "whisper_cpp" or config.asr.whisper_cpp_backend == "server"
+
+
+def _refresh_residency(models: dict[str, dict[str, Any]]) -> None:
+    """用模型池统计更新 ASR 模型的常驻状态（VAD 不由模型池管理，保持记录值）"""
+    from .model_pool import get_model_pool
+
+    try:
+        pool_models = get_model_pool().stats()["models"]
+    except Exception as e:
+        logger.warning(f"读取模型池状态失败: {e}")
+        return
+    loaded = {item["model_type"]: item["loaded"] for item in pool_models}
+    for name, info in models.items():
+        if name in loaded:
+            info["resident"] = loaded[name]
+
+
+def _record_model(name: str, load_s: float, warmup_s: float | None = None) -> None:
+    with _state_lock:
+        _state["models"][name] = {
+            "resident": True,
+            "load_s": round(load_s, 3),
+            "warmup_s": round(warmup_s, 3) if warmup_s is not None else None,
+        }
@@ -6,14 +6,14 @@ whisper.cpp ASR 服务
 
 from __future__ import annotations
 
-import io
 import os
 import re
 import shlex
-import subprocess
+import shutil
 import threading
-import time
 import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from src.core.exceptions import (
@@ -23,18 +23,34 @@ from src.core.exceptions import (
     TaskCancelledException,
 )
 from src.utils.config import get_config
+from src.utils.helpers.process_supervisor import (
+    ProcessAbortedError,
+    ProcessTimeoutError,
+    get_process_supervisor,
+)
+from src.utils.helpers.task_manager import CancellationSignal
 from src.utils.logging.logger import get_logger
 
-from .base import BaseASRService
+from .base import (
+    BaseASRService,
+    PartialTranscriptCallback,
+    PartialTranscriptTracker,
+    join_segment_texts,
+)
 
 logger = get_logger(__name__)
 
 
+class _ShardAbortedError(Exception):
+    """分片模式下，其它分片失败导致本分片被中止"""
+
+
 class WhisperCppService(BaseASRService):
     """whisper.cpp ASR 服务（通过命令行调用）"""
 
     _SUPPORTED_AUDIO_EXTS = {".flac", ".mp3", ".ogg", ".wav"}
     _PROGRESS_RE = re.compile(r"\bprogress\s*=\s*([0-9]{1,3})%")
+    _BIN_ENV_NAME = "WHISPER_CPP_BIN"
 
     def __init__(self):
         super().__init__()
@@ -52,16 +68,14 @@ class WhisperCppService(BaseASRService):
         config = get_config()
         project_root = config.asr.get_project_root()
 
-        bin_path = config.asr.whisper_cpp_bin or (
-            project_root / "assets" / "whisper.cpp" / "whisper-cli.exe"
-        )
+        bin_path = self._resolve_bin_path()
         model_path = config.asr.whisper_cpp_model or (
             project_root / "assets" / "models" / "ggml-medium-q5_0.bin"
         )
 
         if not bin_path.exists():
             raise ASRModelLoadError(
-                f"未找到 whisper.cpp 可执行文件: {bin_path}。请在 .env 中设置 WHISPER_CPP_BIN",
+                f"未找到 whisper.cpp 可执行文件: {bin_path}。请在 .env 中设置 {self._BIN_ENV_NAME}",
                 model="whisper_cpp",
             )
 
@@ -94,12 +108,26 @@ class WhisperCppService(BaseASRService):
         self._model_path = model_path
         self._validated = True
 
+    def is_model_loaded(self) -> bool:
+        # whisper-cli 每次调用都在子进程中加载模型，Python 侧只需完成路径校验
+        return self._validated
+
+    def unload_model(self) -> None:
+        self._validated = False
+
+    def _resolve_bin_path(self) -> Path:
+        """whisper-cli 可执行文件路径（未配置时使用 assets 下的默认位置）"""
+        config = get_config()
+        return config.asr.whisper_cpp_bin or (
+            config.asr.get_project_root() / "assets" / "whisper.cpp" / "whisper-cli.exe"
+        )
+
     def transcribe(self, audio_path: str, task_id: str | None = None) -> str:
         # 任务取消检查（模型校验前）
         self.check_cancellation(task_id)
 
         # 校验 bin/model 路径
-        self.load_model()
+        self.ensure_model_loaded()
 
         # 任务取消检查（推理前）
         self.check_cancellation(task_id)
@@ -118,138 +146,287 @@ class WhisperCppService(BaseASRService):
         stdout_path = temp_dir / f"{audio_file.stem}.{run_id}.stdout.txt"
         stderr_path = temp_dir / f"{audio_file.stem}.{run_id}.stderr.txt"
 
-        input_for_whisper = self._prepare_input_audio(audio_file, temp_dir, run_id)
+        input_for_whisper = self._prepare_input_audio(audio_file, temp_dir, run_id, task_id)
+
+        try:
+            return self._run_cli(
+                audio_file=audio_file,
+                input_audio=input_for_whisper,
+                output_base=output_base,
+                stdout_path=stdout_path,
+                stderr_path=stderr_path,
+                task_id=task_id,
+                media_duration_s=self._audio_duration_s(input_for_whisper),
+            )
+
+        finally:
+            if not config.debug_flag:
+                self._cleanup_temp_files(
+                    original_audio=audio_file,
+                    input_audio=input_for_whisper,
+                    output_txt=output_txt,
+                    stdout_path=stdout_path,
+                    stderr_path=stderr_path,
+                )
+
+    def _run_cli(
+        self,
+        audio_file: Path,
+        input_audio: Path,
+        output_base: Path,
+        stdout_path: Path,
+        stderr_path: Path,
+        task_id: str | None,
+        threads: int | None = None,
+        on_progress: Callable[[int], None] | None = None,
+        abort: CancellationSignal | None = None,
+        media_duration_s: float | None = None,
+    ) -> str:
+        """
+        运行一次 whisper-cli 并返回输出文本
 
+        Args:
+            threads: 覆盖 WHISPER_CPP_THREADS（分片模式下按分片数分配线程预算）
+            on_progress: 进度回调（提供时不再单独打印进度日志）
+            abort: 外部中止信号（某个分片失败时中止其余分片）
+            media_duration_s: 音频时长（用于按时长缩放超时）
+        """
         cmd = self._build_command(
-            input_audio=input_for_whisper,
+            input_audio=input_audio,
             output_base=output_base,
+            threads=threads,
         )
+        output_txt = Path(f"{output_base}.txt")
 
-        try:
-            with (
-                open(stdout_path, "wb") as stdout_f,
-                open(stderr_path, "w", encoding="utf-8", errors="replace") as stderr_f,
-            ):
-                proc = subprocess.Popen(
+        with (
+            open(stdout_path, "wb") as stdout_f,
+            open(stderr_path, "w", encoding="utf-8", errors="replace") as stderr_f,
+        ):
+            try:
+                result = get_process_supervisor().run(
                     cmd,
+                    name="whisper.cpp",
+                    task_id=task_id,
+                    abort=abort,
+                    media_duration_s=media_duration_s,
                     stdout=stdout_f,
-                    stderr=subprocess.PIPE,
+                    on_stderr_line=self._stderr_progress_handler(stderr_f, task_id, on_progress),
                 )
-
-                stderr_thread = None
-                stderr_stream = proc.stderr
-                if stderr_stream is not None:
-                    stderr_thread = threading.Thread(
-                        target=self._stream_stderr_with_progress,
-                        args=(stderr_stream, stderr_f, task_id),
-                        daemon=True,
-                    )
-                    stderr_thread.start()
-
-                start_time = time.time()
-                timeout_seconds = 1800
-                while True:
-                    try:
-                        self.check_cancellation(task_id)
-                    except TaskCancelledException:
-                        proc.terminate()
-                        try:
-                            proc.wait(timeout=2)
-                        except subprocess.TimeoutExpired:
-                            proc.kill()
-                            proc.wait(timeout=2)
-                        if stderr_thread is not None:
-                            stderr_thread.join(timeout=2)
-                        raise
-                    ret = proc.poll()
-                    if ret is not None:
-                        break
-                    if time.time() - start_time > timeout_seconds:
-                        proc.kill()
-                        if stderr_thread is not None:
-                            stderr_thread.join(timeout=2)
-                        raise ASRInferenceError(
-                            message=f"whisper.cpp inference timed out after {timeout_seconds}s",
-                            model="whisper_cpp",
-                            audio_file=str(audio_file),
-                        )
-                    time.sleep(0.2)
-
-                if stderr_thread is not None:
-                    stderr_thread.join(timeout=5)
-
-                if ret != 0:
-                    stderr_tail = self._read_text_safely(stderr_path)
-                    raise ASRInferenceError(
-                        message=(
-                            "whisper.cpp 推理失败。"
-                            f"exit_code={ret}, audio={audio_file}\n"
-                            f"stderr:\n{stderr_tail}"
-                        ),
-                        model="whisper_cpp",
-                        audio_file=str(audio_file),
-                    )
-
-            if not output_txt.exists():
-                stderr_tail = self._read_text_safely(stderr_path)
+            except ProcessAbortedError as e:
+                raise _ShardAbortedError() from e
+            except ProcessTimeoutError as e:
                 raise ASRInferenceError(
-                    message=(
-                        "whisper.cpp 未生成输出文本文件。"
-                        f"expected={output_txt}, audio={audio_file}\n"
-                        f"stderr:\n{stderr_tail}"
-                    ),
+                    message=f"whisper.cpp inference timed out after {e.timeout_s:.0f}s",
                     model="whisper_cpp",
                     audio_file=str(audio_file),
-                )
+                ) from e
+
+        if result.returncode != 0:
+            stderr_tail = self._read_text_safely(stderr_path)
+            raise ASRInferenceError(
+                message=(
+                    "whisper.cpp 推理失败。"
+                    f"exit_code={result.returncode}, audio={audio_file}\n"
+                    f"stderr:\n{stderr_tail}"
+                ),
+                model="whisper_cpp",
+                audio_file=str(audio_file),
+            )
+
+        if not output_txt.exists():
+            stderr_tail = self._read_text_safely(stderr_path)
+            raise ASRInferenceError(
+                message=(
+                    "whisper.cpp 未生成输出文本文件。"
+                    f"expected={output_txt}, audio={audio_file}\n"
+                    f"stderr:\n{stderr_tail}"
+                ),
+                model="whisper_cpp",
+                audio_file=str(audio_file),
+            )
+
+        return self._read_text_safely(output_txt).strip()
 
-            return self._read_text_safely(output_txt).strip()
+    def transcribe_decoded(self, audio, task_id: str | None = None) -> str:
+        """长音频且启用分片模式时，先做 VAD 再分片并行转录；否则整文件转录一次"""
+        if not self._should_shard(audio):
+            return super().transcribe_decoded(audio, task_id)
 
+        from .vad import VADService
+
+        segments = VADService().segment_audio(audio)
+        if not segments:
+            self.logger.info("VAD 未检测到语音，返回空文本")
+            return ""
+        return self._transcribe_sharded(audio, segments, task_id)
+
+    def transcribe_segments(
+        self,
+        audio,
+        segments,
+        task_id: str | None = None,
+        on_partial: PartialTranscriptCallback | None = None,
+    ) -> str:
+        """
+        分片模式下在 VAD 边界切分并行转录；否则整文件转录一次
+        （whisper-cli 每次调用都要重新加载模型，逐段起进程得不偿失，
+        非语音部分由 whisper.cpp 自身的 --vad 选项处理）。
+        """
+        if self._should_shard(audio):
+            return self._transcribe_sharded(audio, segments, task_id, on_partial)
+        return self.transcribe_decoded(audio, task_id)
+
+    def _should_shard(self, audio) -> bool:
+        config = get_config()
+        return (
+            config.asr.whisper_cpp_shards > 1
+            and audio.duration_s >= config.asr.whisper_cpp_shard_min_duration_s
+        )
+
+    def _transcribe_sharded(
+        self,
+        audio,
+        segments,
+        task_id: str | None,
+        on_partial: PartialTranscriptCallback | None = None,
+    ) -> str:
+        """
+        分片并行转录
+
+        在 VAD 边界将音频切为 K 个时间连续的分片，K 个 whisper-cli 并发运行，
+        线程预算（WHISPER_CPP_THREADS）在分片间均分；各分片进度按时长加权汇总为一个任务级进度。
+        """
+        from .parallel import split_into_shards
+
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+        self.check_cancellation(task_id)
+
+        config = get_config()
+        shards = split_into_shards(segments, config.asr.whisper_cpp_shards)
+        threads = max(1, int(config.asr.whisper_cpp_threads) // len(shards))
+        self.logger.info(
+            f"whisper.cpp 分片转录: {len(shards)} 个分片，每个分片 {threads} 线程 "
+            f"(音频时长 {audio.duration_s:.1f}s)"
+        )
+
+        run_dir = (config.paths.temp_dir or Path("./temp")) / "whisper_cpp" / uuid.uuid4().hex
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        tracker = PartialTranscriptTracker(
+            [(shard.start_ms, shard.end_ms) for shard in shards], on_partial, self.logger
+        )
+        weights = [max(1, shard.end_ms - shard.start_ms) for shard in shards]
+        progress = [0] * len(shards)
+        progress_lock = threading.Lock()
+        last_logged_bucket = -1
+
+        def report(index: int, percent: int) -> None:
+            nonlocal last_logged_bucket
+            with progress_lock:
+                progress[index] = max(progress[index], percent)
+                overall = sum(w * p for w, p in zip(weights, progress, strict=True)) / sum(weights)
+                bucket = min(100, int(overall // 5) * 5)
+                if bucket <= last_logged_bucket:
+                    return
+                last_logged_bucket = bucket
+            suffix = f" (task_id={task_id})" if task_id else ""
+            self.logger.info(f"whisper.cpp progress: {bucket}% [{len(shards)} shards]{suffix}")
+
+        abort = CancellationSignal()
+
+        def run_shard(index: int, shard) -> str:
+            shard_wav = audio.segment(shard.start_ms, shard.end_ms).write_wav(
+                run_dir / f"shard_{index:03d}.wav"
+            )
+            output_base = run_dir / f"shard_{index:03d}"
+            text = self._run_cli(
+                audio_file=Path(audio.source) if audio.source else shard_wav,
+                input_audio=shard_wav,
+                output_base=output_base,
+                stdout_path=run_dir / f"shard_{index:03d}.stdout.txt",
+                stderr_path=run_dir / f"shard_{index:03d}.stderr.txt",
+                task_id=task_id,
+                threads=threads,
+                on_progress=lambda percent: report(index, percent),
+                abort=abort,
+                media_duration_s=(shard.end_ms - shard.start_ms) / 1000,
+            )
+            report(index, 100)
+            tracker.update([index], [text])
+            return text
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+                futures = {pool.submit(run_shard, i, shard): i for i, shard in enumerate(shards)}
+                texts = [""] * len(shards)
+                errors: list[Exception] = []
+                # 按完成顺序收集：任一分片失败（或任务取消）时立即中止其余分片
+                for future in as_completed(futures):
+                    try:
+                        texts[futures[future]] = future.result()
+                    except Exception as e:
+                        abort.set()
+                        errors.append(e)
+
+            if errors:
+                # 优先抛出取消异常，其次是真正失败的分片（而非被连带中止的分片）
+                cancelled = [e for e in errors if isinstance(e, TaskCancelledException)]
+                failed = [e for e in errors if not isinstance(e, _ShardAbortedError)]
+                raise (cancelled or failed or errors)[0]
+            return join_segment_texts(texts)
         finally:
             if not config.debug_flag:
-                self._cleanup_temp_files(
-                    original_audio=audio_file,
-                    input_audio=input_for_whisper,
-                    output_txt=output_txt,
-                    stdout_path=stdout_path,
-                    stderr_path=stderr_path,
-                )
+                shutil.rmtree(run_dir, ignore_errors=True)
 
-    def _stream_stderr_with_progress(
+    def get_cache_signature(self) -> dict:
+        config = get_config()
+        model_path = config.asr.whisper_cpp_model
+        return {
+            "model": str(model_path.name) if model_path else "ggml-medium-q5_0.bin",
+            "language": config.asr.whisper_cpp_language,
+            "extra_args": config.asr.whisper_cpp_extra_args,
+            "vad": bool(config.asr.whisper_cpp_vad),
+            "vad_model": str(config.asr.whisper_cpp_vad_model or ""),
+            "shards": config.asr.whisper_cpp_shards,
+        }
+
+    def _stderr_progress_handler(
         self,
-        stderr_stream,
         stderr_file,
         task_id: str | None,
-    ) -> None:
+        on_progress: Callable[[int], None] | None = None,
+    ) -> Callable[[str], None]:
         """
-        从 whisper-cli 的 stderr 读取输出，写入 stderr 文件，并将进度打印到日志。
+        whisper-cli 的 stderr 行处理：写入 stderr 文件，并将进度打印到日志。
 
         进度日志默认按 5% 步进输出，避免刷屏。
         """
         last_logged_bucket = -1
-        try:
-            text_stream = io.TextIOWrapper(stderr_stream, encoding="utf-8", errors="replace")
-            for line in text_stream:
-                try:
-                    stderr_file.write(line)
-                    stderr_file.flush()
-                except Exception:
-                    self.logger.debug("Failed to write/flush stderr line")
-
-                progress = self._parse_progress_percent(line)
-                if progress is None:
-                    continue
-                if progress < 0 or progress > 100:
-                    continue
-
-                # 5% 步进输出，避免刷屏
-                bucket = min(100, (progress // 5) * 5)
-                if bucket > last_logged_bucket:
-                    last_logged_bucket = bucket
-                    suffix = f" (task_id={task_id})" if task_id else ""
-                    self.logger.info(f"whisper.cpp progress: {bucket}%{suffix}")
-        except Exception:
-            # stderr 输出解析失败不应影响主流程
-            return
+
+        def handle(line: str) -> None:
+            nonlocal last_logged_bucket
+            try:
+                stderr_file.write(line + "\n")
+                stderr_file.flush()
+            except Exception:
+                self.logger.debug("Failed to write/flush stderr line")
+
+            progress = self._parse_progress_percent(line)
+            if progress is None or progress < 0 or progress > 100:
+                return
+            if on_progress is not None:
+                on_progress(progress)
+                return
+
+            # 5% 步进输出，避免刷屏
+            bucket = min(100, (progress // 5) * 5)
+            if bucket > last_logged_bucket:
+                last_logged_bucket = bucket
+                suffix = f" (task_id={task_id})" if task_id else ""
+                self.logger.info(f"whisper.cpp progress: {bucket}%{suffix}")
+
+        return handle
 
     @classmethod
     def _parse_progress_percent(cls, line: str) -> int | None:
@@ -261,7 +438,9 @@ class WhisperCppService(BaseASRService):
         except Exception:
             return None
 
-    def _build_command(self, input_audio: Path, output_base: Path) -> list[str]:
+    def _build_command(
+        self, input_audio: Path, output_base: Path, threads: int | None = None
+    ) -> list[str]:
         config = get_config()
         bin_path = self._bin_path
         model_path = self._model_path
@@ -272,7 +451,7 @@ class WhisperCppService(BaseASRService):
         extra_args = self._ensure_vad_args(extra_args)
         extra_args = self._ensure_progress_args(extra_args)
         language = (config.asr.whisper_cpp_language or "auto").strip().lower()
-        threads = int(config.asr.whisper_cpp_threads)
+        threads = int(threads or config.asr.whisper_cpp_threads)
 
         cmd = [
             str(bin_path),
@@ -327,7 +506,9 @@ class WhisperCppService(BaseASRService):
 
         return [*inject, *extra_args]
 
-    def _prepare_input_audio(self, audio_file: Path, temp_dir: Path, run_id: str) -> Path:
+    def _prepare_input_audio(
+        self, audio_file: Path, temp_dir: Path, run_id: str, task_id: str | None = None
+    ) -> Path:
         """
         whisper-cli.exe 的 help 声明支持 flac/mp3/ogg/wav。
         对其它格式尝试用 ffmpeg 转成 16k 单声道 wav（若 ffmpeg 不存在则报错）。
@@ -351,15 +532,7 @@ class WhisperCppService(BaseASRService):
         ]
 
         try:
-            subprocess.run(
-                cmd,
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                timeout=300,
-            )
+            result = get_process_supervisor().run(cmd, name="ffmpeg 转码", task_id=task_id)
         except FileNotFoundError as e:
             raise AudioFormatError(
                 message=(
@@ -369,12 +542,13 @@ class WhisperCppService(BaseASRService):
                 audio_file=str(audio_file),
                 format=audio_file.suffix,
             ) from e
-        except subprocess.CalledProcessError as e:
+
+        if result.returncode != 0:
             raise ASRInferenceError(
-                message=f"ffmpeg 转码失败: {e.stderr or e.stdout}",
+                message=f"ffmpeg 转码失败: {result.stderr}",
                 model="whisper_cpp",
                 audio_file=str(audio_file),
-            ) from e
+            )
 
         if not output_wav.exists():
             raise ASRInferenceError(
@@ -399,6 +573,16 @@ class WhisperCppService(BaseASRService):
         except UnicodeDecodeError:
             return path.read_text(encoding="utf-8", errors="replace")
 
+    @staticmethod
+    def _audio_duration_s(path: Path) -> float | None:
+        """读取音频时长（秒），无法读取时返回 None"""
+        try:
+            import soundfile as sf
+
+            return float(sf.info(str(path)).duration)
+        except Exception:
+            return None
+
     @staticmethod
     def _cleanup_temp_files(
         original_audio: Path,
@@ -0,0 +1,361 @@
+"""
+whisper.cpp 常驻服务后端
+
+启动一个长期运行的 whisper-server 进程（模型只在进程启动时加载一次），
+通过 localhost HTTP 提交音频。进程崩溃时自动重启；任务取消时终止正在推理的进程，
+下一次请求再按需拉起。
+"""
+
+from __future__ import annotations
+
+import atexit
+import io
+import socket
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import requests
+import soundfile as sf
+
+from src.core.exceptions import ASRInferenceError, ASRModelLoadError, TaskCancelledException
+from src.utils.config import get_config
+from src.utils.helpers.memory import get_process_rss_bytes
+from src.utils.logging.logger import get_logger
+
+from .whisper_cpp import WhisperCppService
+
+logger = get_logger(__name__)
+
+_HOST = "127.0.0.1"
+
+
+def _local_session() -> requests.Session:
+    """仅访问本机服务：忽略环境变量中的 HTTP(S)_PROXY"""
+    session = requests.Session()
+    session.trust_env = False
+    return session
+
+
+def _find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((_HOST, 0))
+        return sock.getsockname()[1]
+
+
+class WhisperServerProcess:
+    """
+    whisper-server 子进程管理
+
+    stderr 由后台线程持续读取并写入日志文件；解析到的进度会转发给当前请求注册的回调。
+    """
+
+    def __init__(
+        self,
+        build_command: Callable[[str, int], list[str]],
+        log_path: Path,
+        port: int = 0,
+        startup_timeout: float = 120.0,
+    ):
+        self._build_command = build_command
+        self._log_path = log_path
+        self._configured_port = int(port)
+        self._startup_timeout = float(startup_timeout)
+        self._proc: subprocess.Popen | None = None
+        self._port: int | None = None
+        self._lock = threading.Lock()
+        self._stderr_thread: threading.Thread | None = None
+        self.progress_listener: Callable[[str], None] | None = None
+        self.restarts = 0
+        self._http = _local_session()
+        atexit.register(self.stop)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{_HOST}:{self._port}"
+
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    @property
+    def pid(self) -> int | None:
+        return self._proc.pid if self.is_alive() else None
+
+    def ensure_running(self) -> str:
+        """确保服务进程在运行（未启动或已崩溃时拉起），返回服务地址"""
+        with self._lock:
+            if self.is_alive():
+                return self.base_url
+            if self._proc is not None:
+                self.restarts += 1
+                logger.warning(
+                    f"whisper-server 进程已退出 (exit_code={self._proc.returncode})，正在重启"
+                )
+            self._start_locked()
+            return self.base_url
+
+    def stop(self) -> None:
+        """终止服务进程"""
+        with self._lock:
+            proc = self._proc
+            if proc is None or proc.poll() is not None:
+                return
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait(timeout=5)
+            logger.info("whisper-server 已停止")
+
+    def _start_locked(self) -> None:
+        self._port = self._configured_port or _find_free_port()
+        cmd = self._build_command(_HOST, self._port)
+        self._log_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"启动 whisper-server: {self.base_url}")
+        logger.debug(f"whisper-server 命令: {' '.join(cmd)}")
+
+        start = time.perf_counter()
+        try:
+            self._proc = subprocess.Popen(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL
+            )
+        except OSError as e:
+            raise ASRModelLoadError(f"无法启动 whisper-server: {e}", model="whisper_cpp") from e
+
+        self._stderr_thread = threading.Thread(
+            target=self._pump_stderr, args=(self._proc,), daemon=True
+        )
+        self._stderr_thread.start()
+
+        while time.perf_counter() - start < self._startup_timeout:
+            if self._proc.poll() is not None:
+                raise ASRModelLoadError(
+                    f"whisper-server 启动失败 (exit_code={self._proc.returncode})，"
+                    f"详见日志: {self._log_path}",
+                    model="whisper_cpp",
+                )
+            if self._is_ready():
+                logger.info(
+                    f"whisper-server 已就绪，模型加载耗时 {time.perf_counter() - start:.2f}s"
+                )
+                return
+            time.sleep(0.2)
+
+        self._proc.kill()
+        raise ASRModelLoadError(
+            f"whisper-server 在 {self._startup_timeout:.0f}s 内未就绪，详见日志: {self._log_path}",
+            model="whisper_cpp",
+        )
+
+    def _is_ready(self) -> bool:
+        try:
+            resp = self._http.get(f"{self.base_url}/health", timeout=1)
+        except requests.RequestException:
+            return False
+        # 旧版本 whisper-server 没有 /health，能连上即视为就绪
+        return resp.status_code == 200 or resp.status_code == 404
+
+    def _pump_stderr(self, proc: subprocess.Popen) -> None:
+        try:
+            with open(self._log_path, "a", encoding="utf-8", errors="replace") as log_f:
+                text_stream = io.TextIOWrapper(proc.stderr, encoding="utf-8", errors="replace")
+                for line in text_stream:
+                    log_f.write(line)
+                    log_f.flush()
+                    listener = self.progress_listener
+                    if listener is not None:
+                        listener(line)
+        except Exception:
+            # stderr 读取失败不应影响主流程
+            return
+
+
+class WhisperServerService(WhisperCppService):
+    """whisper.cpp ASR 服务（常驻 whisper-server 后端）"""
+
+    _BIN_ENV_NAME = "WHISPER_SERVER_BIN"
+    _REQUEST_TIMEOUT_S = 1800
+
+    def __init__(self):
+        super().__init__()
+        self._server: WhisperServerProcess | None = None
+        self._request_lock = threading.Lock()
+        self._http = _local_session()
+
+    def _resolve_bin_path(self) -> Path:
+        """whisper-server 可执行文件路径（未配置时取 whisper-cli 同目录下的 whisper-server）"""
+        config = get_config()
+        if config.asr.whisper_server_bin is not None:
+            return config.asr.whisper_server_bin
+        cli_path = super()._resolve_bin_path()
+        return cli_path.with_name(cli_path.name.replace("whisper-cli", "whisper-server"))
+
+    def load_model(self):
+        """校验路径并启动常驻服务（模型只在服务进程启动时加载一次）"""
+        super().load_model()
+        if self._server is None:
+            config = get_config()
+            temp_dir = (config.paths.temp_dir or Path("./temp")) / "whisper_cpp"
+            self._server = WhisperServerProcess(
+                build_command=self._build_server_command,
+                log_path=temp_dir / "whisper-server.log",
+                port=config.asr.whisper_server_port,
+                startup_timeout=config.asr.whisper_server_startup_timeout,
+            )
+        self._server.ensure_running()
+
+    def transcribe(self, audio_path: str, task_id: str | None = None) -> str:
+        from .preprocess import decode_audio
+
+        if not Path(audio_path).exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        return self.transcribe_decoded(decode_audio(audio_path, task_id=task_id), task_id)
+
+    def transcribe_decoded(self, audio, task_id: str | None = None) -> str:
+        """将内存 PCM 编码为 WAV 直接 POST 给 whisper-server，不落临时文件"""
+        self.check_cancellation(task_id)
+        self.ensure_model_loaded()
+        self.check_cancellation(task_id)
+
+        buffer = io.BytesIO()
+        sf.write(
+            buffer, audio.samples, samplerate=audio.sample_rate, format="WAV", subtype="PCM_16"
+        )
+        payload = buffer.getvalue()
+
+        with self._request_lock:
+            try:
+                return self._post_with_progress(payload, audio.source, task_id)
+            except requests.ConnectionError:
+                if self._server.is_alive():
+                    raise
+                # 推理过程中服务崩溃：重启后重试一次
+                logger.warning("whisper-server 在推理过程中退出，重启后重试")
+                return self._post_with_progress(payload, audio.source, task_id)
+
+    def is_model_loaded(self) -> bool:
+        return self._validated and self._server is not None and self._server.is_alive()
+
+    def get_resident_bytes(self) -> int | None:
+        """模型常驻在 whisper-server 子进程中，返回该进程的 RSS"""
+        if self._server is None or self._server.pid is None:
+            return None
+        return get_process_rss_bytes(self._server.pid)
+
+    def unload_model(self) -> None:
+        self.shutdown()
+
+    def _should_shard(self, audio) -> bool:
+        # 常驻服务只有一个进程，不参与 whisper-cli 分片模式
+        return False
+
+    def shutdown(self) -> None:
+        """停止常驻服务进程"""
+        if self._server is not None:
+            self._server.stop()
+
+    def get_cache_signature(self) -> dict:
+        return {**super().get_cache_signature(), "backend": "server"}
+
+    def _post_with_progress(self, payload: bytes, source: str, task_id: str | None) -> str:
+        base_url = self._server.ensure_running()
+        config = get_config()
+        data = {
+            "response_format": "json",
+            "temperature": "0.0",
+            "language": (config.asr.whisper_cpp_language or "auto").strip().lower(),
+        }
+        outcome: dict = {}
+        # 请求完成或任务取消时唤醒等待线程（取消通过 CancellationSignal 立即响应，不再轮询）
+        wake = threading.Event()
+
+        def _post() -> None:
+            try:
+                resp = self._http.post(
+                    f"{base_url}/inference",
+                    files={"file": ("audio.wav", payload, "audio/wav")},
+                    data=data,
+                    timeout=self._REQUEST_TIMEOUT_S,
+                )
+                resp.raise_for_status()
+                outcome["text"] = str(resp.json().get("text", ""))
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                wake.set()
+
+        last_logged_bucket = -1
+
+        def _on_stderr(line: str) -> None:
+            nonlocal last_logged_bucket
+            progress = self._parse_progress_percent(line)
+            if progress is None or progress < 0 or progress > 100:
+                return
+            bucket = min(100, (progress // 5) * 5)
+            if bucket > last_logged_bucket:
+                last_logged_bucket = bucket
+                suffix = f" (task_id={task_id})" if task_id else ""
+                self.logger.info(f"whisper.cpp progress: {bucket}%{suffix}")
+
+        self._server.progress_listener = _on_stderr
+        cancel_signal = self.task_manager.get_cancel_signal(task_id) if task_id else None
+        unsubscribe = cancel_signal.subscribe(wake.set) if cancel_signal is not None else None
+        worker = threading.Thread(target=_post, daemon=True)
+        worker.start()
+        try:
+            finished = wake.wait(timeout=self._REQUEST_TIMEOUT_S)
+            if cancel_signal is not None and cancel_signal.is_set():
+                # whisper-server 无法中断进行中的推理，只能终止进程，下次请求时重启
+                self._server.stop()
+                worker.join(timeout=2)
+                raise TaskCancelledException(task_id)
+            if not finished:
+                self._server.stop()
+                raise ASRInferenceError(
+                    message=f"whisper-server inference timed out after {self._REQUEST_TIMEOUT_S}s",
+                    model="whisper_cpp",
+                    audio_file=source,
+                )
+        finally:
+            if unsubscribe is not None:
+                unsubscribe()
+            self._server.progress_listener = None
+
+        error = outcome.get("error")
+        if isinstance(error, requests.ConnectionError):
+            raise error
+        if error is not None:
+            raise ASRInferenceError(
+                message=f"whisper-server 推理失败: {error}",
+                model="whisper_cpp",
+                audio_file=source,
+            ) from error
+        return outcome.get("text", "").strip()
+
+    def _build_server_command(self, host: str, port: int) -> list[str]:
+        config = get_config()
+        if self._bin_path is None or self._model_path is None:
+            raise ASRModelLoadError("whisper.cpp 未正确初始化", model="whisper_cpp")
+
+        extra_args = self._split_args(config.asr.whisper_server_extra_args)
+        extra_args = self._ensure_vad_args(extra_args)
+        extra_args = self._ensure_progress_args(extra_args)
+        language = (config.asr.whisper_cpp_language or "auto").strip().lower()
+
+        return [
+            str(self._bin_path),
+            *extra_args,
+            "-m",
+            str(self._model_path),
+            "-t",
+            str(int(config.asr.whisper_cpp_threads)),
+            "-l",
+            language,
+            "--host",
+            host,
+            "--port",
+            str(port),
+        ]
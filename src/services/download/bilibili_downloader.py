@@ -4,12 +4,12 @@ import json
 import os
 import re
 import shutil
-import subprocess
 import time
 from dataclasses import dataclass
 
 from yt_dlp import YoutubeDL
 
+from src.utils.helpers.process_supervisor import get_process_supervisor
 from src.utils.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -257,7 +257,10 @@ def _download_bilibili_audio_once(
 
 
 def extract_audio_from_video(
-    video_path: str, output_format: str = "mp3", output_dir: str | None = None
+    video_path: str,
+    output_format: str = "mp3",
+    output_dir: str | None = None,
+    task_id: str | None = None,
 ) -> str:
     """
     从视频中提取音频并保存为指定格式。
@@ -265,6 +268,7 @@ def extract_audio_from_video(
     :param video_path: 视频文件路径
     :param output_format: 输出音频格式（如 'mp3', 'wav'）
     :param output_dir: 音频输出目录，默认为视频同目录
+    :param task_id: 任务 ID（任务取消时立即终止 ffmpeg）
     :return: 提取后的音频文件路径
     """
     if not os.path.isfile(video_path):
@@ -291,7 +295,7 @@ def extract_audio_from_video(
     ]
 
     logger.info(f"开始提取音频：{audio_path}")
-    result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', timeout=300)
+    result = get_process_supervisor().run(command, name='ffmpeg 音频提取', task_id=task_id)
 
     if result.returncode != 0:
         raise RuntimeError(f"音频提取失败：{result.stderr}")
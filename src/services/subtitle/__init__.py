@@ -9,12 +9,13 @@ from .generator import (
     encode_subtitle_to_video,
     generate_subtitle_file,
 )
-from .models import ASRResult, SubtitleSegment
+from .models import ASRResult, SubtitleSegment, TimestampArray
 
 __all__ = [
     "SubtitleConfig",
     "SubtitleSegment",
     "ASRResult",
+    "TimestampArray",
     "generate_subtitle_file",
     "encode_subtitle_to_video",
 ]
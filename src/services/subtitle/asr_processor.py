@@ -1,64 +1,131 @@
 """ASR 处理器（字幕用）"""
 
+import itertools
+import math
+import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
+import numpy as np
 import soundfile as sf
 import torch
 import torchaudio
 
 from src.SenseVoiceSmall.model import SenseVoiceSmall
 from src.services.asr import get_asr_service
+from src.services.asr.model_pool import get_model_pool
+from src.services.asr.preprocess import DecodedAudio, decode_audio
 from src.text_arrangement.split_text import clean_asr_text
 from src.utils.device.device_manager import detect_device as get_device
 from src.utils.logging.logger import get_logger
 
 from .config import SubtitleConfig
-from .models import ASRResult
-from .utils import TempFileManager
+from .models import ASRResult, TimestampArray
 
 logger = get_logger(__name__)
 
 
 class AudioSlicer:
-    """音频切片器"""
+    """
+    音频切片器（流式）
+
+    按固定窗口逐段读取音频：文件通过 soundfile 按帧偏移读取，已解码的内存音频（含内存映射）
+    直接取视图，重采样也按窗口进行。任一时刻只持有一个窗口的数据，长视频不再整段载入内存。
+    """
 
     def __init__(self, config: SubtitleConfig):
         self.config = config
 
-    def slice(
-        self, audio_path: str, batch_size_s: float
-    ) -> list[tuple[torch.Tensor, float, float]]:
+    @staticmethod
+    def open(audio_path: str | DecodedAudio) -> str | DecodedAudio:
+        """
+        返回可按窗口读取的音频源
+
+        soundfile 无法直接读取的格式（如视频容器）先经 ffmpeg 解码为 16kHz 单声道 PCM
+        （启用预处理缓存时为对缓存 WAV 的内存映射）。
+        """
+        if isinstance(audio_path, DecodedAudio):
+            return audio_path
+        try:
+            sf.info(audio_path)
+            return audio_path
+        except RuntimeError as e:
+            logger.debug(f"soundfile 无法直接读取 {audio_path}，改用 ffmpeg 解码: {e}")
+            return decode_audio(audio_path)
+
+    def count(self, audio_path: str | DecodedAudio, batch_size_s: float) -> int:
+        """片段数量（仅读取文件头）"""
+        source = self.open(audio_path)
+        if isinstance(source, DecodedAudio):
+            total_frames, sr = source.num_samples, source.sample_rate
+        else:
+            info = sf.info(source)
+            total_frames, sr = info.frames, info.samplerate
+        return math.ceil(total_frames / self._window_frames(batch_size_s, sr))
+
+    def windows(
+        self, audio_path: str | DecodedAudio, batch_size_s: float
+    ) -> Iterator[tuple[np.ndarray, int, float, float]]:
         """
-        将音频切分为固定长度的片段
+        按窗口读取原始采样率的音频
 
-        返回: [(音频张量, 开始时间, 结束时间), ...]
+        Yields:
+            (float32 单声道音频 [1, samples], 采样率, 开始时间, 结束时间)
         """
-        audio, sr = torchaudio.load(audio_path)
-        if sr != self.config.sample_rate:
-            audio = torchaudio.functional.resample(audio, sr, self.config.sample_rate)
+        source = self.open(audio_path)
+        if isinstance(source, DecodedAudio):
+            sr = source.sample_rate
+            window = self._window_frames(batch_size_s, sr)
+            for start in range(0, source.num_samples, window):
+                end = min(start + window, source.num_samples)
+                chunk = source.slice_float32(start, end)[np.newaxis, :]
+                yield chunk, sr, start / sr, end / sr
+            return
+
+        with sf.SoundFile(source) as f:
+            sr = f.samplerate
+            window = self._window_frames(batch_size_s, sr)
+            start = 0
+            while True:
+                chunk = f.read(window, dtype="float32", always_2d=True)
+                if chunk.shape[0] == 0:
+                    break
+                end = start + chunk.shape[0]
+                # 多声道在读取时下混为单声道
+                yield chunk.mean(axis=1)[np.newaxis, :], sr, start / sr, end / sr
+                start = end
 
-        total_samples = audio.shape[1]
-        samples_per_slice = int(batch_size_s * self.config.sample_rate)
+    def slice(
+        self, audio_path: str | DecodedAudio, batch_size_s: float
+    ) -> Iterator[tuple[torch.Tensor, float, float]]:
+        """
+        将音频切分为固定长度的片段（生成器，逐个窗口读取并重采样）
+
+        Yields:
+            (音频张量, 开始时间, 结束时间)
+        """
+        target_sr = self.config.sample_rate
+        count = 0
+        for chunk, sr, start_time, end_time in self.windows(audio_path, batch_size_s):
+            audio = torch.from_numpy(chunk)
+            if sr != target_sr:
+                audio = torchaudio.functional.resample(audio, sr, target_sr)
+            count += 1
+            yield audio, start_time, end_time
 
-        slices = []
-        for i in range(0, total_samples, samples_per_slice):
-            start = i
-            end = min(i + samples_per_slice, total_samples)
-            slice_audio = audio[:, start:end]
-            start_time = start / self.config.sample_rate
-            end_time = end / self.config.sample_rate
-            slices.append((slice_audio, start_time, end_time))
+        logger.debug(f"音频切分完成，共 {count} 个片段")
 
-        logger.debug(f"音频切分完成，共 {len(slices)} 个片段")
-        return slices
+    @staticmethod
+    def _window_frames(batch_size_s: float, sample_rate: int) -> int:
+        return max(1, int(batch_size_s * sample_rate))
 
 
 class ASRProcessor(ABC):
     """ASR 处理器抽象基类"""
 
     @abstractmethod
-    def process(self, audio_path: str) -> ASRResult:
-        """处理音频文件，返回识别结果"""
+    def process(self, audio_path: str | DecodedAudio) -> ASRResult:
+        """处理音频文件（或已解码的内存音频），返回识别结果"""
         pass
 
 
@@ -82,60 +149,78 @@ class SenseVoiceProcessor(ASRProcessor):
             )
             self.model.eval()
 
-    def process(self, audio_path: str) -> ASRResult:
-        """处理音频文件"""
+    def process(self, audio_path: str | DecodedAudio) -> ASRResult:
+        """处理音频文件（每次推理合并 config.sensevoice_batch_slices 个片段为一个批次）"""
         self._load_model()
 
-        slices = self.audio_slicer.slice(audio_path, self.config.batch_size_s)
+        source = self.audio_slicer.open(audio_path)
+        total = self.audio_slicer.count(source, self.config.batch_size_s)
+        slices = self.audio_slicer.slice(source, self.config.batch_size_s)
+        batch_slices = max(1, self.config.sensevoice_batch_slices)
         all_results = []
 
-        with TempFileManager(self.config.temp_dir) as temp_mgr:
-            for idx, (audio_tensor, t_start, t_end) in enumerate(slices):
-                logger.info(f"处理片段 {idx + 1}/{len(slices)}: {t_start:.2f}s - {t_end:.2f}s")
-
-                temp_path = temp_mgr.create_temp_file("clip", ".wav")
-                sf.write(
-                    str(temp_path),
-                    audio_tensor.T.numpy(),
-                    samplerate=self.config.sample_rate,
-                    format="WAV",
-                    subtype="PCM_16",
-                )
+        # 片段张量直接作为模型输入（不写临时 WAV），采样率已统一为 config.sample_rate
+        infer_kwargs = {**self.kwargs, "fs": self.config.sample_rate}
+        done = 0
+        while batch := list(itertools.islice(slices, batch_slices)):
+            logger.info(
+                f"处理片段 {done + 1}-{done + len(batch)}/{total}: "
+                f"{batch[0][1]:.2f}s - {batch[-1][2]:.2f}s"
+            )
+            outputs = self._infer_batch(batch, done, infer_kwargs)
+            done += len(batch)
 
-                try:
-                    with torch.no_grad():
-                        res = self.model.inference(
-                            data_in=str(temp_path),
-                            language="auto",
-                            use_itn=False,
-                            ban_emo_unk=True,
-                            output_timestamp=True,
-                            **self.kwargs,
-                        )
-                except Exception as e:
-                    logger.error(f"处理片段 {idx + 1} 时出错: {e}")
+            # 修正时间戳为全局时间（按各自片段的起始时间偏移）
+            for item, (_, t_start, _) in zip(outputs, batch, strict=True):
+                if item is None:
                     continue
-
-                # 修正时间戳为全局时间
-                for item in res[0]:
-                    text = self._clean_text(item["text"])
-                    timestamp = [
-                        [
-                            self._clean_text(lst[0]),
-                            round(lst[1] + t_start, 2),
-                            round(lst[2] + t_start, 2),
-                        ]
-                        for lst in item["timestamp"]
-                        if self._clean_text(lst[0]) != ""
-                    ]
-                    all_results.append({"text": text, "timestamp": timestamp})
+                text = self._clean_text(item["text"])
+                timestamp = TimestampArray.from_items(
+                    (char, start, end)
+                    for char, start, end in (
+                        (self._clean_text(lst[0]), lst[1], lst[2]) for lst in item["timestamp"]
+                    )
+                    if char != ""
+                )
+                timestamp.starts += t_start
+                timestamp.ends += t_start
+                all_results.append({"text": text, "timestamp": timestamp})
 
         # 合并结果
         full_text = clean_asr_text("".join(item["text"] for item in all_results))
-        full_timestamp = sum([item["timestamp"] for item in all_results], start=[])
+        full_timestamp = TimestampArray.concat(item["timestamp"] for item in all_results)
 
         return ASRResult(text=full_text, timestamp=full_timestamp)
 
+    def _infer_batch(
+        self, batch: list[tuple[torch.Tensor, float, float]], first_idx: int, infer_kwargs: dict
+    ) -> list[dict | None]:
+        """
+        一次前向处理一批片段（模型内部补齐到同一长度）
+
+        批量推理失败时逐片段重试，出错的片段返回 None 并跳过，不影响同批其他片段。
+        """
+        try:
+            with torch.no_grad():
+                res = self.model.inference(
+                    data_in=[audio_tensor[0] for audio_tensor, _, _ in batch],
+                    language="auto",
+                    use_itn=False,
+                    ban_emo_unk=True,
+                    output_timestamp=True,
+                    **infer_kwargs,
+                )
+            return res[0]
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"处理片段 {first_idx + 1} 时出错: {e}")
+                return [None]
+            logger.warning(f"批量推理失败，逐片段重试: {e}")
+        return [
+            self._infer_batch([item], first_idx + i, infer_kwargs)[0]
+            for i, item in enumerate(batch)
+        ]
+
     @staticmethod
     def _clean_text(text: str) -> str:
         """清理文本中的特殊字符"""
@@ -145,10 +230,13 @@ class SenseVoiceProcessor(ASRProcessor):
 class ParaformerProcessor(ASRProcessor):
     """Paraformer ASR 处理器"""
 
+    # 与 Paraformer 时间戳一一对应的 token：连续的字母数字（英文单词、数字）或单个其他文字字符；
+    # 前导空白随 token 保留，标点不占用时间戳
+    _TOKEN_PATTERN = re.compile(r"\s*(?:[A-Za-z0-9'’]+|\S)")
+
     def __init__(self, config: SubtitleConfig):
         self.config = config
         self.model = None
-        self.audio_slicer = AudioSlicer(config)
 
     def _load_model(self):
         """延迟加载模型"""
@@ -156,73 +244,79 @@ class ParaformerProcessor(ASRProcessor):
             logger.info("正在加载 Paraformer 模型")
             self.model = get_asr_service("paraformer")
 
-    def process(self, audio_path: str) -> ASRResult:
+    def process(self, audio_path: str | DecodedAudio) -> ASRResult:
         """
-        处理音频文件（使用分块处理提高长视频的时间精度）
+        处理音频文件（整段一次 generate，直接使用模型返回的 token 级时间戳）
 
-        注意：Paraformer 返回的是句子级别的时间戳，需要插值生成字符级别的时间戳
+        Paraformer 的 timestamp 为逐 token（中文为单字、英文为单词）的 [begin_ms, end_ms]，
+        长音频由内置 VAD 切分，时间戳已是全局时间。
         """
         self._load_model()
 
-        # 使用配置的分块大小（默认30秒）
-        chunk_size_s = self.config.paraformer_chunk_size_s
-        slices = self.audio_slicer.slice(audio_path, chunk_size_s)
-
-        all_results = []
-
-        with TempFileManager(self.config.temp_dir) as temp_mgr:
-            for idx, (audio_tensor, t_start, t_end) in enumerate(slices):
-                logger.info(f"处理片段 {idx + 1}/{len(slices)}: {t_start:.2f}s - {t_end:.2f}s")
-
-                # 保存临时音频文件
-                temp_path = temp_mgr.create_temp_file("para_clip", ".wav")
-                sf.write(
-                    str(temp_path),
-                    audio_tensor.T.numpy(),
-                    samplerate=self.config.sample_rate,
-                    format="WAV",
-                    subtype="PCM_16",
-                )
-
-                try:
-                    # 处理当前音频片段
-                    res = self.model.generate_with_timestamps(
-                        audio_path=str(temp_path),
-                        batch_size_s=self.config.paraformer_batch_size_s,
-                    )
+        if isinstance(audio_path, DecodedAudio):
+            audio_input, fs = audio_path.to_float32(), audio_path.sample_rate
+        else:
+            audio_input, fs = audio_path, self.config.sample_rate
+        # self.model 即模型池中的实例，租用期间不会被空闲淘汰或预算淘汰释放
+        with get_model_pool().lease("paraformer"):
+            res = self.model.generate_with_timestamps(
+                audio_input, batch_size_s=self.config.paraformer_batch_size_s, fs=fs
+            )
+        del audio_input  # 整段 float32 副本仅在推理期间存在
 
-                    text = res[0]["text"]
-                    sentence_timestamps = res[0]["timestamp"]  # [[begin_ms, end_ms], ...]
+        text = "".join(item["text"] for item in res)
+        token_timestamps = [ts for item in res for ts in item.get("timestamp") or []]
+        char_timestamps = TimestampArray.from_items(
+            self._align_token_timestamps(text, token_timestamps)
+        )
 
-                    # 将句子级别的时间戳插值为字符级别
-                    char_timestamps = self._interpolate_char_timestamps(text, sentence_timestamps)
+        logger.info(
+            f"Paraformer 识别完成，总文本长度: {len(text)}，时间戳 token 数: {len(token_timestamps)}"
+        )
+        return ASRResult(text=text, timestamp=char_timestamps)
 
-                    # 修正时间戳为全局时间（加上片段起始时间偏移）
-                    adjusted_timestamps = [
-                        (char, start + t_start, end + t_start)
-                        for char, start, end in char_timestamps
-                    ]
+    def _align_token_timestamps(
+        self, text: str, token_timestamps: list[list[int]]
+    ) -> list[tuple[str, float, float]]:
+        """
+        将 token 级时间戳对齐到文本
 
-                    all_results.append({"text": text, "timestamp": adjusted_timestamps})
+        标点（由标点模型添加，没有对应时间戳）记为前一个 token 结束处的零时长条目，
+        保证时间戳拼接后与文本一致；token 数与时间戳数不一致时回退为线性插值。
 
-                except Exception as e:
-                    logger.error(f"处理片段 {idx + 1} 时出错: {e}")
-                    continue
+        Args:
+            text: 完整文本（含标点）
+            token_timestamps: token 级时间戳 [[begin_ms, end_ms], ...]
 
-        # 合并所有片段的结果
-        full_text = "".join(item["text"] for item in all_results)
-        full_timestamp = sum([item["timestamp"] for item in all_results], start=[])
+        Returns:
+            时间戳 [(token, start_sec, end_sec), ...]
+        """
+        tokens = self._TOKEN_PATTERN.findall(text)
+        is_word = [any(ch.isalnum() for ch in token) for token in tokens]
+        if sum(is_word) != len(token_timestamps):
+            logger.warning(
+                f"Paraformer token 数 ({sum(is_word)}) 与时间戳数 ({len(token_timestamps)}) "
+                "不一致，回退为线性插值"
+            )
+            return self._interpolate_char_timestamps(text, token_timestamps)
 
-        logger.info(
-            f"Paraformer 分块处理完成，共 {len(slices)} 个片段，分块大小: {chunk_size_s}秒，总文本长度: {len(full_text)}"
-        )
-        return ASRResult(text=full_text, timestamp=full_timestamp)
+        char_timestamps = []
+        stamps = iter(token_timestamps)
+        last_end = token_timestamps[0][0] / 1000.0 if token_timestamps else 0.0
+        for token, word in zip(tokens, is_word, strict=True):
+            if word:
+                begin_ms, end_ms = next(stamps)
+                start, last_end = begin_ms / 1000.0, end_ms / 1000.0
+            else:
+                start = last_end
+            char_timestamps.append((token, round(start, 3), round(last_end, 3)))
+        return char_timestamps
 
     def _interpolate_char_timestamps(
         self, text: str, sentence_timestamps: list[list[int]]
     ) -> list[tuple[str, float, float]]:
         """
-        将句子级别的时间戳插值为字符级别
+        将时间戳范围线性插值为字符级别（token 对齐失败时的回退）
 
         Args:
             text: 完整文本
@@ -22,8 +22,8 @@ class SubtitleConfig:
 
     # ASR 参数
     batch_size_s: int = 5  # SenseVoice 批处理大小（秒）
-    paraformer_batch_size_s: int = 900  # Paraformer 批处理大小（秒）
-    paraformer_chunk_size_s: int = 30  # Paraformer 音频分块大小（秒，用于提高长视频时间精度）
+    sensevoice_batch_slices: int = 8  # SenseVoice 每次推理合并的片段数（补齐为一个批次）
+    paraformer_batch_size_s: int = 0  # Paraformer 批处理大小（秒），0 表示按可用内存自动选择
     sample_rate: int = 16000
 
     # 文本匹配参数
@@ -1,7 +1,10 @@
 import os
-import subprocess
 from pathlib import Path
 
+from src.services.asr.compaction import CompactionCallback, detect_and_compact, report_compaction
+from src.services.asr.preprocess import decode_audio
+from src.utils.config import get_config
+from src.utils.helpers.process_supervisor import ProcessProgress, get_process_supervisor
 from src.utils.logging.logger import get_logger
 
 from .asr_processor import ParaformerProcessor, SenseVoiceProcessor
@@ -62,11 +65,32 @@ class SubtitleFileGenerator:
 # ============================================================================
 
 
+def _log_encode_progress():
+    """硬编码进度日志（按 10% 步进输出）"""
+    last_bucket = -1
+
+    def report(progress: ProcessProgress) -> None:
+        nonlocal last_bucket
+        if progress.fraction is None:
+            return
+        bucket = int(progress.fraction * 10) * 10
+        if bucket > last_bucket:
+            last_bucket = bucket
+            logger.info(f"字幕硬编码进度: {bucket}%")
+
+    return report
+
+
 class SubtitleVideoEncoder:
     """字幕视频硬编码器"""
 
     @staticmethod
-    def encode(video_path: str, srt_path: str, output_path: str | None = None) -> str:
+    def encode(
+        video_path: str,
+        srt_path: str,
+        output_path: str | None = None,
+        task_id: str | None = None,
+    ) -> str:
         """
         将 SRT 字幕硬编码到视频中
 
@@ -74,6 +98,7 @@ class SubtitleVideoEncoder:
             video_path: 输入视频路径
             srt_path: SRT 字幕文件路径
             output_path: 输出视频路径（可选）
+            task_id: 任务 ID（任务取消时立即终止 ffmpeg）
 
         Returns:
             输出视频路径
@@ -110,13 +135,8 @@ class SubtitleVideoEncoder:
         logger.info(f"开始硬编码字幕: {output_path}")
         logger.debug(f"FFmpeg 命令: {' '.join(command)}")
 
-        result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            timeout=300,
+        result = get_process_supervisor().run(
+            command, name="ffmpeg 字幕硬编码", task_id=task_id, on_progress=_log_encode_progress()
         )
 
         if result.returncode != 0:
@@ -139,7 +159,7 @@ def generate_subtitle_file(
     segmenter_type: str = "pause",
     config: SubtitleConfig | None = None,
     api_server: str = "gemini-2.0-flash",
-    paraformer_chunk_size_s: int = 30,
+    on_compaction: CompactionCallback | None = None,
 ) -> str:
     """
     生成字幕文件（高层 API）
@@ -152,7 +172,7 @@ def generate_subtitle_file(
         segmenter_type: 分段策略 ('pause', 'punctuation', 'llm')
         config: 配置对象（可选）
         api_server: LLM API 服务器（当 segmenter_type='llm' 时使用）
-        paraformer_chunk_size_s: Paraformer 分块大小（秒，默认30秒）
+        on_compaction: 静音压缩回调（启用 SILENCE_COMPACTION_ENABLED 且完成压缩时调用一次）
 
     Returns:
         生成的字幕文件路径
@@ -163,17 +183,13 @@ def generate_subtitle_file(
     if file_type not in ["srt", "cc"]:
         raise ValueError(f"不支持的字幕格式: {file_type}")
 
+    app_config = get_config()
+
     # 使用默认配置或更新配置
     if config is None:
-        from src.utils.config import get_config
-
-        app_config = get_config()
         temp_dir = app_config.paths.temp_dir or Path("./temp")
         config = SubtitleConfig(temp_dir=temp_dir)
 
-    # 更新 Paraformer 分块大小
-    config.paraformer_chunk_size_s = paraformer_chunk_size_s
-
     # 确定输出路径
     if output_path is None:
         base_name = os.path.splitext(audio_path)[0]
@@ -188,7 +204,15 @@ def generate_subtitle_file(
     else:
         raise ValueError(f"不支持的 ASR 模型: {model}")
 
-    asr_result = asr_processor.process(audio_path)
+    # 只解码一次，切片直接引用内存缓冲
+    audio = decode_audio(audio_path)
+    compaction = detect_and_compact(audio) if app_config.asr.silence_compaction_enabled else None
+    if compaction is None:
+        asr_result = asr_processor.process(audio)
+    else:
+        # 在仅含语音的音频上识别，时间戳映射回原始时间轴
+        report_compaction(on_compaction, compaction)
+        asr_result = asr_processor.process(compaction.audio).map_timeline(compaction.time_map)
 
     # 2. 字幕分段
     logger.info(f"使用 {segmenter_type} 策略进行字幕分段")
@@ -214,7 +238,12 @@ def generate_subtitle_file(
     return SubtitleFileGenerator.generate_cc(segments, output_path)
 
 
-def encode_subtitle_to_video(video_path: str, srt_path: str, output_path: str | None = None) -> str:
+def encode_subtitle_to_video(
+    video_path: str,
+    srt_path: str,
+    output_path: str | None = None,
+    task_id: str | None = None,
+) -> str:
     """
     将字幕硬编码到视频中（高层 API）
 
@@ -222,11 +251,12 @@ def encode_subtitle_to_video(video_path: str, srt_path: str, output_path: str |
         video_path: 视频文件路径
         srt_path: SRT 字幕文件路径
         output_path: 输出视频路径（可选）
+        task_id: 任务 ID（任务取消时立即终止 ffmpeg）
 
     Returns:
         输出视频路径
     """
-    return SubtitleVideoEncoder.encode(video_path, srt_path, output_path)
+    return SubtitleVideoEncoder.encode(video_path, srt_path, output_path, task_id)
 
 
 # ============================================================================
@@ -240,7 +270,6 @@ if __name__ == "__main__":
         download_bilibili_video,
         extract_audio_from_video,
     )
-    from src.utils.config import get_config
 
     config = get_config()
 
@@ -1,9 +1,18 @@
 """字幕数据模型"""
 
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
 
 from src.text_arrangement.split_text import clean_asr_text
 
+if TYPE_CHECKING:
+    from src.services.asr.compaction import TimeMap
+
 
 @dataclass
 class SubtitleSegment:
@@ -21,13 +30,148 @@ class SubtitleSegment:
         return f"[{self.start_time:.2f}s - {self.end_time:.2f}s] {self.text}"
 
 
+class TimestampArray:
+    """
+    列式字符时间戳（替代逐字符的 (字符, 开始, 结束) 元组列表）
+
+    字符（或 token，如英文单词）拼接为一个字符串，offsets[i]:offsets[i + 1] 为第 i 个 token；
+    开始/结束时间为 float32 秒数组（长音频下精度约 1ms）。切片共享底层数组，
+    迭代与下标访问返回 (token, start, end) 元组，兼容原有按字符遍历的分段器。
+    """
+
+    __slots__ = ("chars", "offsets", "starts", "ends")
+
+    def __init__(self, chars: str, offsets: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        self.chars = chars
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.starts = np.asarray(starts, dtype=np.float32)
+        self.ends = np.asarray(ends, dtype=np.float32)
+
+    @classmethod
+    def empty(cls) -> TimestampArray:
+        return cls("", np.zeros(1, dtype=np.int64), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_items(cls, items: Iterable[Sequence]) -> TimestampArray:
+        """由 [(token, start, end), ...] 构建"""
+        items = list(items)
+        if not items:
+            return cls.empty()
+        tokens = [str(item[0]) for item in items]
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum([len(token) for token in tokens], out=offsets[1:])
+        return cls(
+            "".join(tokens),
+            offsets,
+            np.fromiter((item[1] for item in items), dtype=np.float32, count=len(items)),
+            np.fromiter((item[2] for item in items), dtype=np.float32, count=len(items)),
+        )
+
+    @classmethod
+    def concat(cls, parts: Iterable[TimestampArray]) -> TimestampArray:
+        """线性拼接多个时间戳数组"""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        bases = np.cumsum([0] + [len(part.chars) for part in parts[:-1]])
+        offsets = [parts[0].offsets[:1] - parts[0].offsets[0]]
+        offsets += [
+            part.offsets[1:] - part.offsets[0] + base
+            for part, base in zip(parts, bases, strict=True)
+        ]
+        return cls(
+            "".join(part.chars for part in parts),
+            np.concatenate(offsets),
+            np.concatenate([part.starts for part in parts]),
+            np.concatenate([part.ends for part in parts]),
+        )
+
+    def token(self, index: int) -> str:
+        """第 index 个 token 的文本"""
+        base = self.offsets.item(0)
+        return self.chars[self.offsets.item(index) - base : self.offsets.item(index + 1) - base]
+
+    def pauses(self) -> np.ndarray:
+        """相邻 token 之间的停顿（秒）：pauses[i] = starts[i + 1] - ends[i]"""
+        return self.starts[1:] - self.ends[:-1]
+
+    def __len__(self) -> int:
+        return int(self.starts.shape[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("TimestampArray 仅支持连续切片")
+            stop = max(start, stop)
+            offsets = self.offsets[start : stop + 1]
+            base = self.offsets[0]
+            return TimestampArray(
+                self.chars[offsets[0] - base : offsets[-1] - base],
+                offsets,
+                self.starts[start:stop],
+                self.ends[start:stop],
+            )
+        # 标量快速路径：ndarray.item 直接返回 Python 数值，不创建临时数组（逐字符对齐的热点）
+        index = index.__index__()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TimestampArray index out of range")
+        return (
+            self.token(index),
+            round(self.starts.item(index) * 1000) / 1000,
+            round(self.ends.item(index) * 1000) / 1000,
+        )
+
+    def __iter__(self) -> Iterator[tuple[str, float, float]]:
+        base = int(self.offsets[0])
+        bounds = (self.offsets - base).tolist()
+        starts = _seconds(self.starts).tolist()
+        ends = _seconds(self.ends).tolist()
+        for i, (start, end) in enumerate(zip(starts, ends, strict=True)):
+            yield self.chars[bounds[i] : bounds[i + 1]], start, end
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TimestampArray | list | tuple):
+            return list(self) == [tuple(item) for item in other]
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TimestampArray({len(self)} tokens)"
+
+
+def _seconds(values: np.ndarray) -> np.ndarray:
+    """float32 时间戳转为保留到毫秒的 float64（与 __getitem__ 的标量路径结果一致）"""
+    return np.round(values.astype(np.float64), 3)
+
+
 @dataclass
 class ASRResult:
     """ASR 识别结果"""
 
     text: str
-    timestamp: list[tuple[str, float, float]]  # [(字符, 开始时间, 结束时间), ...]
+    timestamp: TimestampArray  # 列式 (字符, 开始时间, 结束时间)；构造时也接受元组列表
+
+    def __post_init__(self):
+        if not isinstance(self.timestamp, TimestampArray):
+            self.timestamp = TimestampArray.from_items(self.timestamp)
 
     def get_clean_text(self) -> str:
         """获取清理后的文本"""
         return clean_asr_text(self.text)
+
+    def map_timeline(self, time_map: TimeMap) -> ASRResult:
+        """将静音压缩时间轴上的时间戳映射回原始时间轴"""
+        ts = self.timestamp
+        if not len(ts):
+            return ASRResult(text=self.text, timestamp=ts)
+        starts = time_map.to_original_s(ts.starts.astype(np.float64))
+        ends = np.maximum(time_map.to_original_s(ts.ends.astype(np.float64), True), starts)
+        return ASRResult(
+            text=self.text, timestamp=TimestampArray(ts.chars, ts.offsets, starts, ends)
+        )
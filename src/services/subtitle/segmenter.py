@@ -3,6 +3,7 @@
 from abc import ABC, abstractmethod
 
 import jieba
+import numpy as np
 
 from src.services.llm import LLMQueryParams, query_llm
 from src.services.llm.prompts import get_prompt
@@ -10,7 +11,7 @@ from src.text_arrangement.split_text import smart_split
 from src.utils.logging.logger import get_logger
 
 from .config import SubtitleConfig
-from .models import ASRResult, SubtitleSegment
+from .models import ASRResult, SubtitleSegment, TimestampArray
 from .utils import TextMatcher
 
 logger = get_logger(__name__)
@@ -41,6 +42,9 @@ class PauseBasedSegmenter(SubtitleSegmenter):
         current_text = ""
         current_start = asr_result.timestamp[0][1]
 
+        # 到下一个字符的停顿时间（向量化计算，最后一个字符为 0）
+        pauses = np.append(asr_result.timestamp.pauses(), 0.0).tolist()
+
         for i, (char, start, end) in enumerate(asr_result.timestamp):
             if not current_chars:
                 current_start = start
@@ -48,10 +52,7 @@ class PauseBasedSegmenter(SubtitleSegmenter):
             current_chars.append((char, start, end))
             current_text += char
 
-            # 计算到下一个字符的停顿时间
-            next_pause = 0.0
-            if i + 1 < len(asr_result.timestamp):
-                next_pause = asr_result.timestamp[i + 1][1] - end
+            next_pause = pauses[i]
 
             # 判断是否需要分段
             over_length = len(current_text) >= self.config.max_chars_per_segment
@@ -115,6 +116,9 @@ class PunctuationPauseSegmenter(SubtitleSegmenter):
         # 最小分段长度（避免段落过短）
         min_segment_length = max(8, self.config.max_chars_per_segment // 2)
 
+        # 到下一个字符的停顿时间（向量化计算，最后一个字符为 0）
+        pauses = np.append(asr_result.timestamp.pauses(), 0.0).tolist()
+
         for i, (char, start, end) in enumerate(asr_result.timestamp):
             if not current_chars:
                 current_start = start
@@ -122,10 +126,7 @@ class PunctuationPauseSegmenter(SubtitleSegmenter):
             current_chars.append((char, start, end))
             current_text += char
 
-            # 计算到下一个字符的停顿时间
-            next_pause = 0.0
-            if i + 1 < len(asr_result.timestamp):
-                next_pause = asr_result.timestamp[i + 1][1] - end
+            next_pause = pauses[i]
 
             # 判断分段条件
             current_len = len(current_text)
@@ -256,7 +257,7 @@ class LLMBasedSegmenter(SubtitleSegmenter):
     def _segment_chunk(
         self,
         chunk: str,
-        full_timestamp: list[tuple[str, float, float]],
+        full_timestamp: TimestampArray,
         time_cursor: int,
     ) -> list[SubtitleSegment]:
         """
@@ -317,7 +318,7 @@ class LLMBasedSegmenter(SubtitleSegmenter):
         self,
         split_parts: list[str],
         original_chunk: str,
-        full_timestamp: list[tuple[str, float, float]],
+        full_timestamp: TimestampArray,
         time_cursor: int,
     ) -> list[SubtitleSegment]:
         """将 LLM 切分的文本段与时间戳对齐"""
@@ -19,6 +19,26 @@ class ASRConfig(BaseConfig):
         default="paraformer", description="ASR 模型选择：sense_voice 或 paraformer"
     )
 
+    # 启动时预加载并预热 ASR 模型（/ready 在模型常驻内存后才返回就绪）
+    asr_preload: bool = Field(default=False, description="API 启动时预加载并预热 ASR 模型")
+
+    # FunASR 推理配置：default 或 cpu_optimized（inference_mode + 编码器 int8 动态量化）
+    asr_profile: str = Field(
+        default="default", description="FunASR 推理配置：default 或 cpu_optimized"
+    )
+
+    torch_compile: bool = Field(
+        default=False, description="cpu_optimized 配置下是否对编码器启用 torch.compile"
+    )
+
+    torch_intra_op_threads: int = Field(
+        default=0, ge=0, description="torch 算子内线程数（0 表示保持默认）"
+    )
+
+    torch_inter_op_threads: int = Field(
+        default=0, ge=0, description="torch 算子间线程数（0 表示保持默认）"
+    )
+
     # 设备配置
     device: str = Field(default="auto", description="设备选择：auto, cpu, cuda, cuda:0, cuda:1 等")
 
@@ -53,9 +73,47 @@ class ASRConfig(BaseConfig):
         description="whisper.cpp VAD 模型文件路径（例如：./assets/models/ggml-silero-v6.2.0.bin）",
     )
 
+    whisper_cpp_shards: int = Field(
+        default=1,
+        ge=1,
+        description="whisper.cpp 分片并发数 K（>1 时长音频在 VAD 静音边界切分，K 个 whisper-cli 并发，线程数均分）",
+    )
+
+    whisper_cpp_shard_min_duration_s: float = Field(
+        default=600.0, ge=0, description="音频时长达到该值（秒）才启用 whisper.cpp 分片模式"
+    )
+
+    # whisper.cpp 后端：cli 每个文件启动一次 whisper-cli；server 使用常驻 whisper-server（模型只加载一次）
+    whisper_cpp_backend: str = Field(default="cli", description="whisper.cpp 后端：cli 或 server")
+
+    whisper_server_bin: Path | None = Field(
+        default=None,
+        description="whisper-server 可执行文件路径（留空则取 whisper-cli 同目录下的 whisper-server）",
+    )
+
+    whisper_server_port: int = Field(
+        default=0, ge=0, le=65535, description="whisper-server 监听端口（0 表示自动选择空闲端口）"
+    )
+
+    whisper_server_startup_timeout: int = Field(
+        default=120, ge=1, description="whisper-server 启动（加载模型）超时时间（秒）"
+    )
+
+    whisper_server_extra_args: str = Field(
+        default="", description="额外传给 whisper-server 的参数（原样拼接）"
+    )
+
     # ONNX 配置
     use_onnx: bool = Field(default=False, description="是否启用 ONNX 推理")
 
+    onnx_quantize: bool = Field(
+        default=False, description="SenseVoice ONNX 推理是否使用 int8 动态量化模型"
+    )
+
+    onnx_intra_op_threads: int = Field(
+        default=0, ge=0, description="onnxruntime 算子内线程数（0 表示由 onnxruntime 决定）"
+    )
+
     # VAD 配置（语音活动检测，跳过静音段提升 ASR 精度）
     enable_vad: bool = Field(
         default=False, description="是否启用 VAD 预处理（需要 funasr fsmn-vad）"
@@ -63,6 +121,109 @@ class ASRConfig(BaseConfig):
 
     onnx_providers: str = Field(default="", description="ONNX 执行提供者（逗号分隔）")
 
+    # 静音压缩（VAD 语音段拼接为仅含语音的音频再做 ASR，时间戳经偏移映射还原）
+    silence_compaction_enabled: bool = Field(
+        default=False, description="是否压缩长静音 / 音乐段后再做 ASR（需要 funasr fsmn-vad）"
+    )
+
+    silence_compaction_min_silence_ms: int = Field(
+        default=2000, ge=0, description="仅移除长于该值（毫秒）的非语音段，短停顿原样保留"
+    )
+
+    silence_compaction_pad_ms: int = Field(
+        default=250, ge=0, description="每个语音段前后保留的非语音时长（毫秒）"
+    )
+
+    # 分桶批量推理配置（启用 VAD 时按语音段时长分桶，每桶一个 padding 批次）
+    segment_batch_size: int = Field(default=16, ge=1, description="每个批次最多包含的语音段数")
+
+    segment_batch_max_s: float = Field(
+        default=120.0, gt=0, description="每个批次 padding 后的最大总时长（秒）"
+    )
+
+    segment_batch_length_ratio: float = Field(
+        default=2.0,
+        ge=1.0,
+        description="同一批次内最长段与最短段的时长比上限（越小 padding 越少、批次越多）",
+    )
+
+    # 多进程并行 ASR（仅 FunASR 模型；需启用 VAD，在语音段边界切分长音频）
+    parallel_workers: int = Field(
+        default=0,
+        ge=0,
+        description="并行 ASR 工作进程数（每个进程一份模型副本；0 或 1 表示不启用）",
+    )
+
+    parallel_torch_threads: int = Field(
+        default=2, ge=1, description="每个并行 ASR 工作进程的 torch 线程数"
+    )
+
+    parallel_min_duration_s: float = Field(
+        default=300.0, ge=0, description="音频时长达到该值（秒）才使用并行 ASR"
+    )
+
+    # ASR 模型池：常驻内存预算与空闲淘汰
+    model_pool_budget_mb: int = Field(
+        default=0,
+        ge=0,
+        description="ASR 模型常驻内存预算（MB），超出时按 LRU 释放空闲模型（0 表示不限制）",
+    )
+
+    model_idle_timeout_s: float = Field(
+        default=0, ge=0, description="ASR 模型空闲超过该时长（秒）后释放（0 表示常驻）"
+    )
+
+    # FunASR generate 的 batch_size_s 自动选择（按可用内存、音频时长与实测激活开销）
+    batch_size_auto: bool = Field(
+        default=True, description="是否按可用内存自动选择 batch_size_s（OOM 时减半重试）"
+    )
+
+    batch_memory_fraction: float = Field(
+        default=0.5, gt=0, le=1, description="推理激活最多占用可用内存的比例"
+    )
+
+    batch_size_min_s: int = Field(
+        default=30, ge=1, description="自动选择的 batch_size_s 下限（秒），OOM 重试到此为止"
+    )
+
+    batch_size_max_s: int = Field(
+        default=900, ge=1, description="自动选择的 batch_size_s 上限（秒）"
+    )
+
+    batch_activation_mb_per_s: float = Field(
+        default=0,
+        ge=0,
+        description="每秒音频的推理激活内存（MB），0 表示使用内置估计并按实测更新",
+    )
+
+    # 预处理音频缓存（非目标格式输入转码后的 16kHz WAV，按源文件指纹复用）
+    preprocess_cache_enabled: bool = Field(
+        default=False, description="是否缓存 ffmpeg 转码后的 16kHz 单声道 WAV"
+    )
+
+    preprocess_cache_max_mb: int = Field(
+        default=2048, ge=1, description="预处理音频缓存磁盘配额（MB），超出后按 LRU 淘汰"
+    )
+
+    preprocess_cache_dir: Path | None = Field(
+        default=None, description="预处理音频缓存目录（留空则使用 TEMP_DIR/asr_preprocess_cache）"
+    )
+
+    preprocess_cache_key: str = Field(
+        default="stat", description="缓存键：stat（路径 + 大小 + 修改时间）或 content（内容哈希）"
+    )
+
+    # 转录缓存配置（相同音频 + 相同模型参数直接复用转录结果）
+    transcript_cache_enabled: bool = Field(default=True, description="是否启用 ASR 转录缓存")
+
+    transcript_cache_max_mb: int = Field(
+        default=200, ge=1, description="ASR 转录缓存容量上限（MB），超出后按 LRU 淘汰"
+    )
+
+    transcript_cache_dir: Path | None = Field(
+        default=None, description="ASR 转录缓存目录（留空则使用 TEMP_DIR/asr_cache）"
+    )
+
     @field_validator("asr_model")
     @classmethod
     def validate_asr_model(cls, v: str) -> str:
@@ -72,6 +233,33 @@ class ASRConfig(BaseConfig):
             raise ValueError(f"不支持的 ASR 模型: {v}。支持的模型: {', '.join(supported_models)}")
         return v.lower()
 
+    @field_validator("whisper_cpp_backend")
+    @classmethod
+    def validate_whisper_cpp_backend(cls, v: str) -> str:
+        """验证 whisper.cpp 后端"""
+        v_lower = v.strip().lower()
+        if v_lower not in ("cli", "server"):
+            raise ValueError(f"不支持的 whisper.cpp 后端: {v}。支持: cli, server")
+        return v_lower
+
+    @field_validator("asr_profile")
+    @classmethod
+    def validate_asr_profile(cls, v: str) -> str:
+        """验证 FunASR 推理配置"""
+        v_lower = v.strip().lower().replace("-", "_")
+        if v_lower not in ("default", "cpu_optimized"):
+            raise ValueError(f"不支持的 ASR 推理配置: {v}。支持: default, cpu_optimized")
+        return v_lower
+
+    @field_validator("preprocess_cache_key")
+    @classmethod
+    def validate_preprocess_cache_key(cls, v: str) -> str:
+        """验证预处理音频缓存键模式"""
+        v_lower = v.strip().lower()
+        if v_lower not in ("stat", "content"):
+            raise ValueError(f"不支持的预处理缓存键模式: {v}。支持: stat, content")
+        return v_lower
+
     @field_validator("device")
     @classmethod
     def validate_device(cls, v: str) -> str:
@@ -83,10 +271,18 @@ class ASRConfig(BaseConfig):
             raise ValueError(f"无效的设备配置: {v}。有效格式: auto, cpu, cuda, cuda:0, cuda:1 等")
         return v
 
-    @field_validator("whisper_cpp_bin", "whisper_cpp_model", "whisper_cpp_vad_model", mode="before")
+    @field_validator(
+        "whisper_cpp_bin",
+        "whisper_cpp_model",
+        "whisper_cpp_vad_model",
+        "whisper_server_bin",
+        "transcript_cache_dir",
+        "preprocess_cache_dir",
+        mode="before",
+    )
     @classmethod
     def resolve_whisper_cpp_path(cls, v) -> Path | None:
-        """解析 whisper.cpp 相关路径（支持项目相对路径；空值视为未配置）。"""
+        """解析 whisper.cpp / 缓存相关路径（支持项目相对路径；空值视为未配置）。"""
         if v is None or (isinstance(v, str) and v.strip() == ""):
             return None
 
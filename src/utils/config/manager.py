@@ -56,6 +56,18 @@ class AppConfig(BaseConfig):
     # 缓存配置
     cache_ttl_seconds: int = Field(default=3600, ge=0, description="缓存过期时间（秒）")
 
+    # 外部进程配置（ffmpeg / whisper-cli）
+    max_child_processes: int = Field(
+        default=0, ge=0, description="全局同时运行的外部子进程数上限（0 表示 CPU 核数）"
+    )
+    subprocess_timeout_factor: float = Field(
+        default=4.0, gt=0, description="外部进程超时 = 媒体时长 × 该系数（不低于最小超时）"
+    )
+    subprocess_min_timeout_s: float = Field(default=300, gt=0, description="外部进程最小超时（秒）")
+    subprocess_default_timeout_s: float = Field(
+        default=1800, gt=0, description="无法得知媒体时长时的外部进程超时（秒）"
+    )
+
     # 调试配置
     debug_flag: bool = Field(default=False, description="调试模式")
 
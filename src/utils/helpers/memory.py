@@ -0,0 +1,109 @@
+"""
+进程内存工具
+
+读取当前进程常驻内存（RSS）与系统 / 容器可用内存，不依赖 psutil。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+
+def get_process_rss_bytes(pid: int | None = None) -> int | None:
+    """
+    获取进程的常驻内存（字节）
+
+    Linux 读取 /proc/<pid>/statm；其它平台尝试 psutil（若已安装）。
+    无法获取时返回 None。
+
+    Args:
+        pid: 进程 ID，默认为当前进程
+    """
+    proc_dir = "self" if pid is None else str(pid)
+    try:
+        with open(f"/proc/{proc_dir}/statm", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import psutil
+
+        return int(psutil.Process(pid).memory_info().rss)
+    except Exception:
+        return None
+
+
+def get_peak_rss_bytes() -> int | None:
+    """获取当前进程的峰值常驻内存（字节），无法获取时返回 None"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以 KB 为单位，macOS 以字节为单位
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    except Exception:
+        return None
+
+
+def get_available_memory_bytes() -> int | None:
+    """
+    获取可用内存（字节）：取系统 MemAvailable 与容器 cgroup 剩余额度中的较小值
+
+    Linux 读取 /proc/meminfo 与 cgroup v2/v1 的 memory 限额；其它平台尝试 psutil。
+    无法获取时返回 None。
+    """
+    candidates = [v for v in (_read_meminfo_available(), _read_cgroup_available()) if v is not None]
+    if candidates:
+        return min(candidates)
+
+    try:
+        import psutil
+
+        return int(psutil.virtual_memory().available)
+    except Exception:
+        return None
+
+
+def _read_meminfo_available() -> int | None:
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+# (限额文件, 用量文件)：cgroup v2 与 v1
+_CGROUP_MEMORY_FILES = (
+    ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+    (
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+        "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+    ),
+)
+
+# cgroup v1 未设置限额时为接近 2^63 的值
+_CGROUP_UNLIMITED = 1 << 60
+
+
+def _read_cgroup_available() -> int | None:
+    for limit_path, usage_path in _CGROUP_MEMORY_FILES:
+        try:
+            with open(limit_path, encoding="ascii") as f:
+                raw_limit = f.read().strip()
+            if raw_limit == "max":
+                return None
+            limit = int(raw_limit)
+            if limit >= _CGROUP_UNLIMITED:
+                return None
+            with open(usage_path, encoding="ascii") as f:
+                usage = int(f.read().strip())
+            return max(0, limit - usage)
+        except (OSError, ValueError):
+            continue
+    return None
@@ -0,0 +1,430 @@
+"""
+外部进程监管
+
+所有一次性外部进程（ffmpeg、whisper-cli）统一经由 ProcessSupervisor 启动：
+- 并发上限：全服务共享的子进程槽位（MAX_CHILD_PROCESSES），超出时排队等待
+- 输出：stdout 捕获到内存或写入文件，stderr 逐行回调并保留末尾若干行用于报错
+- 进度：ffmpeg 命令自动追加 `-progress pipe:2`，解析 out_time / speed 并按输入时长折算比例
+- 超时：按媒体时长缩放（时长 × 系数，不低于最小超时）；ffmpeg 未指定时长时从输入信息中解析
+- 取消：订阅 TaskManager 的取消信号，任务取消时立即终止子进程（无轮询）
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import IO
+
+from src.core.exceptions import TaskCancelledException
+from src.utils.config import get_config
+from src.utils.logging.logger import get_logger
+
+from .task_manager import CancellationSignal, get_task_manager
+
+logger = get_logger(__name__)
+
+_STDERR_TAIL_LINES = 200
+_STDERR_LINE_MAX_CHARS = 4096
+_TERMINATE_GRACE_S = 2.0
+_READER_JOIN_TIMEOUT_S = 5.0
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+_PROGRESS_LINE_RE = re.compile(r"^(\w+)=\s*(\S*)\s*$")
+_PROGRESS_KEYS = {
+    "frame",
+    "fps",
+    "bitrate",
+    "total_size",
+    "out_time_us",
+    "out_time_ms",
+    "out_time",
+    "dup_frames",
+    "drop_frames",
+    "speed",
+    "progress",
+}
+
+
+class ProcessTimeoutError(RuntimeError):
+    """外部进程超时（已被终止）"""
+
+    def __init__(self, name: str, timeout_s: float):
+        super().__init__(f"{name} timed out after {timeout_s:.0f}s")
+        self.timeout_s = timeout_s
+
+
+class ProcessAbortedError(RuntimeError):
+    """外部进程被调用方传入的 abort 信号中止"""
+
+
+@dataclass(frozen=True)
+class ProcessProgress:
+    """ffmpeg 进度（每个 -progress 报告块一次）"""
+
+    out_time_s: float
+    total_s: float | None
+    speed: float | None
+    finished: bool = False
+
+    @property
+    def fraction(self) -> float | None:
+        if self.finished:
+            return 1.0
+        if not self.total_s:
+            return None
+        return min(1.0, self.out_time_s / self.total_s)
+
+
+@dataclass
+class ProcessResult:
+    """外部进程运行结果"""
+
+    returncode: int
+    stdout: bytearray
+    stderr: str
+    elapsed_s: float
+    duration_s: float | None = None
+
+
+class _FFmpegProgressParser:
+    """解析 `-progress` 输出的 key=value 块与输入信息中的 Duration"""
+
+    def __init__(self, total_s: float | None):
+        self.total_s = total_s
+        self._block: dict[str, str] = {}
+
+    def feed(self, line: str) -> tuple[bool, ProcessProgress | None, bool]:
+        """
+        Returns:
+            (是否为进度行, 完整的进度块（块结束时）, 是否新解析出输入时长)
+        """
+        if self.total_s is None and (m := _DURATION_RE.search(line)):
+            hours, minutes, seconds = m.groups()
+            self.total_s = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+            return False, None, True
+
+        m = _PROGRESS_LINE_RE.match(line)
+        if not m or m.group(1) not in _PROGRESS_KEYS and not m.group(1).startswith("stream_"):
+            return False, None, False
+        key, value = m.groups()
+        self._block[key] = value
+        if key != "progress":
+            return True, None, False
+
+        block, self._block = self._block, {}
+        return True, self._to_progress(block), False
+
+    def _to_progress(self, block: dict[str, str]) -> ProcessProgress:
+        out_time_s = 0.0
+        # out_time_ms 实际单位也是微秒（ffmpeg 历史遗留）
+        for key in ("out_time_us", "out_time_ms"):
+            try:
+                out_time_s = max(0.0, int(block[key]) / 1_000_000)
+                break
+            except (KeyError, ValueError):
+                continue
+        try:
+            speed = float(block.get("speed", "").rstrip("x"))
+        except ValueError:
+            speed = None
+        return ProcessProgress(
+            out_time_s=out_time_s,
+            total_s=self.total_s,
+            speed=speed,
+            finished=block.get("progress") == "end",
+        )
+
+
+def is_ffmpeg_command(cmd: Sequence[str]) -> bool:
+    name = os.path.basename(str(cmd[0])).lower()
+    return name in ("ffmpeg", "ffmpeg.exe")
+
+
+class ProcessSupervisor:
+    """外部进程监管器（全服务共享子进程并发上限）"""
+
+    def __init__(self, max_processes: int):
+        self.max_processes = max(1, int(max_processes))
+        self._active = 0
+        self._slots = threading.Condition()
+
+    @property
+    def active(self) -> int:
+        with self._slots:
+            return self._active
+
+    @staticmethod
+    def timeout_for(media_duration_s: float | None) -> float:
+        """按媒体时长缩放的超时（秒）；时长未知时使用默认超时"""
+        config = get_config()
+        if not media_duration_s:
+            return config.subprocess_default_timeout_s
+        return max(
+            config.subprocess_min_timeout_s,
+            media_duration_s * config.subprocess_timeout_factor,
+        )
+
+    def run(
+        self,
+        cmd: Sequence[str],
+        *,
+        name: str | None = None,
+        task_id: str | None = None,
+        abort: CancellationSignal | None = None,
+        media_duration_s: float | None = None,
+        timeout_s: float | None = None,
+        stdout: IO | None = None,
+        capture_stdout: bool = False,
+        on_stderr_line: Callable[[str], None] | None = None,
+        on_progress: Callable[[ProcessProgress], None] | None = None,
+    ) -> ProcessResult:
+        """
+        运行外部进程直到结束（非零退出码不抛异常，由调用方按各自的异常类型处理）
+
+        Args:
+            cmd: 命令行；ffmpeg 命令会自动追加 `-nostats -progress pipe:2`
+            name: 日志与异常中使用的进程名（默认取可执行文件名）
+            task_id: 任务 ID，任务取消时立即终止进程
+            abort: 额外的中止信号（如分片模式下其它分片失败）
+            media_duration_s: 输入媒体时长，用于缩放超时与折算进度
+            timeout_s: 固定超时（秒），优先于按时长缩放的超时
+            stdout: stdout 写入的文件对象
+            capture_stdout: 是否将 stdout 捕获到内存（ProcessResult.stdout）
+            on_stderr_line: 逐行回调 stderr（不含 ffmpeg 进度行）
+            on_progress: ffmpeg 进度回调
+
+        Raises:
+            FileNotFoundError: 可执行文件不存在
+            TaskCancelledException: 任务被取消
+            ProcessAbortedError: abort 信号触发
+            ProcessTimeoutError: 超时
+        """
+        cmd = [str(part) for part in cmd]
+        name = name or os.path.basename(cmd[0])
+        is_ffmpeg = is_ffmpeg_command(cmd)
+        if is_ffmpeg:
+            cmd = [cmd[0], "-nostats", "-progress", "pipe:2", *cmd[1:]]
+
+        state = _RunState()
+        signals: list[tuple[str, CancellationSignal]] = []
+        if task_id:
+            signals.append(("cancelled", get_task_manager().get_cancel_signal(task_id)))
+        if abort is not None:
+            signals.append(("aborted", abort))
+        unsubscribes = [
+            signal.subscribe(lambda reason=reason: self._stop(state, reason))
+            for reason, signal in signals
+        ]
+
+        try:
+            self._acquire_slot(state)
+            try:
+                return self._run_child(
+                    cmd,
+                    name=name,
+                    task_id=task_id,
+                    state=state,
+                    parser=_FFmpegProgressParser(media_duration_s) if is_ffmpeg else None,
+                    media_duration_s=media_duration_s,
+                    timeout_s=timeout_s,
+                    stdout=stdout,
+                    capture_stdout=capture_stdout,
+                    on_stderr_line=on_stderr_line,
+                    on_progress=on_progress,
+                )
+            finally:
+                self._release_slot()
+        except _StoppedError as stopped:
+            if stopped.reason == "cancelled":
+                logger.info(f"{name} 已随任务取消而终止 (task_id={task_id})")
+                raise TaskCancelledException(task_id) from None
+            raise ProcessAbortedError(f"{name} aborted") from None
+        finally:
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+
+    def _stop(self, state: _RunState, reason: str) -> None:
+        """取消 / 中止信号回调：记录原因并唤醒等待中的线程"""
+        if state.stop_reason is None:
+            state.stop_reason = reason
+        state.wake.set()
+        with self._slots:
+            self._slots.notify_all()
+
+    def _acquire_slot(self, state: _RunState) -> None:
+        with self._slots:
+            if self._active >= self.max_processes and state.stop_reason is None:
+                logger.debug(f"外部进程并发已达上限 ({self.max_processes})，排队等待")
+            while self._active >= self.max_processes and state.stop_reason is None:
+                self._slots.wait()
+            if state.stop_reason is not None:
+                raise _StoppedError(state.stop_reason)
+            self._active += 1
+
+    def _release_slot(self) -> None:
+        with self._slots:
+            self._active -= 1
+            self._slots.notify_all()
+
+    def _run_child(
+        self,
+        cmd: list[str],
+        *,
+        name: str,
+        task_id: str | None,
+        state: _RunState,
+        parser: _FFmpegProgressParser | None,
+        media_duration_s: float | None,
+        timeout_s: float | None,
+        stdout: IO | None,
+        capture_stdout: bool,
+        on_stderr_line: Callable[[str], None] | None,
+        on_progress: Callable[[ProcessProgress], None] | None,
+    ) -> ProcessResult:
+        start = time.monotonic()
+        stdout_target = subprocess.PIPE if capture_stdout else (stdout or subprocess.DEVNULL)
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=stdout_target,
+            stderr=subprocess.PIPE,
+        )
+        logger.debug(f"启动外部进程 {name} (pid={proc.pid}, task_id={task_id})")
+
+        captured = bytearray()
+        stderr_tail: deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
+
+        def on_duration() -> None:
+            # 解析出输入时长后重新计算截止时间
+            state.wake.set()
+
+        threads = [
+            threading.Thread(
+                target=_read_stderr,
+                args=(proc.stderr, stderr_tail, parser, on_stderr_line, on_progress, on_duration),
+                daemon=True,
+            ),
+            threading.Thread(target=_wait_exit, args=(proc, state), daemon=True),
+        ]
+        if capture_stdout:
+            threads.append(
+                threading.Thread(target=_read_stdout, args=(proc.stdout, captured), daemon=True)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                if state.stop_reason is not None:
+                    raise _StoppedError(state.stop_reason)
+                if state.exited.is_set():
+                    break
+                duration_s = parser.total_s if parser is not None else media_duration_s
+                effective_timeout = timeout_s or self.timeout_for(duration_s)
+                remaining = start + effective_timeout - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"{name} 超时 ({effective_timeout:.0f}s)，终止进程")
+                    raise ProcessTimeoutError(name, effective_timeout)
+                state.wake.wait(remaining)
+                state.wake.clear()
+        except BaseException:
+            _terminate(proc, state)
+            for thread in threads:
+                thread.join(timeout=_READER_JOIN_TIMEOUT_S)
+            raise
+
+        for thread in threads:
+            thread.join(timeout=_READER_JOIN_TIMEOUT_S)
+        return ProcessResult(
+            returncode=proc.returncode,
+            stdout=captured,
+            stderr="\n".join(stderr_tail),
+            elapsed_s=time.monotonic() - start,
+            duration_s=parser.total_s if parser is not None else media_duration_s,
+        )
+
+
+class _StoppedError(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _RunState:
+    def __init__(self):
+        self.stop_reason: str | None = None
+        self.wake = threading.Event()
+        self.exited = threading.Event()
+
+
+def _wait_exit(proc: subprocess.Popen, state: _RunState) -> None:
+    proc.wait()
+    state.exited.set()
+    state.wake.set()
+
+
+def _terminate(proc: subprocess.Popen, state: _RunState) -> None:
+    if state.exited.is_set():
+        return
+    try:
+        proc.terminate()
+        if not state.exited.wait(_TERMINATE_GRACE_S):
+            proc.kill()
+            state.exited.wait(_TERMINATE_GRACE_S)
+    except OSError:
+        pass
+
+
+def _read_stdout(stream, sink: bytearray) -> None:
+    try:
+        while chunk := stream.read(1 << 20):
+            sink.extend(chunk)
+    except Exception:
+        return
+
+
+def _read_stderr(
+    stream,
+    tail: deque[str],
+    parser: _FFmpegProgressParser | None,
+    on_line: Callable[[str], None] | None,
+    on_progress: Callable[[ProcessProgress], None] | None,
+    on_duration: Callable[[], None],
+) -> None:
+    try:
+        for raw in stream:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if parser is not None:
+                is_progress, progress, found_duration = parser.feed(line)
+                if found_duration:
+                    on_duration()
+                if is_progress:
+                    if progress is not None and on_progress is not None:
+                        on_progress(progress)
+                    continue
+            tail.append(line[:_STDERR_LINE_MAX_CHARS])
+            if on_line is not None:
+                on_line(line)
+    except Exception as e:
+        # 输出解析失败不应影响主流程
+        logger.debug(f"Failed to read process stderr: {e}")
+
+
+_supervisor: ProcessSupervisor | None = None
+_supervisor_lock = threading.Lock()
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """获取全局外部进程监管器"""
+    global _supervisor
+    if _supervisor is None:
+        with _supervisor_lock:
+            if _supervisor is None:
+                limit = get_config().max_child_processes or os.cpu_count() or 1
+                _supervisor = ProcessSupervisor(limit)
+    return _supervisor
@@ -4,6 +4,7 @@
 """
 
 import threading
+from collections.abc import Callable
 
 from src.core.exceptions import TaskCancelledException
 from src.utils.logging.logger import get_logger
@@ -11,6 +12,59 @@ from src.utils.logging.logger import get_logger
 logger = get_logger(__name__)
 
 
+class CancellationSignal:
+    """
+    可订阅的取消信号
+
+    set() 时立即在调用线程中执行所有订阅回调，等待方无需轮询；
+    接口与 threading.Event 的 set()/is_set() 兼容。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._set = False
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+
+    def set(self) -> None:
+        with self._lock:
+            if self._set:
+                return
+            self._set = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+
+    def is_set(self) -> bool:
+        with self._lock:
+            return self._set
+
+    def subscribe(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        订阅取消事件（已取消时立即回调）
+
+        Returns:
+            取消订阅函数
+        """
+        with self._lock:
+            if not self._set:
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+
+                def unsubscribe() -> None:
+                    with self._lock:
+                        self._callbacks.pop(callback_id, None)
+
+                return unsubscribe
+        callback()
+        return lambda: None
+
+
 class TaskManager:
     """任务管理器，使用单例模式"""
 
@@ -30,12 +84,17 @@ class TaskManager:
             return
         self._initialized = True
         self._stop_flags: dict[str, bool] = {}
+        self._signals: dict[str, CancellationSignal] = {}
         self._flags_lock = threading.Lock()
 
     def create_task(self, task_id: str) -> None:
         """创建一个新任务"""
         with self._flags_lock:
             self._stop_flags[task_id] = False
+            # 复用任务 ID 时丢弃已触发的旧信号
+            signal = self._signals.get(task_id)
+            if signal is not None and signal.is_set():
+                del self._signals[task_id]
             logger.debug(f"Task created: {task_id}")
 
     def task_exists(self, task_id: str) -> bool:
@@ -46,17 +105,38 @@ class TaskManager:
     def stop_task(self, task_id: str) -> None:
         """请求停止指定任务"""
         with self._flags_lock:
-            if task_id in self._stop_flags:
-                self._stop_flags[task_id] = True
-                logger.info(f"Task stop requested: {task_id}")
-            else:
+            if task_id not in self._stop_flags:
                 logger.warning(f"Task not found: {task_id}")
+                return
+            self._stop_flags[task_id] = True
+            signal = self._signals.get(task_id)
+            logger.info(f"Task stop requested: {task_id}")
+        if signal is not None:
+            signal.set()
 
     def request_cancel(self, task_id: str) -> None:
         """请求取消指定任务（不存在时也会创建取消标记）"""
         with self._flags_lock:
             self._stop_flags[task_id] = True
+            signal = self._signals.get(task_id)
             logger.info(f"Task cancellation requested: {task_id}")
+        if signal is not None:
+            signal.set()
+
+    def get_cancel_signal(self, task_id: str) -> CancellationSignal:
+        """
+        获取任务的取消信号（停止 / 取消任务时触发）
+
+        用于需要立即响应取消的阻塞操作（如等待子进程），替代轮询 should_stop。
+        """
+        with self._flags_lock:
+            signal = self._signals.get(task_id)
+            if signal is None:
+                signal = self._signals[task_id] = CancellationSignal()
+            stopped = self._stop_flags.get(task_id, False)
+        if stopped:
+            signal.set()
+        return signal
 
     def should_stop(self, task_id: str) -> bool:
         """检查任务是否应该停止"""
@@ -80,6 +160,7 @@ class TaskManager:
     def remove_task(self, task_id: str) -> None:
         """移除任务"""
         with self._flags_lock:
+            self._signals.pop(task_id, None)
             if task_id in self._stop_flags:
                 del self._stop_flags[task_id]
                 logger.debug(f"Task removed: {task_id}")
@@ -88,6 +169,7 @@ class TaskManager:
         """清除所有任务"""
         with self._flags_lock:
             self._stop_flags.clear()
+            self._signals.clear()
             logger.info("All tasks cleared")
 
 
@@ -3,6 +3,7 @@ API 单元测试
 使用 FastAPI TestClient 和 pytest 进行单元测试
 """
 
+import threading
 from contextlib import suppress
 from io import BytesIO
 from pathlib import Path
@@ -82,6 +83,40 @@ class TestRootEndpoints:
         assert "config" in data
         assert "asr_model" in data["config"]
 
+    def test_ready_endpoint_without_preload(self, client):
+        """未启用预加载时，/ready 视为就绪（模型按需加载）"""
+        response = client.get("/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ready"] is True
+        assert data["state"] == "disabled"
+
+    def test_ready_endpoint_reports_loading(self, client, monkeypatch):
+        """预加载进行中时，/ready 返回 503"""
+        from src.services.asr import warmup
+
+        monkeypatch.setitem(warmup._state, "state", "loading")
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+    def test_shutdown_cancels_pending_preload(self, monkeypatch):
+        """关闭服务时取消仍在进行的预加载任务"""
+        import api
+        from src.services.asr import warmup
+
+        release = threading.Event()
+        monkeypatch.setattr(config.asr, "asr_preload", True)
+        monkeypatch.setattr(warmup, "preload_asr_models", lambda: release.wait(10))
+        try:
+            with TestClient(app):
+                task = api._preload_task
+                assert task is not None and not task.done()
+            assert task.cancelled()
+            assert api._preload_task is None
+        finally:
+            release.set()
+
 
 class TestBilibiliEndpoint:
     """测试 B站视频处理端点"""
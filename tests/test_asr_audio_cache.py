@@ -0,0 +1,208 @@
+"""
+预处理音频磁盘缓存测试
+"""
+
+import os
+import threading
+import time
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.services.asr import audio_cache, preprocess
+from src.services.asr.audio_cache import PreprocessedAudioCache
+from src.services.asr.preprocess import decode_audio
+from src.utils.config.asr import ASRConfig
+
+KEY_A, KEY_B, KEY_C = ("a" * 64, "b" * 64, "c" * 64)
+
+
+def _pcm(seconds: float, value: int = 1000) -> np.ndarray:
+    return np.full(int(16000 * seconds), value, dtype=np.int16)
+
+
+def _fake_transcode(tmp_path, seconds: float, value: int = 1000):
+    """替代 ffmpeg：每次调用在临时目录写出一个新的 16kHz WAV"""
+    outputs = []
+
+    def transcode(source, task_id=None):
+        path = tmp_path / f"transcoded-{len(outputs)}.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(_pcm(seconds, value).tobytes())
+        outputs.append(path)
+        return path
+
+    transcode.outputs = outputs
+    return transcode
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PreprocessedAudioCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    monkeypatch.setattr(audio_cache, "get_preprocessed_audio_cache", lambda: cache)
+    return cache
+
+
+class TestPreprocessedAudioCache:
+    def test_stat_key_changes_with_file_content(self, tmp_path, cache):
+        source = tmp_path / "a.mp3"
+        source.write_bytes(b"one")
+        first = cache.fingerprint(source)
+
+        source.write_bytes(b"three")
+        os.utime(source, ns=(1, 1))
+
+        assert cache.fingerprint(source) != first
+
+    def test_content_key_survives_copy(self, tmp_path):
+        cache = PreprocessedAudioCache(tmp_path / "cache", max_bytes=1024, key_mode="content")
+        (tmp_path / "a.mp3").write_bytes(b"same")
+        (tmp_path / "b.mp3").write_bytes(b"same")
+
+        assert cache.fingerprint(tmp_path / "a.mp3") == cache.fingerprint(tmp_path / "b.mp3")
+
+    def test_quota_evicts_least_recently_used(self, tmp_path):
+        # 每条 0.5s PCM = 16000 字节 + WAV 头
+        cache = PreprocessedAudioCache(tmp_path / "cache", max_bytes=40000)
+        cache.put(KEY_A, _pcm(0.5))
+        cache.put(KEY_B, _pcm(0.5))
+        os.utime(cache.get(KEY_B), (time.time() - 100, time.time() - 100))
+        # 访问 a，使 b 成为最久未使用的条目
+        assert cache.get(KEY_A) is not None
+
+        cache.put(KEY_C, _pcm(0.5))
+
+        assert cache.get(KEY_B) is None
+        assert cache.get(KEY_A) is not None
+        assert cache.get(KEY_C) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_keeps_lock_file_of_evicted_entry(self, tmp_path):
+        cache = PreprocessedAudioCache(tmp_path / "cache", max_bytes=20000)
+        with cache.lock(KEY_A):
+            cache.put(KEY_A, _pcm(0.5))
+        lock_inode = (tmp_path / "cache" / f"{KEY_A}.lock").stat().st_ino
+
+        cache.put(KEY_B, _pcm(0.5))
+
+        assert cache.get(KEY_A) is None
+        # 其他进程可能正持有或等待该锁，淘汰时不能换掉锁文件
+        assert (tmp_path / "cache" / f"{KEY_A}.lock").stat().st_ino == lock_inode
+
+    def test_stats_skips_files_evicted_during_scan(self, tmp_path):
+        cache = PreprocessedAudioCache(tmp_path / "cache", max_bytes=1024 * 1024)
+        cache.put(KEY_A, _pcm(0.1))
+        cache.put(KEY_B, _pcm(0.1))
+        real_stat = Path.stat
+
+        def flaky_stat(self, *args, **kwargs):
+            if self.name == f"{KEY_A}.wav":
+                raise FileNotFoundError(self)
+            return real_stat(self, *args, **kwargs)
+
+        with patch.object(Path, "stat", flaky_stat):
+            stats = cache.stats()
+
+        assert stats["entries"] == 1
+
+    def test_foreign_files_in_cache_dir_are_never_deleted(self, tmp_path):
+        cache = PreprocessedAudioCache(tmp_path, max_bytes=20000)
+        (tmp_path / "talk.wav").write_bytes(b"x" * 50000)
+        (tmp_path / "notes.lock").write_bytes(b"")
+        cache.put(KEY_A, _pcm(0.5))
+        cache.put(KEY_B, _pcm(0.5))
+
+        assert cache.stats()["entries"] == 1
+        assert cache.purge() == 1
+        assert (tmp_path / "talk.wav").exists()
+        assert (tmp_path / "notes.lock").exists()
+
+
+class TestDecodeAudioWithCache:
+    def test_second_decode_hits_cache_without_ffmpeg(self, tmp_path, cache):
+        source = tmp_path / "talk.mp3"
+        source.write_bytes(b"fake mp3")
+        transcode = _fake_transcode(tmp_path, 1.0, value=1234)
+
+        with patch.object(preprocess, "_transcode_to_wav", side_effect=transcode) as ffmpeg:
+            first = decode_audio(str(source))
+            second = decode_audio(str(source))
+
+        ffmpeg.assert_called_once()
+        # 转码结果移入缓存，两次解码都映射同一个缓存文件
+        assert not transcode.outputs[0].exists()
+        assert isinstance(first.samples, np.memmap)
+        assert isinstance(second.samples, np.memmap)
+        np.testing.assert_array_equal(np.asarray(second.samples), np.asarray(first.samples))
+        assert second.source == str(source)
+        assert second.digest() == first.digest()
+
+    def test_concurrent_decodes_transcode_once(self, tmp_path, cache):
+        source = tmp_path / "talk.m4a"
+        source.write_bytes(b"fake m4a")
+        calls = []
+        transcode = _fake_transcode(tmp_path, 0.5)
+
+        def slow_transcode(path, task_id=None):
+            calls.append(path)
+            time.sleep(0.2)
+            return transcode(path, task_id)
+
+        with patch.object(preprocess, "_transcode_to_wav", side_effect=slow_transcode):
+            threads = [threading.Thread(target=decode_audio, args=(str(source),)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 3
+
+    def test_disabled_cache_always_decodes(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(audio_cache, "get_preprocessed_audio_cache", lambda: None)
+        source = tmp_path / "talk.mp3"
+        source.write_bytes(b"fake mp3")
+
+        transcode = _fake_transcode(tmp_path, 0.1, value=7)
+
+        with patch.object(preprocess, "_transcode_to_wav", side_effect=transcode) as ffmpeg:
+            audio = decode_audio(str(source))
+            decode_audio(str(source))
+
+        assert ffmpeg.call_count == 2
+        # 临时 WAV 映射后即删除
+        assert isinstance(audio.samples, np.memmap)
+        assert np.asarray(audio.samples).tolist() == [7] * 1600
+        assert not any(path.exists() for path in transcode.outputs)
+
+    def test_entry_over_quota_is_mapped_from_temp_file(self, tmp_path):
+        cache = PreprocessedAudioCache(tmp_path / "cache", max_bytes=1000)
+        source = tmp_path / "talk.mp3"
+        source.write_bytes(b"fake mp3")
+        transcode = _fake_transcode(tmp_path, 0.5, value=3)
+
+        with (
+            patch.object(audio_cache, "get_preprocessed_audio_cache", return_value=cache),
+            patch.object(preprocess, "_transcode_to_wav", side_effect=transcode),
+        ):
+            audio = decode_audio(str(source))
+
+        assert audio.num_samples == 8000
+        assert cache.stats()["entries"] == 0
+        assert not transcode.outputs[0].exists()
+
+
+class TestPreprocessCacheConfig:
+    def test_empty_dir_falls_back_to_default(self):
+        assert ASRConfig(preprocess_cache_dir="").preprocess_cache_dir is None
+
+    def test_relative_dir_resolves_against_project_root(self):
+        resolved = ASRConfig(preprocess_cache_dir="cache/pcm").preprocess_cache_dir
+
+        assert resolved == (ASRConfig.get_project_root() / "cache" / "pcm").resolve()
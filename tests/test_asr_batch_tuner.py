@@ -0,0 +1,130 @@
+"""
+FunASR batch_size_s 自动选择测试
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.services.asr import batch_tuner
+from src.services.asr.batch_tuner import BatchSizeTuner, is_out_of_memory_error
+from src.services.asr.paraformer import ParaformerService
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def available_memory():
+    with (
+        patch.object(batch_tuner, "get_available_memory_bytes") as available,
+        patch.object(batch_tuner, "get_peak_rss_bytes", return_value=None),
+    ):
+        yield available
+
+
+class TestChoose:
+    def test_scales_with_available_memory(self, available_memory):
+        tuner = BatchSizeTuner(memory_fraction=0.5, min_s=30, max_s=900)
+        available_memory.return_value = 2000 * MB
+
+        # 2000MB × 0.5 / 8MB/s = 125s
+        assert tuner.choose("paraformer", duration_s=3600) == 125
+
+    def test_clamped_to_bounds_and_duration(self, available_memory):
+        tuner = BatchSizeTuner(memory_fraction=0.5, min_s=30, max_s=900)
+        available_memory.return_value = 64 * 1024 * MB
+
+        assert tuner.choose("paraformer", duration_s=3600) == 900
+        assert tuner.choose("paraformer", duration_s=120) == 121
+        assert tuner.choose("paraformer", duration_s=0) == 900
+
+        available_memory.return_value = 10 * MB
+        assert tuner.choose("paraformer", duration_s=3600) == 30
+
+    def test_configured_cost_overrides_builtin(self, available_memory):
+        tuner = BatchSizeTuner(memory_fraction=1.0, min_s=1, activation_bytes_per_s=100 * MB)
+        available_memory.return_value = 1000 * MB
+
+        assert tuner.choose("sense_voice", duration_s=3600) == 10
+
+    def test_unknown_memory_uses_ceiling(self, available_memory):
+        tuner = BatchSizeTuner(min_s=30, max_s=600)
+        available_memory.return_value = None
+
+        assert tuner.choose("paraformer", duration_s=3600) == 600
+
+
+class TestRun:
+    def test_retries_with_half_batch_on_oom(self, available_memory):
+        tuner = BatchSizeTuner(memory_fraction=0.5, min_s=30, max_s=900)
+        available_memory.return_value = 64 * 1024 * MB
+        calls = []
+
+        def infer(batch_size_s):
+            calls.append(batch_size_s)
+            if batch_size_s > 300:
+                raise RuntimeError("DefaultCPUAllocator: can't allocate memory")
+            return "ok"
+
+        assert tuner.run("paraformer", 3600, infer) == "ok"
+        assert calls == [900, 450, 225]
+        # 上限被记住，下次直接从 225s 开始
+        assert tuner.choose("paraformer", 3600) == 225
+
+    def test_gives_up_at_minimum(self, available_memory):
+        tuner = BatchSizeTuner(min_s=30, max_s=60)
+        available_memory.return_value = 64 * 1024 * MB
+        infer = Mock(side_effect=MemoryError())
+
+        with pytest.raises(MemoryError):
+            tuner.run("paraformer", 3600, infer)
+        assert [c.args[0] for c in infer.call_args_list] == [60, 30]
+
+    def test_other_errors_are_not_retried(self, available_memory):
+        tuner = BatchSizeTuner()
+        available_memory.return_value = 64 * 1024 * MB
+        infer = Mock(side_effect=ValueError("bad input"))
+
+        with pytest.raises(ValueError):
+            tuner.run("paraformer", 3600, infer)
+        infer.assert_called_once()
+
+    def test_measured_peak_updates_cost(self, available_memory):
+        tuner = BatchSizeTuner(memory_fraction=0.5, min_s=1, max_s=900)
+        available_memory.return_value = 64 * 1024 * MB
+        with (
+            patch.object(batch_tuner, "get_process_rss_bytes", return_value=1000 * MB),
+            patch.object(batch_tuner, "get_peak_rss_bytes", side_effect=[1000 * MB, 2000 * MB]),
+        ):
+            tuner.run("paraformer", 100, lambda batch_size_s: None)
+
+        # 峰值增量 1000MB / 100s
+        assert tuner.activation_bytes_per_s("paraformer") == pytest.approx(10 * MB)
+
+
+def test_oom_detection_follows_exception_chain():
+    try:
+        try:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        except RuntimeError as e:
+            raise RuntimeError("Failed to transcribe audio with Paraformer") from e
+    except RuntimeError as wrapped:
+        assert is_out_of_memory_error(wrapped)
+    assert not is_out_of_memory_error(RuntimeError("shape mismatch"))
+
+
+def test_service_generate_uses_tuned_batch(monkeypatch):
+    asr = batch_tuner.get_config().asr
+    service = ParaformerService("cpu")
+    service.model = Mock()
+    service.model.generate.return_value = [{"text": "你好"}]
+
+    monkeypatch.setattr(asr, "batch_size_auto", False)
+    service.transcribe("a.wav")
+    assert service.model.generate.call_args.kwargs["batch_size_s"] == 600
+
+    monkeypatch.setattr(asr, "batch_size_auto", True)
+    with patch.object(batch_tuner, "get_batch_tuner") as get_tuner:
+        get_tuner.return_value.run.side_effect = lambda name, duration, infer, device: infer(42)
+        service.transcribe("a.wav")
+    assert service.model.generate.call_args.kwargs["batch_size_s"] == 42
@@ -0,0 +1,61 @@
+"""
+ASR 基准套件冒烟测试（桩模型，离线运行）
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = PROJECT_ROOT / "benchmarks" / "asr"
+
+
+def _run(script: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(BENCH_DIR / script), *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+
+def test_stub_suite_reports_stages_and_compares(tmp_path):
+    report_path = tmp_path / "report.json"
+
+    result = _run(
+        "run_suite.py",
+        "--stub",
+        "--durations",
+        "20",
+        "--backends",
+        "paraformer",
+        "sense_voice_onnx_int8",
+        "--audio-dir",
+        str(tmp_path / "audio"),
+        "--output",
+        str(report_path),
+    )
+
+    assert result.returncode == 0, result.stderr
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["schema_version"] == 1
+    fractions = {item["kind"]: item["speech_fraction"] for item in report["audio"]}
+    assert fractions["silence"] < fractions["speech"]
+
+    assert [r["backend"] for r in report["results"]] == ["paraformer", "sense_voice_onnx_int8"]
+    for backend in report["results"]:
+        assert backend["stub"] is True
+        assert backend["load_s"] >= 0
+        assert backend["peak_rss_mb"] > 0
+        for run in backend["runs"]:
+            assert set(run["stages"]) == {"preprocess_s", "vad_s", "inference_s", "punctuation_s"}
+            assert run["rtf"] > 0
+            assert run["segments"] > 0
+
+    compared = _run(
+        "compare_reports.py", str(report_path), str(report_path), "--max-rtf-regression", "0"
+    )
+    assert compared.returncode == 0, compared.stdout + compared.stderr
+    assert "speech_20s" in compared.stdout
@@ -0,0 +1,83 @@
+"""
+ASR 转录缓存测试
+"""
+
+import numpy as np
+import soundfile as sf
+
+from src.services.asr.cache import TranscriptCache, hash_audio_file
+
+
+def _write_wav(path, samples, sample_rate=16000):
+    sf.write(str(path), samples, samplerate=sample_rate, subtype="PCM_16")
+    return path
+
+
+class TestTranscriptCache:
+    def test_put_and_get_counts_hits_and_misses(self, tmp_path):
+        cache = TranscriptCache(tmp_path / "cache", max_bytes=1024)
+
+        assert cache.get("missing") is None
+        cache.put("k1", "你好世界", model_type="paraformer")
+
+        assert cache.get("k1") == "你好世界"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["items"][0]["model_type"] == "paraformer"
+
+    def test_lru_eviction_respects_size_cap(self, tmp_path):
+        cache = TranscriptCache(tmp_path / "cache", max_bytes=10)
+
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        # 访问 a，使 b 成为最久未使用的条目
+        assert cache.get("a") == "aaaa"
+        cache.put("c", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "aaaa"
+        assert cache.get("c") == "cccc"
+        assert cache.stats()["evictions"] == 1
+
+    def test_index_persists_across_instances(self, tmp_path):
+        cache_dir = tmp_path / "cache"
+        TranscriptCache(cache_dir, max_bytes=1024).put("k", "persisted")
+
+        reloaded = TranscriptCache(cache_dir, max_bytes=1024)
+        assert reloaded.get("k") == "persisted"
+
+    def test_purge_removes_entries_and_files(self, tmp_path):
+        cache = TranscriptCache(tmp_path / "cache", max_bytes=1024)
+        cache.put("k1", "one")
+        cache.put("k2", "two")
+
+        assert cache.purge() == 2
+        assert cache.stats()["entries"] == 0
+        assert not list((tmp_path / "cache").glob("*.txt"))
+
+    def test_build_key_depends_on_signature(self):
+        base = TranscriptCache.build_key("digest", {"model": "paraformer-zh", "batch_size_s": 600})
+        same = TranscriptCache.build_key("digest", {"batch_size_s": 600, "model": "paraformer-zh"})
+        other = TranscriptCache.build_key("digest", {"model": "paraformer-zh", "batch_size_s": 60})
+
+        assert base == same
+        assert base != other
+
+
+class TestHashAudioFile:
+    def test_hash_ignores_file_name(self, tmp_path):
+        samples = (np.sin(np.linspace(0, 100, 16000)) * 0.5).astype(np.float32)
+        first = _write_wav(tmp_path / "first.wav", samples)
+        second = _write_wav(tmp_path / "second.wav", samples)
+
+        assert hash_audio_file(first) == hash_audio_file(second)
+
+    def test_hash_changes_with_content(self, tmp_path):
+        samples = np.zeros(16000, dtype=np.float32)
+        first = _write_wav(tmp_path / "silence.wav", samples)
+        samples[100] = 0.5
+        second = _write_wav(tmp_path / "click.wav", samples)
+
+        assert hash_audio_file(first) != hash_audio_file(second)
@@ -0,0 +1,85 @@
+"""
+静音压缩测试（仅语音音频 + 时间偏移映射）
+"""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.services.asr import factory
+from src.services.asr.compaction import compact_silence
+from src.services.asr.preprocess import DecodedAudio
+from src.services.subtitle.models import ASRResult
+
+
+def _audio(seconds=20):
+    # 每个采样值等于其所在的秒数，便于检查拼接结果
+    samples = np.repeat(np.arange(seconds, dtype=np.int16), 16000)
+    return DecodedAudio(samples=samples, source="lecture.wav")
+
+
+class TestCompactSilence:
+    def test_long_silence_is_removed_and_mapped_back(self):
+        audio = _audio()
+        compaction = compact_silence(
+            audio, [(1000, 3000), (12000, 14000)], min_silence_ms=2000, pad_ms=0
+        )
+
+        assert compaction.compacted_s == pytest.approx(4.0)
+        assert compaction.ratio == pytest.approx(0.2)
+        assert compaction.segments == [(0, 2000), (2000, 4000)]
+        assert set(np.unique(compaction.audio.samples)) == {1, 2, 12, 13}
+        assert compaction.time_map.to_original_s(2.5) == pytest.approx(12.5)
+        # 拼接点上的结束时间归入前一个区间，不跨越被移除的静音
+        assert compaction.time_map.to_original_s(2.0, is_end=True) == pytest.approx(3.0)
+        assert compaction.summary() == {
+            "original_s": 20.0,
+            "compacted_s": 4.0,
+            "ratio": 0.2,
+            "regions": 2,
+        }
+
+    def test_short_pauses_and_padding_are_kept(self):
+        compaction = compact_silence(
+            _audio(), [(1000, 3000), (3500, 5000)], min_silence_ms=2000, pad_ms=500
+        )
+
+        assert compaction.time_map.regions == 1
+        assert compaction.compacted_s == pytest.approx(5.0)
+        assert compaction.time_map.to_original_s(0.0) == pytest.approx(0.5)
+        assert compaction.segments == [(500, 2500), (3000, 4500)]
+
+    def test_asr_timestamps_are_restored(self):
+        compaction = compact_silence(
+            _audio(), [(1000, 3000), (12000, 14000)], min_silence_ms=2000, pad_ms=0
+        )
+        result = ASRResult(text="你好世界", timestamp=[("你", 0.5, 1.0), ("世", 2.0, 2.5)])
+
+        restored = result.map_timeline(compaction.time_map)
+
+        assert restored.timestamp == [("你", 1.5, 2.0), ("世", 12.0, 12.5)]
+
+
+class TestFactoryCompaction:
+    def test_asr_runs_on_compacted_audio(self):
+        service = Mock()
+        service.transcribe_segments.return_value = "文本"
+        reported = []
+        with (
+            patch.object(factory.config.asr, "enable_vad", False),
+            patch.object(factory.config.asr, "silence_compaction_enabled", True),
+            patch.object(factory.config.asr, "silence_compaction_min_silence_ms", 2000),
+            patch.object(factory.config.asr, "silence_compaction_pad_ms", 0),
+            patch("src.services.asr.vad.VADService") as vad_cls,
+        ):
+            vad_cls.return_value.segment_audio.return_value = [(1000, 3000), (12000, 14000)]
+            text = factory._transcribe_with_vad(
+                service, _audio(), "t1", on_compaction=reported.append
+            )
+
+        assert text == "文本"
+        audio, segments, task_id = service.transcribe_segments.call_args.args
+        assert audio.duration_s == pytest.approx(4.0)
+        assert segments == [(0, 2000), (2000, 4000)]
+        assert [c.ratio for c in reported] == [pytest.approx(0.2)]
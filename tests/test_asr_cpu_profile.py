@@ -0,0 +1,130 @@
+"""
+FunASR cpu_optimized 推理配置测试
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.services.asr import torch_profile
+from src.services.asr.paraformer import ParaformerService
+from src.services.asr.torch_profile import character_error_rate
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    torch = Mock()
+    torch.ao.quantization.quantize_dynamic.side_effect = lambda module, *a, **kw: ("q", module)
+    torch.compile.side_effect = lambda module, **kw: ("compiled", module)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setattr(torch_profile, "_threads_applied", False)
+    return torch
+
+
+@pytest.fixture
+def asr_config(monkeypatch):
+    asr = torch_profile.get_config().asr
+    monkeypatch.setattr(asr, "asr_profile", "default")
+    monkeypatch.setattr(asr, "torch_compile", False)
+    monkeypatch.setattr(asr, "torch_intra_op_threads", 0)
+    monkeypatch.setattr(asr, "torch_inter_op_threads", 0)
+    return asr
+
+
+def _auto_model():
+    auto_model = Mock()
+    auto_model.model.encoder = "encoder"
+    return auto_model
+
+
+class TestOptimizeAutoModel:
+    def test_default_profile_leaves_model_untouched(self, fake_torch, asr_config):
+        auto_model = _auto_model()
+
+        torch_profile.optimize_auto_model(auto_model, "cpu", "Paraformer")
+
+        assert auto_model.model.encoder == "encoder"
+        fake_torch.ao.quantization.quantize_dynamic.assert_not_called()
+        fake_torch.set_num_threads.assert_not_called()
+
+    def test_cpu_optimized_quantizes_encoder_and_sets_threads(
+        self, fake_torch, asr_config, monkeypatch
+    ):
+        monkeypatch.setattr(asr_config, "asr_profile", "cpu_optimized")
+        monkeypatch.setattr(asr_config, "torch_intra_op_threads", 6)
+        monkeypatch.setattr(asr_config, "torch_inter_op_threads", 2)
+        auto_model = _auto_model()
+
+        torch_profile.optimize_auto_model(auto_model, "cpu", "Paraformer")
+
+        assert auto_model.model.encoder == ("q", "encoder")
+        fake_torch.set_num_threads.assert_called_once_with(6)
+        fake_torch.set_num_interop_threads.assert_called_once_with(2)
+        fake_torch.compile.assert_not_called()
+
+    def test_compile_is_optional_and_quantization_is_cpu_only(
+        self, fake_torch, asr_config, monkeypatch
+    ):
+        monkeypatch.setattr(asr_config, "asr_profile", "cpu_optimized")
+        monkeypatch.setattr(asr_config, "torch_compile", True)
+        auto_model = _auto_model()
+
+        torch_profile.optimize_auto_model(auto_model, "cuda:0", "Paraformer")
+
+        fake_torch.ao.quantization.quantize_dynamic.assert_not_called()
+        assert auto_model.model.encoder == ("compiled", "encoder")
+
+    def test_inference_context_and_cache_signature(self, fake_torch, asr_config, monkeypatch):
+        assert torch_profile.profile_signature() == {}
+        torch_profile.inference_context()
+        fake_torch.inference_mode.assert_not_called()
+
+        monkeypatch.setattr(asr_config, "asr_profile", "cpu_optimized")
+        torch_profile.inference_context()
+
+        fake_torch.inference_mode.assert_called_once()
+        assert ParaformerService("cpu").get_cache_signature()["profile"] == "cpu_optimized"
+
+
+class TestCharacterErrorRate:
+    def test_ignores_punctuation_and_spaces(self):
+        assert character_error_rate("今天天气很好。", "今天 天气很好") == 0.0
+
+    def test_counts_substitutions_insertions_and_deletions(self):
+        assert character_error_rate("今天天气很好", "今天天器很好啊") == pytest.approx(2 / 6)
+
+    def test_empty_reference(self):
+        assert character_error_rate("", "") == 0.0
+        assert character_error_rate("", "有") == 1.0
+
+
+@pytest.mark.skipif(
+    not os.environ.get("ASR_CER_AUDIO"),
+    reason="需要真实模型与测试音频：设置 ASR_CER_AUDIO=<音频路径> 运行",
+)
+@pytest.mark.parametrize("model", ["paraformer", "sense_voice"])
+def test_cpu_optimized_cer_regression(model):
+    """cpu_optimized 转录结果与 fp32 的 CER 不超过阈值（子进程运行，不受测试 mock 影响）"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(PROJECT_ROOT / "benchmarks" / "asr" / "check_cpu_profile_cer.py"),
+            "--audio",
+            os.environ["ASR_CER_AUDIO"],
+            "--model",
+            model,
+            "--max-cer",
+            os.environ.get("ASR_CER_MAX", "0.02"),
+        ],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=1800,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,61 @@
+"""
+ASR 音频解码测试
+"""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.services.asr.cache import hash_audio_file
+from src.services.asr.preprocess import DecodedAudio, decode_audio
+
+
+def _write_wav(path, samples, sample_rate=16000):
+    sf.write(str(path), samples, samplerate=sample_rate, subtype="PCM_16")
+    return path
+
+
+class TestDecodeAudio:
+    def test_target_wav_is_memory_mapped(self, tmp_path):
+        samples = (np.sin(np.linspace(0, 200, 32000)) * 0.4).astype(np.float32)
+        path = _write_wav(tmp_path / "speech.wav", samples)
+
+        audio = decode_audio(str(path))
+
+        assert isinstance(audio.samples, np.memmap)
+        assert audio.num_samples == 32000
+        assert audio.duration_s == pytest.approx(2.0)
+        expected, _ = sf.read(str(path), dtype="int16")
+        np.testing.assert_array_equal(np.asarray(audio.samples), expected)
+
+    def test_digest_matches_file_hash(self, tmp_path):
+        samples = (np.random.default_rng(0).uniform(-0.5, 0.5, 16000)).astype(np.float32)
+        path = _write_wav(tmp_path / "noise.wav", samples)
+
+        assert decode_audio(str(path)).digest() == hash_audio_file(path)
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            decode_audio(str(tmp_path / "missing.wav"))
+
+
+class TestDecodedAudio:
+    def test_slice_ms_returns_view(self):
+        samples = np.arange(16000, dtype=np.int16)
+        audio = DecodedAudio(samples=samples)
+
+        view = audio.slice_ms(100, 200)
+
+        assert view.shape[0] == 1600
+        assert view[0] == 1600
+        assert np.shares_memory(view, samples)
+
+    def test_float_conversion_is_not_cached(self):
+        audio = DecodedAudio(samples=np.array([0, 16384, -32768], dtype=np.int16))
+
+        first = audio.to_float32()
+        np.testing.assert_allclose(first, [0.0, 0.5, -1.0])
+        np.testing.assert_allclose(audio.slice_float32_ms(0, 1000), first)
+        # 每次按需转换，不在 DecodedAudio 上常驻整段 float32 副本
+        assert audio.to_float32() is not first
+        assert not hasattr(audio, "_float_cache")
@@ -0,0 +1,245 @@
+"""
+ASR 段级转录测试（复用 VAD 结果）
+"""
+
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.core.exceptions import TaskCancelledException
+from src.services.asr import factory, parallel
+from src.services.asr.base import PartialTranscriptTracker, join_segment_texts
+from src.services.asr.batching import BatchedInferenceEngine
+from src.services.asr.paraformer import ParaformerService
+from src.services.asr.parallel import ParallelASRPool, split_into_shards
+from src.services.asr.preprocess import DecodedAudio
+
+
+def _audio(seconds=3):
+    return DecodedAudio(samples=np.zeros(16000 * seconds, dtype=np.int16), source="a.wav")
+
+
+class TestJoinSegmentTexts:
+    def test_joins_chinese_directly_and_spaces_latin_words(self):
+        assert join_segment_texts(["你好", " 世界 ", "", "hello", "world"]) == "你好世界hello world"
+
+
+class TestBatchedInferenceEngine:
+    def test_plan_groups_similar_lengths(self):
+        engine = BatchedInferenceEngine(max_batch_size=2, max_batch_s=60, max_length_ratio=2.0)
+        segments = [(0, 1000), (2000, 12000), (13000, 14200), (15000, 16500), (17000, 26000)]
+
+        batches = engine.plan(segments)
+
+        assert [b.indices for b in batches] == [(0, 2), (3,), (4, 1)]
+        assert batches[0].max_ms == 1200
+        assert batches[2].padded_ms == 20000
+
+    def test_plan_respects_padded_duration_budget(self):
+        engine = BatchedInferenceEngine(max_batch_size=8, max_batch_s=25, max_length_ratio=10)
+
+        batches = engine.plan([(0, 10000), (0, 10000), (0, 10000)])
+
+        assert [len(b.indices) for b in batches] == [2, 1]
+
+    def test_run_scatters_results_back_in_time_order(self):
+        engine = BatchedInferenceEngine(max_batch_size=4, max_batch_s=60, max_length_ratio=1.5)
+        segments = [(0, 3000), (3000, 4000), (5000, 8100), (9000, 10100)]
+        calls = []
+
+        def infer(batch):
+            calls.append(batch.indices)
+            return [f"seg{i}" for i in batch.indices]
+
+        results = engine.run(segments, infer, before_batch=lambda: calls.append("check"))
+
+        assert results == ["seg0", "seg1", "seg2", "seg3"]
+        assert calls == ["check", (1, 3), "check", (0, 2)]
+
+    def test_run_reports_each_batch(self):
+        engine = BatchedInferenceEngine(max_batch_size=4, max_batch_s=60, max_length_ratio=1.5)
+        reported = []
+
+        engine.run(
+            [(0, 3000), (3000, 4000)],
+            lambda batch: [f"seg{i}" for i in batch.indices],
+            after_batch=lambda indices, outputs: reported.append((indices, outputs)),
+        )
+
+        assert reported == [((1,), ["seg1"]), ((0,), ["seg0"])]
+
+
+class TestPartialTranscriptTracker:
+    def test_snapshots_keep_time_order_and_progress(self):
+        snapshots = []
+        tracker = PartialTranscriptTracker([(0, 3000), (3000, 4000)], snapshots.append)
+
+        tracker.update([1], ["世界"])
+        tracker.update([0], ["你好"])
+
+        assert [s.text for s in snapshots] == ["世界", "你好世界"]
+        assert snapshots[0].completed_s == 1.0
+        assert snapshots[0].fraction == 0.25
+        assert snapshots[-1].fraction == 1.0
+
+    def test_callback_errors_do_not_interrupt(self):
+        tracker = PartialTranscriptTracker([(0, 1000)], Mock(side_effect=RuntimeError("boom")))
+
+        tracker.update([0], ["文本"])
+
+
+class TestSplitIntoShards:
+    def test_shards_are_contiguous_and_balanced(self):
+        segments = [(0, 1000), (1500, 2500), (3000, 4000), (5000, 6000)]
+
+        shards = split_into_shards(segments, 2)
+
+        assert [(s.start_ms, s.end_ms) for s in shards] == [(0, 2500), (3000, 6000)]
+        assert shards[1].segments == ((0, 1000), (2000, 3000))
+
+    def test_shard_count_capped_by_segments(self):
+        shards = split_into_shards([(0, 60000), (61000, 62000)], 4)
+
+        assert len(shards) == 2
+        assert split_into_shards([], 4) == []
+
+
+class TestParaformerSegments:
+    def test_only_speech_spans_reach_the_model(self):
+        service = ParaformerService("cpu")
+        service.model = Mock()
+        service.model.inference.side_effect = [
+            [{"text": "天气"}, {"text": "今天"}],
+            [{"text": "今天天气。"}],
+        ]
+
+        text = service.transcribe_segments(_audio(), [(0, 1000), (1000, 1600)])
+
+        assert text == "今天天气。"
+        asr_call, punc_call = service.model.inference.call_args_list
+        # 同一时长桶内按时长升序送入模型，结果按时间顺序回填
+        inputs = asr_call.args[0]
+        assert [len(x) for x in inputs] == [9600, 16000]
+        assert asr_call.kwargs["fs"] == 16000
+        assert asr_call.kwargs["batch_size"] == 2
+        assert punc_call.args[0] == "今天天气"
+        assert punc_call.kwargs["model"] is service.model.punc_model
+
+
+class TestFactoryVADRouting:
+    def test_full_transcription_reports_final_snapshot(self):
+        service = Mock()
+        service.transcribe_decoded.return_value = "全文"
+        snapshots = []
+        with (
+            patch.object(factory.config.asr, "enable_vad", False),
+            patch.object(factory.config.asr, "transcript_cache_enabled", False),
+            patch.object(factory, "decode_audio", return_value=_audio(2)),
+            patch("src.services.asr.model_pool.get_model_pool") as pool,
+        ):
+            pool.return_value.lease.return_value.__enter__.return_value = service
+            text = factory.transcribe_audio("a.wav", on_partial=snapshots.append)
+
+        assert text == "全文"
+        assert [(s.text, s.fraction) for s in snapshots] == [("全文", 1.0)]
+
+    def test_no_speech_skips_asr(self):
+        service = Mock()
+        with (
+            patch.object(factory.config.asr, "enable_vad", True),
+            patch("src.services.asr.vad.VADService") as vad_cls,
+        ):
+            vad_cls.return_value.segment_audio.return_value = []
+            assert factory._transcribe_with_vad(service, _audio(), None) == ""
+
+        service.transcribe_segments.assert_not_called()
+        service.transcribe_decoded.assert_not_called()
+
+    def test_segments_are_passed_to_service(self):
+        service = Mock()
+        service.transcribe_segments.return_value = "文本"
+        audio = _audio()
+        with (
+            patch.object(factory.config.asr, "enable_vad", True),
+            patch("src.services.asr.vad.VADService") as vad_cls,
+        ):
+            vad_cls.return_value.segment_audio.return_value = [(0, 1200)]
+            assert factory._transcribe_with_vad(service, audio, "t1") == "文本"
+
+        service.transcribe_segments.assert_called_once_with(
+            audio, [(0, 1200)], "t1", on_partial=None
+        )
+
+
+def _stub_pool(process):
+    """不启动子进程的 ParallelASRPool：提交的分片一直处于执行中"""
+    pool = ParallelASRPool.__new__(ParallelASRPool)
+    pool.model_type = "sense_voice"
+    pool.workers = 2
+    pool.closed = False
+
+    def submit(*args):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        return future
+
+    pool._executor = Mock()
+    pool._executor.submit.side_effect = submit
+    pool._executor._processes = {1: process}
+    return pool
+
+
+class TestParallelPoolRecovery:
+    def test_broken_pool_falls_back_to_single_instance(self):
+        service = Mock()
+        service.transcribe_segments.return_value = "单实例"
+        with (
+            patch.object(factory.config.asr, "enable_vad", True),
+            patch.object(factory.config.asr, "silence_compaction_enabled", False),
+            patch.object(factory.config.asr, "parallel_workers", 2),
+            patch.object(factory.config.asr, "parallel_min_duration_s", 0),
+            patch("src.services.asr.vad.VADService") as vad_cls,
+            patch.object(parallel, "get_parallel_pool") as get_pool,
+        ):
+            vad_cls.return_value.segment_audio.return_value = [(0, 1000)]
+            get_pool.return_value.transcribe.side_effect = BrokenProcessPool("worker died")
+            text = factory._transcribe_with_vad(service, _audio(), "t1", "sense_voice")
+
+        assert text == "单实例"
+        service.transcribe_segments.assert_called_once()
+
+    def test_closed_pool_is_recreated(self):
+        with (
+            patch.dict(parallel._pools, clear=True),
+            patch.object(parallel, "ParallelASRPool") as pool_cls,
+        ):
+            pool_cls.side_effect = lambda *args, **kwargs: Mock(closed=False)
+            first = parallel.get_parallel_pool("sense_voice")
+            assert parallel.get_parallel_pool("sense_voice") is first
+
+            first.closed = True
+            assert parallel.get_parallel_pool("sense_voice") is not first
+
+    def test_cancel_terminates_running_workers(self):
+        from src.utils.helpers.task_manager import get_task_manager
+
+        process = Mock()
+        process.is_alive.return_value = True
+        pool = _stub_pool(process)
+        manager = get_task_manager()
+        manager.create_task("parallel-cancel")
+        timer = threading.Timer(0.05, manager.stop_task, args=("parallel-cancel",))
+        timer.start()
+        try:
+            with pytest.raises(TaskCancelledException):
+                pool.transcribe(_audio(), [(0, 1000), (1500, 2500)], "parallel-cancel")
+        finally:
+            timer.cancel()
+            manager.remove_task("parallel-cancel")
+
+        process.terminate.assert_called_once()
+        assert pool.closed
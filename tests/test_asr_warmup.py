@@ -0,0 +1,68 @@
+"""
+ASR 模型预加载与就绪状态测试
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from src.services.asr import model_pool, warmup
+
+
+@pytest.fixture(autouse=True)
+def _reset_state(monkeypatch):
+    monkeypatch.setattr(
+        warmup,
+        "_state",
+        {"state": "disabled", "models": {}, "started_at": None, "finished_at": None, "error": None},
+    )
+
+
+class TestPreload:
+    def test_preload_loads_and_warms_configured_model(self, monkeypatch):
+        service = Mock()
+        monkeypatch.setattr(warmup, "get_asr_service", Mock(return_value=service))
+        monkeypatch.setattr(warmup.get_config().asr, "enable_vad", False)
+        monkeypatch.setattr(warmup.get_config().asr, "asr_model", "paraformer")
+
+        result = warmup.preload_asr_models()
+
+        assert result["ready"] is True
+        assert result["state"] == "ready"
+        service.ensure_model_loaded.assert_called_once()
+        warm_audio = service.transcribe_decoded.call_args.args[0]
+        assert warm_audio.duration_s == pytest.approx(1.0)
+        assert result["models"]["paraformer"]["warmup_s"] is not None
+
+    def test_failed_preload_is_not_ready(self, monkeypatch):
+        service = Mock()
+        service.ensure_model_loaded.side_effect = RuntimeError("model missing")
+        monkeypatch.setattr(warmup, "get_asr_service", Mock(return_value=service))
+        monkeypatch.setattr(warmup.get_config().asr, "enable_vad", False)
+
+        result = warmup.preload_asr_models()
+
+        assert result["ready"] is False
+        assert result["state"] == "failed"
+        assert "model missing" in result["error"]
+
+    def test_pending_state_is_not_ready(self):
+        warmup.mark_preload_pending()
+
+        assert warmup.get_readiness()["ready"] is False
+
+    def test_residency_follows_model_pool_after_eviction(self, monkeypatch):
+        monkeypatch.setattr(warmup, "get_asr_service", Mock(return_value=Mock()))
+        monkeypatch.setattr(warmup.get_config().asr, "enable_vad", False)
+        monkeypatch.setattr(warmup.get_config().asr, "asr_model", "paraformer")
+        pool = Mock()
+        pool.stats.return_value = {"models": [{"model_type": "paraformer", "loaded": True}]}
+        monkeypatch.setattr(model_pool, "get_model_pool", lambda: pool)
+
+        assert warmup.preload_asr_models()["models"]["paraformer"]["resident"] is True
+
+        # 模型池空闲淘汰后，/ready 不再报告模型常驻
+        pool.stats.return_value = {"models": [{"model_type": "paraformer", "loaded": False}]}
+        readiness = warmup.get_readiness()
+        assert readiness["models"]["paraformer"]["resident"] is False
+        assert readiness["ready"] is True
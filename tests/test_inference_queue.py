@@ -126,3 +126,46 @@ class TestInferenceQueue:
             worker.cancel()
             with suppress(asyncio.CancelledError):
                 await worker
+
+    @pytest.mark.asyncio
+    async def test_partial_transcript_updates_processing_task(self, monkeypatch, inference_queue):
+        """测试 ASR 增量转录写入正在处理的任务状态"""
+        from src.services.asr.base import PartialTranscript
+
+        task_id = "task-partial"
+        tasks_store = {task_id: {"status": "pending", "created_at": datetime.now().isoformat()}}
+        seen = {}
+
+        async def fake_process(task_id, data, store):
+            inference_queue._on_partial_transcript(
+                task_id, PartialTranscript(text="你好", completed_s=3.0, total_s=12.0)
+            )
+            seen.update(store[task_id])
+            store[task_id]["status"] = "completed"
+
+        monkeypatch.setattr(inference_queue, "_process_audio_task", fake_process)
+
+        worker = asyncio.create_task(inference_queue._worker_loop())
+        try:
+            inference_queue.queue.put_nowait(
+                {
+                    "task_id": task_id,
+                    "task_type": "audio",
+                    "task_data": {},
+                    "tasks_store": tasks_store,
+                }
+            )
+            await _wait_for_status(tasks_store, task_id, "completed")
+        finally:
+            worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await worker
+
+        assert seen["partial_transcript"] == "你好"
+        assert seen["asr_progress"] == {"completed_s": 3.0, "total_s": 12.0, "fraction": 0.25}
+        assert seen["message"] == "语音识别中 25%"
+        # 任务结束后不再接受回调
+        inference_queue._on_partial_transcript(
+            task_id, PartialTranscript(text="迟到", completed_s=12.0, total_s=12.0)
+        )
+        assert tasks_store[task_id]["partial_transcript"] == "你好"
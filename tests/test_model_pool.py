@@ -0,0 +1,183 @@
+"""
+ASR 模型池测试（内存预算、空闲淘汰、single-flight 加载）
+"""
+
+import os
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.services.asr import factory, parallel
+from src.services.asr.base import BaseASRService
+from src.services.asr.model_pool import ModelPool
+from src.services.asr.preprocess import DecodedAudio
+from src.services.subtitle import asr_processor
+from src.services.subtitle.config import SubtitleConfig
+from src.utils.config import get_config
+
+MB = 1024 * 1024
+
+
+class FakeService(BaseASRService):
+    """假 ASR 服务：加载计数 + 固定的常驻内存"""
+
+    def __init__(self, name: str, size_mb: int = 100, load_delay: float = 0.0):
+        super().__init__()
+        self.name = name
+        self.size_bytes = size_mb * MB
+        self.load_delay = load_delay
+        self.load_count = 0
+
+    def load_model(self):
+        time.sleep(self.load_delay)
+        self.load_count += 1
+        self.model = object()
+
+    def transcribe(self, audio_path, task_id=None):
+        self.ensure_model_loaded()
+        return self.name
+
+    def get_resident_bytes(self):
+        return self.size_bytes if self.is_model_loaded() else None
+
+
+def _pool(sizes: dict[str, int], **kwargs) -> tuple[ModelPool, dict[str, FakeService]]:
+    services = {name: FakeService(name, size_mb) for name, size_mb in sizes.items()}
+    return ModelPool(builder=lambda name: services[name], **kwargs), services
+
+
+class TestModelPool:
+    def test_get_returns_same_instance_and_loads_lazily(self):
+        pool, services = _pool({"paraformer": 100})
+
+        service = pool.get("paraformer")
+
+        assert pool.get("paraformer") is service
+        assert not service.is_model_loaded()
+        service.transcribe("a.wav")
+        assert services["paraformer"].load_count == 1
+
+    def test_concurrent_first_use_loads_once(self):
+        service = FakeService("paraformer", load_delay=0.1)
+        pool = ModelPool(builder=lambda name: service)
+        barrier = threading.Barrier(4)
+
+        def _use():
+            barrier.wait()
+            pool.get("paraformer").ensure_model_loaded()
+
+        threads = [threading.Thread(target=_use) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert service.load_count == 1
+        assert service.load_seconds is not None
+
+    def test_budget_evicts_least_recently_used_model(self):
+        pool, services = _pool(
+            {"paraformer": 100, "sense_voice": 100, "whisper_cpp": 100}, budget_bytes=250 * MB
+        )
+        pool.get("paraformer").transcribe("a.wav")
+        pool.get("sense_voice").transcribe("a.wav")
+        services["paraformer"].last_used -= 10  # 使 paraformer 成为最久未使用
+
+        pool.get("whisper_cpp").transcribe("a.wav")
+
+        assert not services["paraformer"].is_model_loaded()
+        assert services["sense_voice"].is_model_loaded()
+        assert services["whisper_cpp"].is_model_loaded()
+        assert pool.resident_bytes() == 200 * MB
+
+    def test_budget_skips_leased_models(self):
+        pool, services = _pool({"paraformer": 100, "sense_voice": 100}, budget_bytes=150 * MB)
+
+        with pool.lease("paraformer") as service:
+            service.transcribe("a.wav")
+            pool.get("sense_voice").transcribe("a.wav")
+            # 唯一可释放的模型正在使用中：允许暂时超出预算
+            assert services["paraformer"].is_model_loaded()
+            assert services["sense_voice"].is_model_loaded()
+
+    def test_evict_idle_releases_only_expired_models(self):
+        pool, services = _pool({"paraformer": 100, "sense_voice": 100}, idle_timeout_s=60)
+        pool.get("paraformer").transcribe("a.wav")
+        pool.get("sense_voice").transcribe("a.wav")
+        services["paraformer"].last_used = time.time() - 120
+
+        evicted = pool.evict_idle()
+
+        assert evicted == ["paraformer"]
+        assert not services["paraformer"].is_model_loaded()
+        assert services["sense_voice"].is_model_loaded()
+        pool.shutdown()
+
+    def test_evicted_model_reloads_on_next_use(self):
+        pool, services = _pool({"paraformer": 100})
+        pool.get("paraformer").transcribe("a.wav")
+
+        assert pool.evict() == ["paraformer"]
+        pool.get("paraformer").transcribe("a.wav")
+
+        assert services["paraformer"].load_count == 2
+
+    def test_stats_reports_resident_size_and_last_use(self):
+        pool, _ = _pool({"paraformer": 100, "sense_voice": 50}, budget_bytes=1024 * MB)
+        pool.get("paraformer").transcribe("a.wav")
+        pool.get("sense_voice")
+
+        stats = pool.stats()
+        models = {m["model_type"]: m for m in stats["models"]}
+
+        assert stats["budget_mb"] == pytest.approx(1024)
+        assert stats["resident_mb"] == pytest.approx(100)
+        assert models["paraformer"]["loaded"] is True
+        assert models["paraformer"]["resident_mb"] == pytest.approx(100)
+        assert models["paraformer"]["last_used"] is not None
+        assert models["sense_voice"]["loaded"] is False
+        assert models["sense_voice"]["resident_mb"] is None
+
+
+class TestLongLivedModelUsers:
+    def test_subtitle_paraformer_is_leased_during_inference(self):
+        pool, services = _pool({"paraformer": 100}, idle_timeout_s=1)
+        service = services["paraformer"]
+        service.ensure_model_loaded()
+        evicted = []
+
+        def generate_with_timestamps(*args, **kwargs):
+            # 推理期间空闲清理线程触发
+            evicted.extend(pool.evict_idle(now=time.time() + 1000))
+            return [{"text": "好", "timestamp": [[0, 100]]}]
+
+        service.generate_with_timestamps = generate_with_timestamps
+        with (
+            patch.object(asr_processor, "get_model_pool", return_value=pool),
+            patch.object(asr_processor, "get_asr_service", side_effect=pool.get),
+        ):
+            result = asr_processor.ParaformerProcessor(SubtitleConfig()).process(
+                DecodedAudio(samples=np.zeros(1600, dtype=np.int16))
+            )
+
+        assert result.text == "好"
+        assert evicted == []
+        assert service.is_model_loaded()
+        assert pool.evict_idle(now=time.time() + 1000) == ["paraformer"]
+
+    def test_parallel_worker_disables_idle_eviction(self):
+        asr = get_config().asr
+        with (
+            patch.dict(os.environ),
+            patch.object(asr, "model_idle_timeout_s", 300),
+            patch.object(asr, "torch_intra_op_threads", 4),
+            patch.object(asr, "torch_inter_op_threads", 4),
+            patch.object(factory, "get_asr_service", return_value=Mock()) as get_service,
+        ):
+            parallel._init_worker("sense_voice", 2)
+
+            assert asr.model_idle_timeout_s == 0
+            get_service.return_value.ensure_model_loaded.assert_called_once()
@@ -0,0 +1,86 @@
+"""
+SenseVoice ONNX 推理路径测试
+"""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from src.services.asr import onnx_sense_voice
+from src.services.asr.onnx_sense_voice import ctc_greedy_decode, export_sense_voice_onnx
+from src.services.asr.preprocess import DecodedAudio
+from src.services.asr.sense_voice import SenseVoiceService
+
+
+def _logits(paths: list[list[int]], vocab: int = 6) -> np.ndarray:
+    frames = max(len(p) for p in paths)
+    logits = np.zeros((len(paths), frames, vocab), dtype=np.float32)
+    for b, path in enumerate(paths):
+        for t, token in enumerate(path):
+            logits[b, t, token] = 1.0
+    return logits
+
+
+class TestCtcGreedyDecode:
+    def test_collapses_repeats_and_drops_blank(self):
+        logits = _logits([[0, 3, 3, 0, 3, 5, 5, 0]])
+
+        assert ctc_greedy_decode(logits, np.array([8])) == [[3, 3, 5]]
+
+    def test_respects_per_sample_lengths(self):
+        logits = _logits([[1, 1, 2, 4], [2, 0, 0, 0]])
+
+        assert ctc_greedy_decode(logits, np.array([3, 1])) == [[1, 2], [2]]
+
+    def test_empty_sample(self):
+        assert ctc_greedy_decode(_logits([[1, 2]]), np.array([0])) == [[]]
+
+
+class TestExportCache:
+    def test_reuses_cached_model_without_export(self, tmp_path):
+        (tmp_path / "model_quant.onnx").write_bytes(b"onnx")
+
+        with patch.object(onnx_sense_voice, "_export_fp32") as export:
+            path = export_sense_voice_onnx(Mock(), tmp_path, quantize=True)
+
+        assert path == tmp_path / "model_quant.onnx"
+        export.assert_not_called()
+
+    def test_exports_fp32_once(self, tmp_path):
+        def _fake_export(auto_model, fp32_path):
+            fp32_path.write_bytes(b"onnx")
+
+        with patch.object(onnx_sense_voice, "_export_fp32", side_effect=_fake_export) as export:
+            first = export_sense_voice_onnx(Mock(), tmp_path)
+            second = export_sense_voice_onnx(Mock(), tmp_path)
+
+        assert first == second == tmp_path / "model.onnx"
+        export.assert_called_once()
+
+
+class TestSenseVoiceOnnxService:
+    def test_segments_use_onnx_engine(self):
+        service = SenseVoiceService("cpu")
+        service.model = Mock()
+        engine = Mock()
+        engine.transcribe_batch.side_effect = lambda inputs, **kwargs: [
+            f"<|zh|><|NEUTRAL|><|Speech|><|withitn|>段{len(x)}" for x in inputs
+        ]
+        service._onnx_engine = engine
+        audio = DecodedAudio(samples=np.zeros(16000 * 3, dtype=np.int16), source="a.wav")
+
+        text = service.transcribe_segments(audio, [(0, 1000), (1500, 2000)])
+
+        assert text == "段16000段8000"
+        service.model.inference.assert_not_called()
+        assert engine.transcribe_batch.call_args.kwargs["sample_rate"] == 16000
+
+    def test_unload_drops_engine(self):
+        service = SenseVoiceService("cpu")
+        service.model = Mock()
+        service._onnx_engine = Mock()
+
+        service.unload_model()
+
+        assert service._onnx_engine is None
+        assert not service.is_model_loaded()
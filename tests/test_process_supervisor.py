@@ -0,0 +1,157 @@
+"""
+外部进程监管测试（使用 Python 子进程与 ffmpeg 替身脚本）
+"""
+
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from src.core.exceptions import TaskCancelledException
+from src.utils.config import get_config
+from src.utils.helpers.process_supervisor import (
+    ProcessAbortedError,
+    ProcessSupervisor,
+    ProcessTimeoutError,
+)
+from src.utils.helpers.task_manager import CancellationSignal, get_task_manager
+
+SLEEP_CMD = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+FAKE_FFMPEG = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import sys
+    sys.stdout.write(" ".join(sys.argv[1:]))
+    sys.stderr.write("Input #0, mp3, from 'a.mp3':\\n  Duration: 00:00:10.00, bitrate: 128 kb/s\\n")
+    for us in (2500000, 5000000, 10000000):
+        sys.stderr.write(f"out_time_us={{us}}\\nspeed=2.5x\\nprogress=continue\\n")
+    sys.stderr.write("progress=end\\n")
+    """
+)
+
+
+@pytest.fixture
+def supervisor():
+    return ProcessSupervisor(max_processes=4)
+
+
+def _run_in_thread(fn):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+class TestCancellationSignal:
+    def test_subscribe_after_set_fires_immediately(self):
+        signal = CancellationSignal()
+        signal.set()
+        fired = []
+        signal.subscribe(lambda: fired.append(True))
+        assert fired == [True]
+
+    def test_task_cancel_sets_signal(self):
+        manager = get_task_manager()
+        manager.create_task("sig-task")
+        try:
+            signal = manager.get_cancel_signal("sig-task")
+            assert not signal.is_set()
+            manager.request_cancel("sig-task")
+            assert signal.is_set()
+        finally:
+            manager.remove_task("sig-task")
+
+
+class TestProcessSupervisor:
+    def test_captures_output_and_returns_exit_code(self, supervisor):
+        code = "import sys; sys.stdout.write('pcm'); sys.stderr.write('bad input\\n'); sys.exit(3)"
+        result = supervisor.run([sys.executable, "-c", code], capture_stdout=True)
+
+        assert result.returncode == 3
+        assert bytes(result.stdout) == b"pcm"
+        assert "bad input" in result.stderr
+
+    def test_task_cancel_terminates_child_immediately(self, supervisor):
+        manager = get_task_manager()
+        manager.create_task("proc-task")
+        try:
+            thread, outcome = _run_in_thread(lambda: supervisor.run(SLEEP_CMD, task_id="proc-task"))
+            time.sleep(0.3)
+            start = time.monotonic()
+            manager.request_cancel("proc-task")
+            thread.join(timeout=10)
+
+            assert time.monotonic() - start < 3
+            assert isinstance(outcome.get("error"), TaskCancelledException)
+            assert supervisor.active == 0
+        finally:
+            manager.remove_task("proc-task")
+
+    def test_abort_signal_raises_aborted(self, supervisor):
+        abort = CancellationSignal()
+        thread, outcome = _run_in_thread(lambda: supervisor.run(SLEEP_CMD, abort=abort))
+        time.sleep(0.3)
+        abort.set()
+        thread.join(timeout=10)
+
+        assert isinstance(outcome.get("error"), ProcessAbortedError)
+
+    def test_timeout_scales_with_media_duration(self, supervisor, monkeypatch):
+        config = get_config()
+        monkeypatch.setattr(config, "subprocess_timeout_factor", 2.0)
+        monkeypatch.setattr(config, "subprocess_min_timeout_s", 0.1)
+
+        assert supervisor.timeout_for(100) == 200
+        start = time.monotonic()
+        with pytest.raises(ProcessTimeoutError):
+            supervisor.run(SLEEP_CMD, media_duration_s=0.25)
+        assert time.monotonic() - start < 5
+
+    def test_concurrent_children_are_bounded(self):
+        supervisor = ProcessSupervisor(max_processes=1)
+        peak = []
+        cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+        def run():
+            result = supervisor.run(cmd)
+            peak.append(supervisor.active)
+            return result
+
+        start = time.monotonic()
+        threads = [_run_in_thread(run) for _ in range(3)]
+        for thread, _ in threads:
+            thread.join(timeout=20)
+
+        assert all(outcome["result"].returncode == 0 for _, outcome in threads)
+        assert time.monotonic() - start >= 0.8
+        assert max(peak) <= 1
+
+    def test_ffmpeg_progress_is_parsed(self, supervisor, tmp_path):
+        ffmpeg = tmp_path / "ffmpeg"
+        ffmpeg.write_text(FAKE_FFMPEG, encoding="utf-8")
+        ffmpeg.chmod(0o755)
+        progress = []
+
+        result = supervisor.run(
+            [str(ffmpeg), "-i", "a.mp3", "out.wav"],
+            capture_stdout=True,
+            on_progress=progress.append,
+        )
+
+        assert bytes(result.stdout).decode().startswith("-nostats -progress pipe:2 -i a.mp3")
+        assert result.duration_s == 10.0
+        assert [p.fraction for p in progress] == [0.25, 0.5, 1.0, 1.0]
+        assert progress[0].speed == 2.5
+        assert progress[-1].finished
+        assert "progress=" not in result.stderr
+        assert "Duration" in result.stderr
@@ -0,0 +1,274 @@
+"""
+字幕 ASR 处理器测试（流式切片、内存推理、Paraformer 时间戳）
+"""
+
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+import soundfile as sf
+
+from src.services.asr import audio_cache, preprocess
+from src.services.asr.preprocess import DecodedAudio
+from src.services.subtitle import asr_processor, generator
+from src.services.subtitle.asr_processor import AudioSlicer
+from src.services.subtitle.config import SubtitleConfig
+from src.services.subtitle.models import ASRResult, TimestampArray
+from src.services.subtitle.segmenter import PauseBasedSegmenter
+
+
+def _ramp(frames: int) -> np.ndarray:
+    return (np.arange(frames) % 1000).astype(np.int16)
+
+
+class TestAudioSlicer:
+    def test_file_windows_are_read_by_seek(self, tmp_path):
+        path = tmp_path / "talk.wav"
+        samples = _ramp(8000 * 5 + 100)
+        sf.write(str(path), samples, samplerate=8000, subtype="PCM_16")
+        slicer = AudioSlicer(SubtitleConfig())
+
+        windows = slicer.windows(str(path), 2)
+        first = next(windows)
+        rest = list(windows)
+
+        assert first[0].shape == (1, 16000)
+        assert first[1:] == (8000, 0.0, 2.0)
+        assert [(round(s, 4), round(e, 4)) for _, _, s, e in rest] == [(2.0, 4.0), (4.0, 5.0125)]
+        np.testing.assert_allclose(
+            np.concatenate([first[0], *(w for w, *_ in rest)], axis=1)[0], samples / 32768.0
+        )
+        assert slicer.count(str(path), 2) == 3
+
+    def test_multichannel_file_is_downmixed(self, tmp_path):
+        path = tmp_path / "stereo.wav"
+        stereo = np.stack([_ramp(16000), np.zeros(16000, dtype=np.int16)], axis=1)
+        sf.write(str(path), stereo, samplerate=16000, subtype="PCM_16")
+
+        ((window, *_),) = AudioSlicer(SubtitleConfig()).windows(str(path), 5)
+
+        assert window.shape == (1, 16000)
+        np.testing.assert_allclose(window[0], stereo[:, 0] / 65536.0)
+
+    def test_decoded_audio_windows_convert_per_window(self):
+        audio = DecodedAudio(samples=_ramp(16000 * 3))
+        slicer = AudioSlicer(SubtitleConfig())
+
+        windows = list(slicer.windows(audio, 1.5))
+
+        assert [(w.shape, sr, s, e) for w, sr, s, e in windows] == [
+            ((1, 24000), 16000, 0.0, 1.5),
+            ((1, 24000), 16000, 1.5, 3.0),
+        ]
+        assert windows[0][0].dtype == np.float32
+
+    def test_unsupported_format_falls_back_to_ffmpeg_decode(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"not audio")
+        decoded = DecodedAudio(samples=_ramp(16000))
+
+        with patch.object(asr_processor, "decode_audio", return_value=decoded) as decode:
+            source = AudioSlicer.open(str(path))
+
+        decode.assert_called_once_with(str(path))
+        assert source is decoded
+
+
+class TestInMemorySliceInference:
+    def test_sensevoice_batches_slices_without_temp_files(self, tmp_path):
+        config = SubtitleConfig(temp_dir=tmp_path, sensevoice_batch_slices=2)
+        processor = asr_processor.SenseVoiceProcessor(config, "cpu")
+        processor.model = Mock()
+        processor.kwargs = {"fs": 8000}
+        processor.model.inference.side_effect = [
+            (
+                [
+                    {"text": "你好", "timestamp": [["你", 0.1, 0.2], ["好", 0.2, 0.3]]},
+                    {"text": "世界", "timestamp": [["世", 0.0, 0.1], ["界", 0.1, 0.2]]},
+                ],
+                {},
+            ),
+            ([{"text": "再见", "timestamp": [["再", 0.5, 0.6]]}], {}),
+        ]
+        tensors = [MagicMock() for _ in range(3)]
+        slices = [(tensors[0], 0.0, 5.0), (tensors[1], 5.0, 10.0), (tensors[2], 10.0, 12.0)]
+
+        with (
+            patch.object(processor.audio_slicer, "slice", return_value=iter(slices)),
+            patch.object(processor.audio_slicer, "count", return_value=3),
+        ):
+            result = processor.process(DecodedAudio(samples=_ramp(16000 * 12)))
+
+        calls = processor.model.inference.call_args_list
+        assert [c.kwargs["data_in"] for c in calls] == [
+            [tensors[0][0], tensors[1][0]],
+            [tensors[2][0]],
+        ]
+        assert all(c.kwargs["fs"] == 16000 for c in calls)
+        assert [ts[1] for ts in result.timestamp] == [0.1, 0.2, 5.0, 5.1, 10.5]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_failed_batch_is_retried_per_slice(self, tmp_path):
+        config = SubtitleConfig(temp_dir=tmp_path, sensevoice_batch_slices=2)
+        processor = asr_processor.SenseVoiceProcessor(config, "cpu")
+        processor.model = Mock()
+        processor.kwargs = {}
+        processor.model.inference.side_effect = [
+            RuntimeError("oom"),
+            RuntimeError("bad slice"),
+            ([{"text": "好", "timestamp": [["好", 0.0, 0.1]]}], {}),
+        ]
+        slices = [(MagicMock(), 0.0, 5.0), (MagicMock(), 5.0, 10.0)]
+
+        with (
+            patch.object(processor.audio_slicer, "slice", return_value=iter(slices)),
+            patch.object(processor.audio_slicer, "count", return_value=2),
+        ):
+            result = processor.process(DecodedAudio(samples=_ramp(16000 * 10)))
+
+        assert processor.model.inference.call_count == 3
+        assert result.timestamp == [("好", 5.0, 5.1)]
+
+
+class TestGenerateSubtitleFileStreaming:
+    def test_non_wav_input_is_memory_mapped_and_sliced(self, tmp_path):
+        source = tmp_path / "lecture.mp3"
+        source.write_bytes(b"fake mp3")
+
+        def transcode(path, task_id=None):
+            wav = tmp_path / "transcoded.wav"
+            sf.write(str(wav), _ramp(16000 * 12), samplerate=16000, subtype="PCM_16")
+            return wav
+
+        def load_model(self):
+            self.model = Mock()
+            self.kwargs = {}
+            self.model.inference.return_value = (
+                [{"text": "你好", "timestamp": [["你", 0.1, 0.2], ["好", 0.2, 0.3]]}] * 3,
+                {},
+            )
+
+        windows = AudioSlicer.windows
+        sources = []
+
+        def spy_windows(self, audio_path, batch_size_s):
+            sources.append(audio_path)
+            return windows(self, audio_path, batch_size_s)
+
+        with (
+            patch.object(generator.get_config().asr, "silence_compaction_enabled", False),
+            patch.object(audio_cache, "get_preprocessed_audio_cache", return_value=None),
+            patch.object(preprocess, "_transcode_to_wav", side_effect=transcode),
+            patch.object(asr_processor.SenseVoiceProcessor, "_load_model", load_model),
+            patch.object(AudioSlicer, "windows", spy_windows),
+            patch.object(DecodedAudio, "to_float32") as full_float,
+        ):
+            output = generator.generate_subtitle_file(
+                str(source), str(tmp_path / "lecture.srt"), model="sense_voice"
+            )
+
+        # 生产路径上 mp3 经临时 WAV 内存映射后按窗口读取，不整段载入或转换为 float32
+        (audio,) = sources
+        assert isinstance(audio, DecodedAudio)
+        assert isinstance(audio.samples, np.memmap)
+        full_float.assert_not_called()
+        assert not (tmp_path / "transcoded.wav").exists()
+        assert "你好" in (tmp_path / "lecture.srt").read_text(encoding="utf-8-sig")
+        assert output == str(tmp_path / "lecture.srt")
+
+
+class TestParaformerTimestamps:
+    def _processor(self, result):
+        processor = asr_processor.ParaformerProcessor(SubtitleConfig())
+        processor.model = Mock()
+        processor.model.generate_with_timestamps.return_value = result
+        return processor
+
+    def test_single_generate_uses_token_timestamps(self):
+        processor = self._processor(
+            [
+                {
+                    "text": "你好，hello world。",
+                    "timestamp": [[100, 300], [300, 500], [900, 1400], [1500, 2100]],
+                }
+            ]
+        )
+        audio = DecodedAudio(samples=_ramp(16000 * 3))
+
+        result = processor.process(audio)
+
+        processor.model.generate_with_timestamps.assert_called_once()
+        args, kwargs = processor.model.generate_with_timestamps.call_args
+        assert args[0].dtype == np.float32 and args[0].shape == (48000,)
+        assert kwargs["fs"] == 16000
+        assert result.timestamp == [
+            ("你", 0.1, 0.3),
+            ("好", 0.3, 0.5),
+            ("，", 0.5, 0.5),
+            ("hello", 0.9, 1.4),
+            (" world", 1.5, 2.1),
+            ("。", 2.1, 2.1),
+        ]
+        assert "".join(t[0] for t in result.timestamp) == result.text
+
+    def test_mismatched_token_count_falls_back_to_interpolation(self):
+        processor = self._processor([{"text": "你好吗", "timestamp": [[0, 300], [300, 600]]}])
+
+        result = processor.process("talk.wav")
+
+        assert processor.model.generate_with_timestamps.call_args.args == ("talk.wav",)
+        assert result.timestamp == [("你", 0.0, 0.2), ("好", 0.2, 0.4), ("吗", 0.4, 0.6)]
+
+
+class TestTimestampArray:
+    ITEMS = [("你", 0.1, 0.3), ("好", 0.3, 0.5), ("，", 0.5, 0.5), (" world", 1.5, 2.1)]
+
+    def test_columnar_storage_round_trips(self):
+        ts = TimestampArray.from_items(self.ITEMS)
+
+        assert ts.chars == "你好， world"
+        assert ts.starts.dtype == np.float32
+        assert len(ts) == 4
+        assert ts[-1] == (" world", 1.5, 2.1)
+        assert [ts[i] for i in range(len(ts))] == list(ts)
+        assert all(type(value) is float for value in ts[np.int64(0)][1:])
+        assert list(ts) == self.ITEMS
+        np.testing.assert_allclose(ts.pauses(), [0.0, 0.0, 1.0], atol=1e-6)
+
+    def test_slicing_shares_arrays(self):
+        ts = TimestampArray.from_items(self.ITEMS)
+
+        part = ts[1:3]
+
+        assert part == self.ITEMS[1:3]
+        assert part.chars == "好，"
+        assert part[0] == ("好", 0.3, 0.5)
+        assert np.shares_memory(part.starts, ts.starts)
+        assert list(ts[2:][1:]) == self.ITEMS[3:]
+
+    def test_concat_is_linear_and_preserves_tokens(self):
+        ts = TimestampArray.from_items(self.ITEMS)
+
+        merged = TimestampArray.concat([ts[:2], TimestampArray.empty(), ts[2:]])
+
+        assert merged == self.ITEMS
+        assert merged.offsets.tolist() == [0, 1, 2, 3, 9]
+
+    def test_asr_result_accepts_tuples_and_segmenters_still_work(self):
+        result = ASRResult(
+            text="你好，世界",
+            timestamp=[
+                ("你", 0.0, 0.2),
+                ("好", 0.2, 0.4),
+                ("，", 0.4, 0.4),
+                ("世", 1.5, 1.7),
+                ("界", 1.7, 1.9),
+            ],
+        )
+
+        segments = PauseBasedSegmenter(SubtitleConfig(pause_threshold=0.6)).segment(result)
+
+        assert isinstance(result.timestamp, TimestampArray)
+        assert [(s.text, s.start_time, s.end_time) for s in segments] == [
+            ("你好，", 0.0, 0.4),
+            ("世界", 1.5, 1.9),
+        ]
@@ -0,0 +1,39 @@
+"""
+VAD 服务测试
+"""
+
+import threading
+from unittest.mock import Mock
+
+from src.services.asr import vad
+
+
+class TestSharedVADModel:
+    def test_model_loaded_once_across_services(self, monkeypatch):
+        monkeypatch.setattr(vad, "_vad_model", None)
+        loader = Mock(return_value=object())
+        monkeypatch.setattr(vad.VADService, "_load_model", staticmethod(loader))
+
+        first = vad.VADService()
+        second = vad.VADService(min_segment_ms=500)
+
+        assert first._model is second._model
+        loader.assert_called_once()
+
+    def test_concurrent_first_use_is_single_flight(self, monkeypatch):
+        monkeypatch.setattr(vad, "_vad_model", None)
+        loader = Mock(return_value=object())
+        monkeypatch.setattr(vad.VADService, "_load_model", staticmethod(loader))
+
+        threads = [threading.Thread(target=vad.get_vad_model) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        loader.assert_called_once()
+
+    def test_warmup_reports_zero_when_already_loaded(self, monkeypatch):
+        monkeypatch.setattr(vad, "_vad_model", object())
+
+        assert vad.warmup_vad_model() == 0.0
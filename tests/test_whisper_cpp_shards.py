@@ -0,0 +1,98 @@
+"""
+whisper.cpp 分片并行转录测试（使用 whisper-cli 替身脚本）
+"""
+
+import sys
+import textwrap
+import time
+
+import numpy as np
+import pytest
+
+from src.core.exceptions import ASRInferenceError
+from src.services.asr.preprocess import DecodedAudio
+from src.services.asr.whisper_cpp import WhisperCppService
+from src.utils.config import get_config
+from src.utils.helpers import process_supervisor
+from src.utils.helpers.process_supervisor import ProcessSupervisor
+
+_FAKE_CLI = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import sys
+    import soundfile as sf
+
+    args = sys.argv[1:]
+    out = args[args.index("-of") + 1]
+    threads = args[args.index("-t") + 1]
+    frames = sf.info(args[-1]).frames
+    for p in (30, 60, 100):
+        sys.stderr.write(f"whisper_print_progress_callback: progress = {{p}}%\\n")
+    with open(out + ".txt", "w", encoding="utf-8") as f:
+        f.write(f"[{{frames}}@{{threads}}]\\n")
+    """
+)
+
+# 第一个分片（48000 帧）长时间运行，第二个分片立即失败
+_SLOW_AND_FAILING_CLI = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import sys
+    import time
+    import soundfile as sf
+
+    if sf.info(sys.argv[-1]).frames == 48000:
+        time.sleep(30)
+    sys.exit(1)
+    """
+)
+
+
+@pytest.fixture
+def fake_whisper(tmp_path, monkeypatch):
+    cli = tmp_path / "whisper-cli"
+    cli.write_text(_FAKE_CLI, encoding="utf-8")
+    cli.chmod(0o755)
+    model = tmp_path / "ggml-test.bin"
+    model.write_bytes(b"ggml")
+
+    asr = get_config().asr
+    monkeypatch.setattr(asr, "whisper_cpp_bin", cli)
+    monkeypatch.setattr(asr, "whisper_cpp_model", model)
+    monkeypatch.setattr(asr, "whisper_cpp_threads", 8)
+    monkeypatch.setattr(asr, "whisper_cpp_extra_args", "")
+    monkeypatch.setattr(asr, "whisper_cpp_shards", 2)
+    monkeypatch.setattr(asr, "whisper_cpp_shard_min_duration_s", 0)
+    return WhisperCppService()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="替身脚本依赖 shebang")
+class TestShardedWhisperCpp:
+    def test_shards_run_with_split_threads_and_merge_in_order(self, fake_whisper):
+        audio = DecodedAudio(samples=np.zeros(16000 * 10, dtype=np.int16), source="long.wav")
+        segments = [(0, 1000), (1500, 3000), (5000, 6000), (6500, 9000)]
+
+        text = fake_whisper.transcribe_segments(audio, segments)
+
+        # 分片 1: 0-3000ms，分片 2: 5000-9000ms；线程预算 8 在 2 个分片间均分
+        assert text == "[48000@4][64000@4]"
+
+    def test_short_audio_is_not_sharded(self, fake_whisper, monkeypatch):
+        monkeypatch.setattr(get_config().asr, "whisper_cpp_shard_min_duration_s", 60)
+        audio = DecodedAudio(samples=np.zeros(16000 * 10, dtype=np.int16), source="short.wav")
+
+        assert fake_whisper.transcribe_segments(audio, [(0, 1000), (5000, 6000)]) == "[160000@8]"
+
+    def test_failed_shard_aborts_earlier_running_shard(self, fake_whisper, monkeypatch):
+        # 保证两个分片同时运行（不受本机 CPU 数决定的外部进程并发上限影响）
+        monkeypatch.setattr(process_supervisor, "_supervisor", ProcessSupervisor(2))
+        get_config().asr.whisper_cpp_bin.write_text(_SLOW_AND_FAILING_CLI, encoding="utf-8")
+        audio = DecodedAudio(samples=np.zeros(16000 * 10, dtype=np.int16), source="long.wav")
+        segments = [(0, 1000), (1500, 3000), (5000, 6000), (6500, 9000)]
+
+        started = time.monotonic()
+        with pytest.raises(ASRInferenceError):
+            fake_whisper.transcribe_segments(audio, segments)
+
+        # 不等待先提交的慢分片自然结束
+        assert time.monotonic() - started < 15
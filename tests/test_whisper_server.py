@@ -0,0 +1,107 @@
+"""
+whisper-server 常驻后端测试（使用本地 Python 替身进程）
+"""
+
+import sys
+import textwrap
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.exceptions import TaskCancelledException
+from src.services.asr.whisper_server import WhisperServerProcess, WhisperServerService
+from src.utils.helpers.task_manager import get_task_manager
+
+_FAKE_SERVER = textwrap.dedent(
+    """
+    import json
+    import sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == "/health" else 404)
+            self.end_headers()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            sys.stderr.write("whisper_print_progress_callback: progress =  50%\\n")
+            sys.stderr.flush()
+            body = json.dumps({"text": " hello "}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    HTTPServer((sys.argv[1], int(sys.argv[2])), Handler).serve_forever()
+    """
+)
+
+
+@pytest.fixture
+def server(tmp_path):
+    script = tmp_path / "fake_whisper_server.py"
+    script.write_text(_FAKE_SERVER, encoding="utf-8")
+    proc = WhisperServerProcess(
+        build_command=lambda host, port: [sys.executable, str(script), host, str(port)],
+        log_path=tmp_path / "server.log",
+        startup_timeout=20,
+    )
+    yield proc
+    proc.stop()
+
+
+class TestWhisperServerProcess:
+    def test_serves_requests_and_forwards_progress(self, server):
+        lines = []
+        server.progress_listener = lines.append
+        base_url = server.ensure_running()
+
+        resp = server._http.post(f"{base_url}/inference", files={"file": ("a.wav", b"RIFF")})
+
+        assert resp.json()["text"] == " hello "
+        assert server.ensure_running() == base_url
+        assert server.restarts == 0
+        deadline = time.time() + 5
+        while not lines and time.time() < deadline:
+            time.sleep(0.05)
+        assert any("progress =  50%" in line for line in lines)
+
+    def test_restarts_after_crash(self, server):
+        server.ensure_running()
+        server._proc.kill()
+        server._proc.wait(timeout=5)
+
+        base_url = server.ensure_running()
+
+        assert server.is_alive()
+        assert server.restarts == 1
+        assert server._http.get(f"{base_url}/health", timeout=5).status_code == 200
+
+
+class TestWhisperServerService:
+    def test_cancel_stops_inflight_request_immediately(self):
+        service = WhisperServerService()
+        release = threading.Event()
+        service._server = Mock()
+        service._server.ensure_running.return_value = "http://127.0.0.1:1"
+        service._server.stop.side_effect = release.set
+        service._http = Mock()
+        service._http.post.side_effect = lambda *a, **kw: release.wait(10)
+        manager = get_task_manager()
+        manager.create_task("server-task")
+        try:
+            threading.Timer(0.2, manager.request_cancel, args=("server-task",)).start()
+            start = time.monotonic()
+            with pytest.raises(TaskCancelledException):
+                service._post_with_progress(b"RIFF", "a.wav", "server-task")
+
+            assert time.monotonic() - start < 2
+            service._server.stop.assert_called_once()
+        finally:
+            manager.remove_task("server-task")